@@ -0,0 +1,52 @@
+"""add post list indexes
+
+Revision ID: 3c1d7e2a9b40
+Revises: 9afa5752d581
+Create Date: 2026-10-19 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1d7e2a9b40'
+down_revision: Union[str, None] = '9afa5752d581'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nom, table, colonnes) : alignés sur les filtres et le tri de PostRepository.get_multi
+INDEXES = [
+    ('ix_posts_created_at_id', 'posts', ['created_at', 'id']),
+    ('ix_posts_author_id_created_at_id', 'posts', ['author_id', 'created_at', 'id']),
+    ('ix_posts_published_created_at_id', 'posts', ['published', 'created_at', 'id']),
+    ('ix_post_tags_tag_id_post_id', 'post_tags', ['tag_id', 'post_id']),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY ne peut pas s'exécuter dans une transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(
+                    name, table, columns, unique=False, postgresql_concurrently=True
+                )
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(
+                    name, table_name=table, postgresql_concurrently=True
+                )
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,37 @@
+"""add tag post count
+
+Revision ID: 5e2b8c4f1a67
+Revises: 7f4e9a1c2d83
+Create Date: 2026-10-19 15:41:08.552390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b8c4f1a67'
+down_revision: Union[str, None] = '7f4e9a1c2d83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'tags',
+        sa.Column('post_count', sa.Integer(), server_default='0', nullable=False)
+    )
+    # Rattrapage : nombre de posts distincts par tag
+    op.execute(
+        'UPDATE tags SET post_count = ('
+        'SELECT COUNT(DISTINCT post_tags.post_id) FROM post_tags '
+        'WHERE post_tags.tag_id = tags.id)'
+    )
+    op.create_index('ix_tags_post_count_name', 'tags', ['post_count', 'name'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tags_post_count_name', table_name='tags')
+    op.drop_column('tags', 'post_count')
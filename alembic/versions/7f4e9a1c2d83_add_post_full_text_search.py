@@ -0,0 +1,50 @@
+"""add post full text search
+
+Revision ID: 7f4e9a1c2d83
+Revises: 3c1d7e2a9b40
+Create Date: 2026-10-19 10:03:27.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f4e9a1c2d83'
+down_revision: Union[str, None] = '3c1d7e2a9b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Colonne générée : maintenue par PostgreSQL à chaque INSERT/UPDATE
+        op.execute("""
+            ALTER TABLE posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(summary, '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(content, '')), 'C')
+            ) STORED
+        """)
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_posts_search_vector', 'posts', ['search_vector'],
+                postgresql_using='gin', postgresql_concurrently=True
+            )
+    elif dialect == 'mysql':
+        op.execute("CREATE FULLTEXT INDEX ix_posts_fulltext ON posts (title, summary, content)")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                'ix_posts_search_vector', table_name='posts', postgresql_concurrently=True
+            )
+        op.drop_column('posts', 'search_vector')
+    elif dialect == 'mysql':
+        op.drop_index('ix_posts_fulltext', table_name='posts')
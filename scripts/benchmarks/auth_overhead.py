@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Coût de l'authentification par requête (api.deps.get_current_user).
+
+Compare, pour un même access token présenté à chaque requête :
+
+- la vérification complète (signature JWT + validation TokenPayload) ;
+- la même chose servie par le cache des tokens vérifiés ;
+- la dépendance complète, avec les caches de tokens et de principals.
+
+    python scripts/benchmarks/auth_overhead.py --repeat 20000
+"""
+import argparse
+import time
+
+from common import make_engine, print_table, reset_schema, seed
+
+from sqlalchemy.orm import Session
+
+from api.deps import get_current_user
+from core import cache_base
+from core.principal_cache import principal_cache
+from core.security import (
+    VerifiedTokenCache,
+    create_access_token,
+    decode_access_token,
+    decode_token,
+    verified_token_cache,
+)
+from schemas.user import TokenPayload
+
+def per_call_us(func, repeat: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Authentication overhead per request")
+    parser.add_argument("--repeat", type=int, default=20_000)
+    args = parser.parse_args()
+
+    # Couche Redis du cache de principals désactivée : mesure en mémoire seulement
+    cache_base.redis_client = None
+    engine = make_engine()
+    reset_schema(engine)
+    seed(engine, posts=1, users=1, tags=1, tags_per_post=1)
+    token = create_access_token(1)
+
+    def full_verification():
+        return TokenPayload(**decode_token(token))
+
+    cache = VerifiedTokenCache()
+
+    def cached_verification():
+        token_data = cache.get(token)
+        if token_data is None:
+            token_data = full_verification()
+            cache.set(token, token_data, token_data.exp.timestamp())
+        return token_data
+
+    rows = [
+        {"path": "decode_token + TokenPayload", "us_per_request": per_call_us(full_verification, args.repeat)},
+        {"path": "verified token cache", "us_per_request": per_call_us(cached_verification, args.repeat)},
+    ]
+
+    with Session(engine) as db:
+        for name, clear in (
+            ("get_current_user, no cache", lambda: (verified_token_cache.clear(), principal_cache.clear())),
+            ("get_current_user, cached", lambda: None),
+        ):
+            def dependency():
+                clear()
+                return get_current_user(db=db, token=token)
+
+            rows.append({"path": name, "us_per_request": per_call_us(dependency, args.repeat // 10)})
+
+    assert decode_access_token(token).sub == 1
+    print_table(rows, ["path", "us_per_request"])
+
+if __name__ == "__main__":
+    main()
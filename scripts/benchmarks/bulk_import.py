@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Benchmark de l'import en masse (db.bulk_import.BulkImporter).
+
+Génère des fichiers NDJSON synthétiques (utilisateurs, posts avec tags), les
+importe et mesure le débit en lignes insérées par seconde. Un échantillon est
+aussi importé via PostRepository.create (un post par transaction, comme l'API)
+pour comparaison.
+
+    python scripts/benchmarks/bulk_import.py --posts 1000000
+    python scripts/benchmarks/bulk_import.py --url postgresql://... --posts 10000000 --batch-size 50000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from common import make_engine, print_table, reset_schema
+
+from sqlalchemy.orm import Session
+
+from db.bulk_import import BulkImporter
+from db.repositories.post import PostRepository
+from schemas.post import PostCreate
+
+def write_files(directory: str, posts: int, users: int, tags: int, content_size: int):
+    rng = random.Random(42)
+    body = ("lorem ipsum dolor sit amet " * (content_size // 27 + 1))[:content_size]
+    users_path = os.path.join(directory, "users.ndjson")
+    posts_path = os.path.join(directory, "posts.ndjson")
+    with open(users_path, "w") as f:
+        for i in range(1, users + 1):
+            f.write(json.dumps({
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "hashed_password": "x",
+            }) + "\n")
+    with open(posts_path, "w") as f:
+        for i in range(1, posts + 1):
+            f.write(json.dumps({
+                "title": f"Post {i}",
+                "content": body,
+                "summary": f"Summary {i}",
+                "published": rng.random() < 0.8,
+                "author_id": rng.randint(1, users),
+                "tags": [f"tag{rng.randint(1, tags)}" for _ in range(3)],
+            }) + "\n")
+    return users_path, posts_path
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of the bulk import")
+    parser.add_argument("--url", default="sqlite://", help="Database URL (default: in-memory SQLite)")
+    parser.add_argument("--posts", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--content-size", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--baseline-posts", type=int, default=1000, help="Posts imported one by one for comparison")
+    args = parser.parse_args()
+
+    engine = make_engine(args.url)
+    reset_schema(engine)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        users_path, posts_path = write_files(
+            directory, args.posts, args.users, args.tags, args.content_size
+        )
+        with BulkImporter(engine, batch_size=args.batch_size) as importer:
+            for kind, load, path in (
+                ("users", importer.import_users, users_path),
+                ("posts", importer.import_posts, posts_path),
+            ):
+                start = time.perf_counter()
+                inserted = load(path)
+                elapsed = time.perf_counter() - start
+                rows.append({
+                    "method": f"bulk_import:{kind}",
+                    "rows": inserted,
+                    "seconds": elapsed,
+                    "rows_per_s": inserted / elapsed,
+                })
+
+    # Référence : un post à la fois via le repository
+    with Session(engine) as db:
+        post_repo = PostRepository(db)
+        start = time.perf_counter()
+        for i in range(args.baseline_posts):
+            post_repo.create(
+                PostCreate(title=f"Baseline {i}", content="x" * args.content_size, tags=["tag1", "tag2", "tag3"]),
+                author_id=1,
+            )
+        elapsed = time.perf_counter() - start
+    # Lignes posts + post_tags, comme pour l'import en masse
+    rows.append({
+        "method": "repository.create",
+        "rows": args.baseline_posts * 4,
+        "seconds": elapsed,
+        "rows_per_s": args.baseline_posts * 4 / elapsed,
+    })
+
+    print_table(rows, ["method", "rows", "seconds", "rows_per_s"])
+
+if __name__ == "__main__":
+    main()
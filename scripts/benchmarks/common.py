@@ -0,0 +1,151 @@
+"""Utilitaires partagés par les scripts de benchmark."""
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+# Ajout du répertoire src au chemin pour pouvoir importer les modules du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from models.base import Base  # noqa: E402
+from models.post import Post, PostTag, Tag  # noqa: E402
+from models.user import User, UserRole  # noqa: E402
+
+DEFAULT_URL = "sqlite://"
+
+def make_engine(url: str = DEFAULT_URL, echo: bool = False) -> Engine:
+    """Crée un moteur ; une base SQLite en mémoire est partagée entre connexions."""
+    if url == "sqlite://":
+        return create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            echo=echo,
+        )
+    return create_engine(url, echo=echo)
+
+def reset_schema(engine: Engine) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+def seed(
+    engine: Engine,
+    posts: int,
+    users: int = 100,
+    tags: int = 50,
+    tags_per_post: int = 3,
+    content_size: int = 2000,
+    batch_size: int = 5000,
+    content_factory: Optional[Callable[[random.Random, int], str]] = None,
+) -> None:
+    """
+    Insère un jeu de données synthétique (utilisateurs, tags, posts, post_tags).
+
+    `content_factory(rng, post_id)` permet de générer un contenu différent par post.
+    """
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    body = ("lorem ipsum dolor sit amet " * (content_size // 27 + 1))[:content_size]
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "id": i,
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "hashed_password": "x",
+                "role": UserRole.USER,
+                "is_active": True,
+                "is_superuser": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(Tag), [
+            {"id": i, "name": f"tag{i}", "created_at": now, "updated_at": now}
+            for i in range(1, tags + 1)
+        ])
+
+    post_id = 1
+    link_id = 1
+    while post_id <= posts:
+        batch_end = min(post_id + batch_size, posts + 1)
+        post_rows: List[Dict[str, Any]] = []
+        link_rows: List[Dict[str, Any]] = []
+        for i in range(post_id, batch_end):
+            created = now - timedelta(minutes=posts - i)
+            post_rows.append({
+                "id": i,
+                "title": f"Post {i}",
+                "content": content_factory(rng, i) if content_factory else body,
+                "summary": f"Summary {i}",
+                "published": rng.random() < 0.8,
+                "author_id": rng.randint(1, users),
+                "views_count": 0,
+                "created_at": created,
+                "updated_at": created,
+            })
+            # Distribution biaisée : quelques tags très populaires
+            for tag_id in {min(int(rng.paretovariate(1.2)), tags) for _ in range(tags_per_post)}:
+                link_rows.append({
+                    "id": link_id,
+                    "post_id": i,
+                    "tag_id": tag_id,
+                    "created_at": created,
+                    "updated_at": created,
+                })
+                link_id += 1
+        with engine.begin() as conn:
+            conn.execute(insert(Post), post_rows)
+            conn.execute(insert(PostTag), link_rows)
+        post_id = batch_end
+
+def zipf_text_factory(vocabulary_size: int = 20000, words: int = 300) -> Callable[[random.Random, int], str]:
+    """Génère des textes dont les mots suivent une loi de Zipf, comme un corpus réel."""
+    vocabulary = [f"w{i}" for i in range(vocabulary_size)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary_size)))
+
+    def factory(rng: random.Random, post_id: int) -> str:
+        return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=words))
+    return factory
+
+def measure(func: Callable[[], Any], repeat: int = 20, warmup: int = 2) -> Dict[str, float]:
+    """Exécute `func` plusieurs fois et retourne les latences en millisecondes."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "min_ms": timings[0],
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "max_ms": timings[-1],
+    }
+
+def print_table(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    widths = {
+        col: max(len(col), *(len(_format(row.get(col))) for row in rows)) if rows else len(col)
+        for col in columns
+    }
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print("  ".join(_format(row.get(col)).ljust(widths[col]) for col in columns))
+
+def _format(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
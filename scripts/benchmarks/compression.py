@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""
+Taille et coût CPU de la compression d'une page de posts, par encodage.
+
+Pour chaque encodage disponible (gzip, et br / zstd si brotli / zstandard sont
+installés), mesure le taux de compression d'une `PostPage` de `--page-size`
+posts et le temps de compression par requête, que les entrées de cache
+précompressées évitent sur les hits.
+
+    python scripts/benchmarks/compression.py --page-size 100 --content-size 5000
+"""
+import argparse
+
+from common import make_engine, measure, print_table, reset_schema, seed
+
+from sqlalchemy.orm import Session
+
+from core.compression import BROTLI_AVAILABLE, ZSTD_AVAILABLE, compress
+from core.serialization import encode_model
+from db.repositories.post import PostRepository
+from schemas.post import PostPage
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response compression ratio and CPU per encoding")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--content-size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = make_engine()
+    reset_schema(engine)
+    seed(engine, posts=args.page_size, content_size=args.content_size)
+    with Session(engine) as db:
+        posts, total = PostRepository(db).get_multi(limit=args.page_size)
+        body = encode_model(PostPage, {"items": posts, "total": total, "page": 1, "size": args.page_size, "pages": 1})
+
+    encodings = ["gzip"] + (["br"] if BROTLI_AVAILABLE else []) + (["zstd"] if ZSTD_AVAILABLE else [])
+    rows = [{"encoding": "identity", "kib": len(body) / 1024, "ratio": 1.0, "median_ms": 0.0}]
+    for encoding in encodings:
+        compressed = compress(body, encoding)
+        timings = measure(lambda: compress(body, encoding), repeat=args.repeat)
+        rows.append({
+            "encoding": encoding,
+            "kib": len(compressed) / 1024,
+            "ratio": len(body) / len(compressed),
+            "median_ms": timings["median_ms"],
+        })
+    print_table(rows, ["encoding", "kib", "ratio", "median_ms"])
+
+if __name__ == "__main__":
+    main()
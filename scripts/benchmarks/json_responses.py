@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Débit de sérialisation d'une page de posts (`PostPage`) selon la classe de réponse.
+
+Une application FastAPI minimale sert la même page de `--page-size` posts
+(objets ORM chargés une fois) avec :
+
+- `JSONResponse` de Starlette (json de la bibliothèque standard) ;
+- `FastJSONResponse` de core.serialization (orjson) ;
+- la classe par défaut de FastAPI, qui sérialise directement avec Pydantic
+  quand la route a un `response_model`.
+
+Chaque variante est mesurée avec et sans `response_model`, ainsi que le
+chemin « cache » : un dict décodé depuis Redis, revalidé puis resérialisé.
+Les routes `encoded` et `cached_bytes` suivent le chemin des endpoints de
+posts : validation et encodage en une passe (`encode_model`), et bytes du
+cache renvoyés tels quels.
+
+    python scripts/benchmarks/json_responses.py --page-size 100 --requests 2000
+"""
+import argparse
+import json
+import time
+
+from common import make_engine, print_table, reset_schema, seed
+
+from fastapi import APIRouter, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from core.serialization import ORJSON_AVAILABLE, FastJSONResponse, dumps, encode_model, json_response, loads
+from db.repositories.post import PostRepository
+from schemas.post import PostPage
+
+RESPONSE_CLASSES = {
+    "starlette json": JSONResponse,
+    "core.serialization": FastJSONResponse,
+    "fastapi default": None,
+}
+
+def build_app(page: dict, cached: bytes, response_class) -> FastAPI:
+    router = APIRouter()
+
+    @router.get("/model", response_model=PostPage)
+    def with_model():
+        return page
+
+    @router.get("/cached", response_model=PostPage)
+    def from_cache():
+        return loads(cached)
+
+    plain = loads(cached)
+
+    @router.get("/dict")
+    def without_model():
+        return plain
+
+    @router.get("/encoded", response_model=PostPage)
+    def encoded():
+        return json_response(encode_model(PostPage, page))
+
+    @router.get("/cached_bytes", response_model=PostPage)
+    def cached_bytes():
+        return json_response(cached)
+
+    kwargs = {} if response_class is None else {"default_response_class": response_class}
+    app = FastAPI(**kwargs)
+    app.include_router(router)
+    return app
+
+def throughput(client: TestClient, path: str, requests: int) -> float:
+    for _ in range(20):
+        client.get(path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(path)
+    return requests / (time.perf_counter() - start)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PostPage serialization throughput per response class")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--content-size", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    engine = make_engine()
+    reset_schema(engine)
+    seed(engine, posts=args.page_size, content_size=args.content_size)
+    with Session(engine, expire_on_commit=False) as db:
+        posts, total = PostRepository(db).get_multi(limit=args.page_size)
+        page = {"items": posts, "total": total, "page": 1, "size": args.page_size, "pages": 1}
+        cached = dumps(PostPage.model_validate(page))
+        # Encodage seul, hors pile HTTP
+        start = time.perf_counter()
+        for _ in range(200):
+            json.dumps(jsonable_encoder(PostPage.model_validate(page)))
+        stdlib_ms = (time.perf_counter() - start) / 200 * 1000
+        start = time.perf_counter()
+        for _ in range(200):
+            dumps(PostPage.model_validate(page))
+        shared_ms = (time.perf_counter() - start) / 200 * 1000
+
+        rows = []
+        for name, response_class in RESPONSE_CLASSES.items():
+            client = TestClient(build_app(page, cached, response_class))
+            row = {"response_class": name}
+            for path in ("/model", "/cached", "/dict", "/encoded", "/cached_bytes"):
+                row[f"{path[1:]}_req_s"] = throughput(client, path, args.requests)
+            rows.append(row)
+
+    print(f"{len(cached) / 1024:.1f} KiB per page, orjson={'yes' if ORJSON_AVAILABLE else 'no'}")
+    print(f"cache encoding: jsonable_encoder+json.dumps {stdlib_ms:.3f} ms, core.serialization.dumps {shared_ms:.3f} ms")
+    print_table(rows, list(rows[0].keys()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Coût de signature et de vérification d'un access token par algorithme.
+
+HS256 (secret partagé, seul ce service peut vérifier) contre ES256 et EdDSA
+(clé publique diffusée par /.well-known/jwks.json), via core.jwt_keys.KeySet.
+
+    python scripts/benchmarks/jwt_algorithms.py --repeat 5000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from common import print_table
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from core.jwt_keys import KeySet, SigningKey
+
+def per_call_us(func, repeat: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JWT sign/verify cost per algorithm")
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    key_sets = {
+        "HS256": KeySet("HS256", secret="x" * 64),
+        "ES256": KeySet("ES256", keys=[SigningKey("ES256", ec.generate_private_key(ec.SECP256R1()))]),
+        "EdDSA": KeySet("EdDSA", keys=[SigningKey("EdDSA", ed25519.Ed25519PrivateKey.generate())]),
+    }
+    payload = {"sub": "1", "exp": datetime.utcnow() + timedelta(minutes=30)}
+
+    rows = []
+    for algorithm, key_set in key_sets.items():
+        token = key_set.encode(payload)
+        rows.append({
+            "algorithm": algorithm,
+            "sign_us": per_call_us(lambda: key_set.encode(payload), args.repeat),
+            "verify_us": per_call_us(lambda: key_set.decode(token), args.repeat),
+            "token_bytes": len(token),
+        })
+
+    print_table(rows, ["algorithm", "sign_us", "verify_us", "token_bytes"])
+
+if __name__ == "__main__":
+    main()
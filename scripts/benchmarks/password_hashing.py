@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Effet d'une rafale de connexions sur les autres endpoints synchrones.
+
+Lance `--logins` vérifications bcrypt simultanées, soit dans le pool de
+threads partagé d'AnyIO (comportement des endpoints `def`), soit dans le pool
+dédié de core.password_hashing, et mesure pendant ce temps la latence d'une
+tâche courte passant par le pool partagé (comme `get_tags`).
+
+    python scripts/benchmarks/password_hashing.py --logins 200
+    python scripts/benchmarks/password_hashing.py --executor process --workers 8
+"""
+import argparse
+import statistics
+import time
+
+from common import print_table
+
+import anyio
+from fastapi.concurrency import run_in_threadpool
+
+from core.password_hashing import PasswordExecutor, PasswordHashingBusy
+from core.security import get_password_hash, verify_password
+
+async def scenario(name: str, args: argparse.Namespace, verify) -> dict:
+    hashed = get_password_hash("password123")
+    latencies, outcomes = [], {"ok": 0, "rejected": 0}
+
+    async def login() -> None:
+        try:
+            await verify("password123", hashed)
+            outcomes["ok"] += 1
+        except PasswordHashingBusy:
+            outcomes["rejected"] += 1
+
+    async def probe() -> None:
+        # Tâche d'endpoint synchrone : quasi instantanée si un thread est libre
+        for _ in range(args.probes):
+            start = time.perf_counter()
+            await run_in_threadpool(lambda: None)
+            latencies.append((time.perf_counter() - start) * 1000)
+            await anyio.sleep(args.probe_interval)
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        for _ in range(args.logins):
+            tg.start_soon(login)
+        tg.start_soon(probe)
+    latencies.sort()
+    return {
+        "scenario": name,
+        "logins_ok": outcomes["ok"],
+        "rejected_503": outcomes["rejected"],
+        "seconds": time.perf_counter() - start,
+        "probe_p50_ms": statistics.median(latencies),
+        "probe_p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Login burst vs shared thread pool")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=32)
+    parser.add_argument("--probes", type=int, default=50)
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    args = parser.parse_args()
+
+    executor = PasswordExecutor(
+        workers=args.workers,
+        max_queue=args.queue_size,
+        use_processes=args.executor == "process",
+    )
+
+    async def shared_pool(plain: str, hashed: str) -> bool:
+        return await run_in_threadpool(verify_password, plain, hashed)
+
+    async def run_all():
+        return [
+            await scenario("shared anyio pool", args, shared_pool),
+            await scenario(f"dedicated {args.executor} pool", args, executor.verify),
+        ]
+
+    rows = anyio.run(run_all)
+    executor.shutdown()
+    print_table(rows, list(rows[0].keys()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Benchmark de la liste de posts : vue `full` contre vue `summary`.
+
+Pour des pages de 100 posts, mesure la taille de la réponse JSON, le volume
+de données lu depuis la base (somme des valeurs renvoyées par les requêtes
+réellement émises) et la latence repository + sérialisation.
+
+    python scripts/benchmarks/post_list_projection.py --posts 10000 --content-size 5000
+"""
+import argparse
+import json
+from typing import Any
+
+from common import make_engine, measure, print_table, reset_schema, seed
+from post_queries import capture_statements
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from db.repositories.post import PostRepository
+from schemas.post import PostPage, PostSummaryPage
+
+def value_size(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return len(str(value).encode())
+
+def db_bytes_read(session: Session, statements) -> int:
+    """Ré-exécute les requêtes capturées et additionne la taille des valeurs lues."""
+    conn = session.connection()
+    total = 0
+    for statement, parameters in statements:
+        for row in conn.exec_driver_sql(statement, parameters):
+            total += sum(value_size(value) for value in row)
+    return total
+
+def list_page(engine, view: str, page_size: int) -> bytes:
+    """Reproduit l'endpoint de liste : repository, puis sérialisation de la réponse."""
+    page_model = PostSummaryPage if view == "summary" else PostPage
+    with Session(engine) as db:
+        posts, total = PostRepository(db).get_multi(limit=page_size, summary=view == "summary")
+        response = page_model.model_validate({
+            "items": posts,
+            "total": total,
+            "page": 1,
+            "size": page_size,
+            "pages": (total + page_size - 1) // page_size,
+        })
+        return json.dumps(jsonable_encoder(response)).encode()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of the post list summary view")
+    parser.add_argument("--url", default="sqlite://", help="Database URL (default: in-memory SQLite)")
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--content-size", type=int, default=5000, help="Characters of content per post")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = make_engine(args.url)
+    reset_schema(engine)
+    seed(engine, posts=args.posts, content_size=args.content_size)
+
+    rows = []
+    for view in ("full", "summary"):
+        with Session(engine) as db:
+            # Inclut les chargements paresseux déclenchés par la sérialisation
+            statements = capture_statements(
+                db, lambda: list_page(engine, view, args.page_size)
+            )
+            db_bytes = db_bytes_read(db, statements)
+        payload = list_page(engine, view, args.page_size)
+        timings = measure(lambda: list_page(engine, view, args.page_size), repeat=args.repeat)
+        rows.append({
+            "view": view,
+            "queries": len(statements),
+            "db_kb": db_bytes / 1024,
+            "payload_kb": len(payload) / 1024,
+            **timings,
+        })
+
+    print_table(rows, list(rows[0].keys()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Benchmark des requêtes de liste de posts (PostRepository.get_multi).
+
+Insère N posts, puis pour chaque combinaison de filtres enregistre le plan
+d'exécution (EXPLAIN) des requêtes réellement émises par le repository et
+leurs latences.
+
+    python scripts/benchmarks/post_queries.py --posts 100000
+    python scripts/benchmarks/post_queries.py --url postgresql://... --posts 1000000 --output plans.json
+"""
+import argparse
+import json
+from typing import Any, Dict, List
+
+from common import make_engine, measure, print_table, reset_schema, seed
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from db.repositories.post import PostRepository
+
+FILTERS: Dict[str, Dict[str, Any]] = {
+    "none": {},
+    "author": {"author_id": 7},
+    "published": {"published": True},
+    "tag": {"tag": "tag1"},
+    "rare_tag": {"tag": "tag40"},
+    "author+published": {"author_id": 7, "published": True},
+    "tag+published": {"tag": "tag1", "published": True},
+    "author+tag+published": {"author_id": 7, "tag": "tag1", "published": True},
+}
+
+def explain_prefix(dialect: str) -> str:
+    if dialect == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    return "EXPLAIN "
+
+def capture_statements(session: Session, func) -> List[tuple]:
+    """Exécute `func` en enregistrant les requêtes SQL émises."""
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return statements
+
+def explain(session: Session, statement: str, parameters: Any) -> List[str]:
+    dialect = session.get_bind().dialect.name
+    conn = session.connection()
+    rows = conn.exec_driver_sql(explain_prefix(dialect) + statement, parameters).fetchall()
+    return [" | ".join(str(col) for col in row) for row in rows]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark PostRepository.get_multi")
+    parser.add_argument("--url", default="sqlite://", help="Database URL (default: in-memory SQLite)")
+    parser.add_argument("--posts", type=int, default=100_000, help="Number of posts to seed")
+    parser.add_argument("--limit", type=int, default=10, help="Page size")
+    parser.add_argument("--skip", type=int, default=0, help="Offset")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per filter")
+    parser.add_argument("--no-seed", action="store_true", help="Reuse existing data")
+    parser.add_argument("--output", help="Write plans and timings as JSON to this file")
+    args = parser.parse_args()
+
+    engine = make_engine(args.url)
+    if not args.no_seed:
+        print(f"Seeding {args.posts} posts...")
+        reset_schema(engine)
+        seed(engine, args.posts)
+        if engine.dialect.name == "postgresql":
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("ANALYZE"))
+        elif engine.dialect.name == "sqlite":
+            with engine.begin() as conn:
+                conn.execute(text("ANALYZE"))
+
+    results = []
+    with Session(engine) as session:
+        repo = PostRepository(session)
+        for name, filters in FILTERS.items():
+            def run():
+                repo.get_multi(skip=args.skip, limit=args.limit, **filters)
+                session.expunge_all()
+
+            statements = capture_statements(session, run)
+            plans = [
+                {"sql": sql, "plan": explain(session, sql, params)}
+                for sql, params in statements
+            ]
+            timings = measure(run, repeat=args.repeat)
+            results.append({"filter": name, **timings, "plans": plans})
+
+    print_table(results, ["filter", "min_ms", "median_ms", "p95_ms", "max_ms"])
+    for result in results:
+        print(f"\n== {result['filter']}")
+        for plan in result["plans"]:
+            print(plan["sql"].replace("\n", " "))
+            for line in plan["plan"]:
+                print(f"    {line}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Benchmark de la recherche plein texte (PostRepository.search).
+
+Génère un corpus dont le vocabulaire suit une loi de Zipf, puis mesure la
+latence de recherches sur des termes fréquents, moyens et rares, avec et
+sans filtres, ainsi que le parcours de plusieurs pages par curseur.
+
+    python scripts/benchmarks/post_search.py --posts 1000000
+    python scripts/benchmarks/post_search.py --url postgresql://... --posts 1000000
+"""
+import argparse
+
+from common import make_engine, measure, print_table, reset_schema, seed, zipf_text_factory
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from db.repositories.post import PostRepository
+
+QUERIES = {
+    "frequent term": {"q": "w1"},
+    "medium term": {"q": "w150"},
+    "rare term": {"q": "w15000"},
+    "two terms": {"q": "w3 w40"},
+    "frequent + tag": {"q": "w1", "tag": "tag2"},
+    "frequent + author": {"q": "w1", "author_id": 7},
+    "frequent + published": {"q": "w1", "published": True},
+}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark PostRepository.search")
+    parser.add_argument("--url", default="sqlite://", help="Database URL (default: in-memory SQLite)")
+    parser.add_argument("--posts", type=int, default=100_000, help="Number of posts to seed")
+    parser.add_argument("--words", type=int, default=300, help="Words per post")
+    parser.add_argument("--limit", type=int, default=20, help="Page size")
+    parser.add_argument("--pages", type=int, default=5, help="Pages walked with the cursor")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--no-seed", action="store_true", help="Reuse existing data")
+    args = parser.parse_args()
+
+    engine = make_engine(args.url)
+    if not args.no_seed:
+        print(f"Seeding {args.posts} posts...")
+        reset_schema(engine)
+        seed(engine, args.posts, content_factory=zipf_text_factory(words=args.words))
+        if engine.dialect.name == "postgresql":
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("ANALYZE"))
+
+    rows = []
+    with Session(engine) as session:
+        repo = PostRepository(session)
+        for name, params in QUERIES.items():
+            def first_page():
+                repo.search(limit=args.limit, **params)
+                session.expunge_all()
+
+            def walk_pages():
+                after = None
+                for _ in range(args.pages):
+                    results = repo.search(limit=args.limit, after=after, **params)
+                    if len(results) < args.limit:
+                        break
+                    post, rank = results[-1]
+                    after = (rank, post.id)
+                session.expunge_all()
+
+            hits = len(repo.search(limit=args.limit, **params))
+            first = measure(first_page, repeat=args.repeat)
+            walked = measure(walk_pages, repeat=max(1, args.repeat // 4))
+            rows.append({
+                "query": name,
+                "hits": hits,
+                "first_page_median_ms": first["median_ms"],
+                "first_page_p95_ms": first["p95_ms"],
+                f"{args.pages}_pages_median_ms": walked["median_ms"],
+            })
+
+    print_table(rows, list(rows[0].keys()))
+
+if __name__ == "__main__":
+    main()
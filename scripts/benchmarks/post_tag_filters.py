@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Benchmark du filtre multi-tags de PostRepository.get_multi (`tags`, `tag_mode`).
+
+Mesure la latence des modes `any` (semi-jointure IN) et `all` (GROUP BY ...
+HAVING COUNT) quand le nombre de tags demandés augmente, pour des tags
+populaires et des tags rares.
+
+    python scripts/benchmarks/post_tag_filters.py --posts 100000
+    python scripts/benchmarks/post_tag_filters.py --url postgresql://... --posts 1000000 --explain
+"""
+import argparse
+
+from common import make_engine, measure, print_table, reset_schema, seed
+from post_queries import capture_statements, explain
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from db.repositories.post import PostRepository
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of multi-tag filtering")
+    parser.add_argument("--url", default="sqlite://", help="Database URL (default: in-memory SQLite)")
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--tags", type=int, default=50)
+    parser.add_argument("--tags-per-post", type=int, default=5)
+    parser.add_argument("--cardinalities", default="1,2,3,5,8", help="Numbers of tags per request")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--explain", action="store_true", help="Print the plan of each query")
+    args = parser.parse_args()
+
+    engine = make_engine(args.url)
+    print(f"Seeding {args.posts} posts...")
+    reset_schema(engine)
+    seed(engine, args.posts, tags=args.tags, tags_per_post=args.tags_per_post)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    # Le seed favorise les premiers tags (loi de Pareto)
+    tag_sets = {
+        "popular": [f"tag{i}" for i in range(1, args.tags + 1)],
+        "rare": [f"tag{i}" for i in range(args.tags, 0, -1)],
+    }
+
+    rows = []
+    with Session(engine) as session:
+        repo = PostRepository(session)
+        for n in (int(value) for value in args.cardinalities.split(",")):
+            for popularity, names in tag_sets.items():
+                for mode in ("any", "all"):
+                    filters = {"tags": names[:n], "tag_mode": mode}
+
+                    def run():
+                        result = repo.get_multi(limit=10, **filters)
+                        session.expunge_all()
+                        return result
+
+                    _, total = run()
+                    if args.explain:
+                        for sql, params in capture_statements(session, run):
+                            print(f"-- {n} {popularity} tags, mode={mode}\n{sql}")
+                            print("\n".join(explain(session, sql, params)))
+                    rows.append({
+                        "tags": n,
+                        "popularity": popularity,
+                        "mode": mode,
+                        "matches": total,
+                        **measure(run, repeat=args.repeat),
+                    })
+
+    print_table(rows, list(rows[0].keys()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Microbenchmark du coût Python par appel des lectures "chaudes" des repositories.
+
+Compare, contre SQLite en mémoire (coût SQL quasi nul), la construction legacy
+`db.query(...).filter(...)`, un `select()` reconstruit à chaque appel, un
+`lambda_stmt` et les requêtes pré-construites avec `bindparam` utilisées par
+les repositories (appel complet, décorateurs compris).
+
+    python scripts/benchmarks/repository_overhead.py --calls 20000
+"""
+import argparse
+import time
+
+from common import make_engine, print_table, reset_schema, seed
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from db.repositories.post import PostRepository
+from db.repositories.user import UserRepository
+from models.post import Post, Tag
+from models.user import User
+
+def legacy_user_get(db: Session, id: int):
+    return db.query(User).filter(User.id == id).first()
+
+def legacy_username(db: Session, username: str):
+    return db.query(User).filter(User.username == username).first()
+
+def legacy_post_get(db: Session, post_id: int):
+    return db.query(Post).filter(Post.id == post_id).first()
+
+def legacy_tag(db: Session, name: str):
+    return db.query(Tag).filter(Tag.name == name).first()
+
+def select_user_get(db: Session, id: int):
+    return db.scalars(select(User).where(User.id == id)).first()
+
+def select_username(db: Session, username: str):
+    return db.scalars(select(User).where(User.username == username)).first()
+
+def select_post_get(db: Session, post_id: int):
+    return db.scalars(select(Post).where(Post.id == post_id)).first()
+
+def select_tag(db: Session, name: str):
+    return db.scalars(select(Tag).where(Tag.name == name)).first()
+
+def lambda_user_get(db: Session, id: int):
+    return db.scalars(lambda_stmt(lambda: select(User).where(User.id == id))).first()
+
+def lambda_username(db: Session, username: str):
+    return db.scalars(lambda_stmt(lambda: select(User).where(User.username == username))).first()
+
+def lambda_post_get(db: Session, post_id: int):
+    return db.scalars(lambda_stmt(lambda: select(Post).where(Post.id == post_id))).first()
+
+def lambda_tag(db: Session, name: str):
+    return db.scalars(lambda_stmt(lambda: select(Tag).where(Tag.name == name))).first()
+
+def run(db: Session, func, args_for, calls: int) -> float:
+    """Retourne le temps moyen par appel en microsecondes."""
+    for i in range(min(calls, 500)):
+        func(*args_for(i))
+        db.expunge_all()
+    start = time.perf_counter()
+    for i in range(calls):
+        func(*args_for(i))
+        # Vider l'identity map pour mesurer le chemin complet à chaque appel
+        db.expunge_all()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-call overhead of hot repository reads")
+    parser.add_argument("--calls", type=int, default=20_000, help="Calls per variant")
+    args = parser.parse_args()
+
+    engine = make_engine()
+    reset_schema(engine)
+    seed(engine, posts=1000, users=100, tags=50)
+
+    rows = []
+    with Session(engine) as db:
+        users, posts = UserRepository(db), PostRepository(db)
+        cases = {
+            "UserRepository.get": (
+                lambda i: (db, i % 100 + 1),
+                legacy_user_get, select_user_get, lambda_user_get,
+                lambda db_, id_: users.get(id_),
+            ),
+            "UserRepository.get_by_username": (
+                lambda i: (db, f"user{i % 100 + 1}"),
+                legacy_username, select_username, lambda_username,
+                lambda db_, name: users.get_by_username(name),
+            ),
+            "PostRepository.get": (
+                lambda i: (db, i % 1000 + 1),
+                legacy_post_get, select_post_get, lambda_post_get,
+                lambda db_, id_: posts.get(id_),
+            ),
+            "PostRepository.get_tag_by_name": (
+                lambda i: (db, f"tag{i % 50 + 1}"),
+                legacy_tag, select_tag, lambda_tag,
+                lambda db_, name: posts.get_tag_by_name(name),
+            ),
+        }
+        for name, (args_for, legacy, plain_select, lambda_variant, repository) in cases.items():
+            legacy_us = run(db, legacy, args_for, args.calls)
+            repository_us = run(db, repository, args_for, args.calls)
+            rows.append({
+                "query": name,
+                "legacy_query_us": legacy_us,
+                "select_us": run(db, plain_select, args_for, args.calls),
+                "lambda_stmt_us": run(db, lambda_variant, args_for, args.calls),
+                "repository_us": repository_us,
+                "speedup_vs_legacy": legacy_us / repository_us,
+            })
+
+    print_table(rows, list(rows[0].keys()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Allers-retours base de données par écriture (PostRepository / UserRepository).
+
+Compte les requêtes SQL et les COMMIT émis par chaque opération d'écriture,
+puis par la sérialisation de la réponse comme le ferait l'endpoint.
+
+    python scripts/benchmarks/write_round_trips.py
+    python scripts/benchmarks/write_round_trips.py --url postgresql://...
+"""
+import argparse
+
+from common import make_engine, print_table, reset_schema, seed
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from db.repositories.post import PostRepository
+from db.repositories.user import UserRepository
+from db.session import SessionLocal
+from schemas.post import Post as PostSchema, PostCreate, PostUpdate
+from schemas.user import User as UserSchema, UserCreate, UserUpdate
+
+def count_round_trips(engine, func):
+    """Exécute `func` et retourne (requêtes SQL, COMMIT) émis."""
+    counts = {"statements": 0, "commits": 0}
+
+    def on_execute(*args):
+        counts["statements"] += 1
+
+    def on_commit(conn):
+        counts["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(engine, "commit", on_commit)
+    return counts["statements"], counts["commits"]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Round trips per write operation")
+    parser.add_argument("--url", default="sqlite://", help="Database URL (default: in-memory SQLite)")
+    args = parser.parse_args()
+
+    engine = make_engine(args.url)
+    reset_schema(engine)
+    seed(engine, posts=100, users=10, tags=5)
+    # Même configuration de session que l'application
+    Session = sessionmaker(bind=engine, **{
+        key: SessionLocal.kw[key] for key in ("autoflush", "expire_on_commit") if key in SessionLocal.kw
+    })
+
+    operations = {
+        "create post (2 existing + 2 new tags)": lambda repo, users: jsonable_encoder(PostSchema.model_validate(
+            repo.create(PostCreate(title="New", content="Content", tags=["tag1", "tag2", "new1", "new2"]), author_id=1)
+        )),
+        "create post (no tags)": lambda repo, users: jsonable_encoder(PostSchema.model_validate(
+            repo.create(PostCreate(title="New", content="Content"), author_id=1)
+        )),
+        "update post (title)": lambda repo, users: jsonable_encoder(PostSchema.model_validate(
+            repo.update(1, PostUpdate(title="Updated"), current_user_id=repo.get(1).author_id)
+        )),
+        "update post (tags)": lambda repo, users: jsonable_encoder(PostSchema.model_validate(
+            repo.update(2, PostUpdate(tags=["tag3", "new3"]), current_user_id=repo.get(2).author_id)
+        )),
+        "delete post": lambda repo, users: repo.delete(3, current_user_id=repo.get(3).author_id),
+        "create user": lambda repo, users: jsonable_encoder(UserSchema.model_validate(
+            users.create(UserCreate(email="new@example.com", username="new", password="password123"))
+        )),
+        "update user": lambda repo, users: jsonable_encoder(UserSchema.model_validate(
+            users.update(1, UserUpdate(email="user1@example.com", username="user1", full_name="Updated Name"))
+        )),
+    }
+
+    rows = []
+    for name, operation in operations.items():
+        with Session() as db:
+            repo, users = PostRepository(db), UserRepository(db)
+            statements, commits = count_round_trips(engine, lambda: operation(repo, users))
+        rows.append({"operation": name, "statements": statements, "commits": commits, "round_trips": statements + commits})
+
+    print_table(rows, ["operation", "statements", "commits", "round_trips"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Calibre le coût du hachage des mots de passe pour la machine courante.
+
+Mesure le temps d'un hachage pour des coûts croissants et propose la valeur la
+plus élevée qui reste sous la cible, à reporter dans le .env du déploiement.
+
+    python scripts/calibrate_password_hash.py --target-ms 100
+    python scripts/calibrate_password_hash.py --scheme argon2 --target-ms 100 --memory-cost 32768 --parallelism 2
+"""
+import argparse
+import os
+import sys
+
+# Ajout du répertoire src au chemin pour pouvoir importer les modules du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'src'))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Calibrate the password hash cost')
+    parser.add_argument('--scheme', choices=['bcrypt', 'argon2'], default='bcrypt')
+    parser.add_argument('--target-ms', type=float, default=100.0, help='Target duration of one hash')
+    parser.add_argument('--samples', type=int, default=3, help='Hashes measured per cost')
+    parser.add_argument('--memory-cost', type=int, default=65536, help='argon2 memory, in KiB')
+    parser.add_argument('--parallelism', type=int, default=4, help='argon2 lanes')
+    return parser.parse_args()
+
+def main():
+    from core.password_hashing import calibrate
+
+    args = parse_args()
+    cost, measurements = calibrate(
+        args.scheme,
+        args.target_ms,
+        samples=args.samples,
+        argon2_memory_cost=args.memory_cost,
+        argon2_parallelism=args.parallelism,
+    )
+
+    for measurement in measurements:
+        marker = ' <-' if measurement['cost'] == cost else ''
+        print(f"cost={measurement['cost']:>3}  {measurement['ms']:>9.1f} ms{marker}")
+    if measurements[0]['ms'] > args.target_ms:
+        print(f"\nEven the lowest cost exceeds {args.target_ms:.0f} ms on this machine", file=sys.stderr)
+
+    print(f"\nPASSWORD_HASH_SCHEME={args.scheme}")
+    if args.scheme == 'bcrypt':
+        print(f"BCRYPT_ROUNDS={cost}")
+    else:
+        print(f"ARGON2_TIME_COST={cost}")
+        print(f"ARGON2_MEMORY_COST={args.memory_cost}")
+        print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""
+Génère une clé privée de signature des JWT (PEM, PKCS#8) pour ES256 ou EdDSA.
+
+    python scripts/generate_jwt_key.py --algorithm EdDSA --out keys/jwt-2024-06.pem
+
+Rotation : placer la nouvelle clé en tête de JWT_SIGNING_KEYS et garder
+l'ancienne derrière elle tant que des tokens signés avec elle peuvent encore
+être présentés (durée de vie des refresh tokens).
+"""
+import argparse
+import os
+import sys
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+# Ajout du répertoire src au chemin pour pouvoir importer les modules du projet
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'src'))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate a JWT signing key')
+    parser.add_argument('--algorithm', choices=['ES256', 'EdDSA'], default='EdDSA')
+    parser.add_argument('--out', required=True, help='Private key file (PEM)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.algorithm == 'ES256':
+        key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        key = ed25519.Ed25519PrivateKey.generate()
+
+    pem = key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    fd = os.open(args.out, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(pem)
+
+    from core.jwt_keys import SigningKey
+    print(f"{args.out}: kid={SigningKey(args.algorithm, key).kid}")
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,9 @@ import sys
 import subprocess
 
 # Ajout du répertoire parent au chemin pour pouvoir importer les modules du projet
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, 'src'))
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Database migration script')
@@ -32,12 +34,53 @@ def parse_args():
     # Commande reset
     subparsers.add_parser('reset', help='Reset the database')
     
+    # Commande import
+    import_parser = subparsers.add_parser('import', help='Bulk import users, tags and posts from NDJSON/CSV files')
+    import_parser.add_argument('--users', help='Users file')
+    import_parser.add_argument('--tags', help='Tags file')
+    import_parser.add_argument('--posts', help='Posts file')
+    import_parser.add_argument('--format', choices=['ndjson', 'csv'], help='File format (default: from the extension)')
+    import_parser.add_argument('--batch-size', type=int, default=10000, help='Records per transaction')
+    import_parser.add_argument('--hash-workers', type=int, default=1, help='Processes used to hash passwords')
+    import_parser.add_argument('--checkpoint', help='Checkpoint file, to resume an interrupted import')
+    import_parser.add_argument('--database-url', help='Database URL (default: from settings)')
+    
     return parser.parse_args()
 
 def run_command(command):
     process = subprocess.Popen(command, shell=True)
     return process.wait()
 
+def run_import(args):
+    from sqlalchemy import create_engine
+
+    from core.config import settings
+    from db.bulk_import import BulkImporter
+
+    if not (args.users or args.tags or args.posts):
+        print('Nothing to import: pass --users, --tags and/or --posts.')
+        return 1
+
+    def progress(kind, records, rows_per_second):
+        print(f'{kind}: {records} records imported ({rows_per_second:,.0f} rows/s)', flush=True)
+
+    engine = create_engine(args.database_url or settings.SQLALCHEMY_DATABASE_URI)
+    with BulkImporter(
+        engine,
+        batch_size=args.batch_size,
+        hash_workers=args.hash_workers,
+        checkpoint_path=args.checkpoint,
+        progress=progress,
+    ) as importer:
+        # Ordre imposé par les clés étrangères
+        if args.users:
+            importer.import_users(args.users, args.format)
+        if args.tags:
+            importer.import_tags(args.tags, args.format)
+        if args.posts:
+            importer.import_posts(args.posts, args.format)
+    return 0
+
 def main():
     args = parse_args()
     
@@ -77,6 +120,9 @@ def main():
         print(f'Running: {cmd}')
         return run_command(cmd)
     
+    elif args.command == 'import':
+        return run_import(args)
+    
     else:
         print('Unknown command. Use --help for usage info.')
         return 1
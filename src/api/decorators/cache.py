@@ -8,6 +8,7 @@ from fastapi import Depends, Request
 from pydantic import BaseModel
 
 from core.cache_base import is_redis_available, redis_client
+from core.serialization import dumps, loads
 
 logger = logging.getLogger(__name__)
 
@@ -86,7 +87,7 @@ def cache(
                 cached_result = redis_client.get(cache_key)
                 if cached_result:
                     try:
-                        return json.loads(cached_result)
+                        return loads(cached_result)
                     except Exception as e:
                         logger.warning(f"Failed to parse cached result: {e}")
                 
@@ -96,7 +97,7 @@ def cache(
                 # Cache the result
                 try:
                     # Serialize result
-                    serialized_result = json.dumps(result)
+                    serialized_result = dumps(result)
                     redis_client.setex(cache_key, expire, serialized_result)
                 except Exception as e:
                     logger.warning(f"Failed to cache result: {e}")
@@ -1,38 +1,57 @@
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from db.session import get_db
 from db.repositories.user import UserRepository
 from core.config import settings
-from core.security import decode_token
-from models.user import User, UserRole
-from schemas.user import TokenPayload
+from core.principal_cache import Principal, principal_cache
+from core.revocation import revocation_list
+from core.security import TokenError, decode_access_token
+from models.user import UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """Principal depuis le cache, ou depuis la base (puis mis en cache) en cas d'absence."""
+    user = principal_cache.get(user_id)
+    if user is None:
+        db_user = UserRepository(db).get(user_id)
+        if not db_user:
+            return None
+        user = Principal.from_user(db_user)
+        principal_cache.set(user)
+    return user
+
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> Principal:
+    """
+    Utilisateur authentifié par le token. L'identité est servie par le cache
+    de principals ; la base n'est interrogée qu'en cas d'absence.
+    """
     try:
-        payload = decode_token(token)
-        token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
+        token_data = decode_access_token(token)
+    except (TokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+    # Vérification en mémoire (filtre de Bloom) ; Redis seulement si le filtre répond
+    if revocation_list.is_revoked(token_data.sub, token_data.jti, token_data.iat):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    user_repo = UserRepository(db)
-    user = user_repo.get(token_data.sub)
-    
-    if not user:
+    user = load_principal(db, token_data.sub)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
@@ -45,8 +64,8 @@ def get_current_user(
     return user
 
 def get_current_active_superuser(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -55,8 +74,8 @@ def get_current_active_superuser(
     return current_user
 
 def get_current_active_manager(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,115 @@
+from typing import List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.compression import ENCODINGS, StreamCompressor, compress, negotiate
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def _compressible(content_type: str) -> bool:
+    # text/event-stream : chaque événement doit partir tel quel
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith("text/event-stream")
+
+
+class CompressionMiddleware:
+    """
+    Compression des réponses selon `Accept-Encoding` (br, zstd, gzip, voir
+    core.compression).
+
+    Middleware ASGI pur plutôt que BaseHTTPMiddleware : les réponses en
+    streaming (export NDJSON) sont compressées morceau par morceau, sans être
+    mises en mémoire. Une réponse d'un seul bloc n'est compressée qu'au-delà de
+    `minimum_size` octets. Une réponse qui a déjà un `Content-Encoding`
+    (corps précompressé depuis le cache) est transmise telle quelle.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, encodings: Sequence[str] = ENCODINGS):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(encodings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+
+class _CompressingSend:
+    def __init__(self, send: Send, encoding: Optional[str], minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.buffer: Optional[List[bytes]] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.buffer is not None:
+            self.buffer.append(body)
+            if not more_body:
+                await self._send_compressed(b"".join(self.buffer))
+            return
+        if self.compressor is not None:
+            data = self.compressor.compress(body) if body else b""
+            if not more_body:
+                data += self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        # Premier morceau du corps : on décide maintenant
+        headers = MutableHeaders(scope=self.start)
+        compressible = "content-encoding" not in headers and _compressible(headers.get("content-type", ""))
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+        # Les middlewares BaseHTTPMiddleware découpent même les réponses d'un seul
+        # bloc : la taille se lit dans Content-Length quand elle est connue
+        content_length = headers.get("content-length")
+        size = int(content_length) if content_length is not None else None
+        if size is None and not more_body:
+            size = len(body)
+        if not compressible or self.encoding is None or (size is not None and size < self.minimum_size):
+            self.passthrough = True
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        if size is not None:
+            # Taille connue : corps compressé d'un coup, avec sa nouvelle longueur
+            self.buffer = [body]
+            if not more_body:
+                await self._send_compressed(body)
+            return
+
+        # Streaming : taille finale inconnue
+        del headers["Content-Length"]
+        self.compressor = StreamCompressor(self.encoding)
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": self.compressor.compress(body), "more_body": True})
+
+    async def _send_compressed(self, body: bytes) -> None:
+        data = compress(body, self.encoding)
+        MutableHeaders(scope=self.start)["Content-Length"] = str(len(data))
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": data})
@@ -0,0 +1,59 @@
+from typing import Callable, Optional
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp
+import logging
+import math
+
+from db.routing import ReadConsistency, read_consistency
+
+logger = logging.getLogger(__name__)
+
+class ReadConsistencyMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware "read-your-writes" pour le routage vers les réplicas.
+
+    Après une requête qui a écrit sur le primaire, un cookie contenant
+    l'horodatage de l'écriture est renvoyé au client. Tant que ce cookie est
+    présent, seules les réplicas ayant rejoué cette écriture sont utilisées
+    pour ses lectures ; sinon la lecture se fait sur le primaire.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cookie_name: str = "read_consistency",
+        max_lag: float = 5.0,
+        check_interval: float = 10.0,
+    ):
+        super().__init__(app)
+        self.cookie_name = cookie_name
+        # Au-delà de ce délai, tout réplica considéré sain a forcément rejoué l'écriture
+        self.max_age = math.ceil(max_lag + check_interval)
+
+    def _parse_token(self, value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            logger.debug(f"Ignoring malformed consistency token: {value}")
+            return None
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        state = ReadConsistency(self._parse_token(request.cookies.get(self.cookie_name)))
+        token = read_consistency.set(state)
+        try:
+            response = await call_next(request)
+        finally:
+            read_consistency.reset(token)
+
+        if state.last_write_at is not None:
+            response.set_cookie(
+                self.cookie_name,
+                f"{state.last_write_at:.6f}",
+                max_age=self.max_age,
+                httponly=True,
+                samesite="lax",
+            )
+        return response
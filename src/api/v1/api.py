@@ -1,11 +1,12 @@
 from fastapi import APIRouter
-from api.v1.endpoints import auth, posts, cache
+from api.v1.endpoints import auth, posts, cache, database
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(posts.router, prefix="/posts", tags=["posts"])
 api_router.include_router(cache.router, prefix="/cache", tags=["system"])
+api_router.include_router(database.router, prefix="/database", tags=["system"])
 
 # Add other routers here as we create them
 # Example:
@@ -1,22 +1,50 @@
 from datetime import timedelta
-from typing import Any
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+import logging
+from typing import Any, Optional, Set
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-import jwt
 from pydantic import ValidationError
 
 
 from core.config import settings
-from core.security import create_access_token, create_refresh_token, verify_password, decode_token
-from api.deps import get_current_user
-from db.session import get_db
+from core.password_hashing import PasswordHashingBusy, password_executor
+from core.security import (
+    TokenError,
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    decode_token,
+    password_needs_rehash,
+)
+from api.deps import get_current_active_superuser, get_current_user, load_principal, oauth2_scheme
+from db.session import SessionLocal, get_db
+from db.routing import pin_primary
 from db.repositories.user import UserRepository
-from models.user import User
-from schemas.user import User as UserSchema, Token, UserCreate
+from core.principal_cache import Principal
+from core.refresh_tokens import ROTATED, new_token_id, refresh_token_store
+from core.revocation import revocation_list
+from schemas.user import User as UserSchema, Token, UserBulkCreate, UserBulkError, UserBulkResult, UserCreate
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _update_password_hash(user_id: int, old_hash: str, new_hash: str) -> bool:
+    # Session propre à la tâche : celle de la requête est fermée quand elle s'exécute
+    with SessionLocal() as db:
+        return UserRepository(db).update_password_hash(user_id, old_hash, new_hash)
+
+async def _rehash_password(user_id: int, password: str, old_hash: str) -> None:
+    """Recalcule un hash au schéma et au coût configurés, après la réponse au login."""
+    try:
+        new_hash = await password_executor.hash(password)
+    except PasswordHashingBusy:
+        return  # Réessayé à la prochaine connexion
+    if await run_in_threadpool(_update_password_hash, user_id, old_hash, new_hash):
+        logger.info("Password hash upgraded", extra={"user_id": user_id})
+
 @router.post(
     "/register",
     response_model=UserSchema,
@@ -43,13 +71,13 @@ router = APIRouter()
             "description": "Email ou username déjà utilisé",
             "content": {
                 "application/json": {
-                    "example": {"detail": "Email already registered"}
+                    "example": {"detail": "A user with this email already exists"}
                 }
             }
         }
     }
 )
-def register(
+async def register(
     *,
     db: Session = Depends(get_db),
     user_in: UserCreate,
@@ -57,27 +85,51 @@ def register(
     """
     Register new user.
     """
+    # bcrypt tourne dans son propre pool (core.password_hashing) ; l'unicité de
+    # l'email et du username est vérifiée par l'INSERT lui-même (un aller-retour)
     user_repo = UserRepository(db)
-    
-    # Check if user with this email exists
-    if user_repo.get_by_email(user_in.email):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A user with this email already exists",
+    hashed_password = await password_executor.hash(user_in.password)
+    user = await run_in_threadpool(user_repo.create, user_in, hashed_password)
+    return user
+
+@router.post("/users/bulk", response_model=UserBulkResult, status_code=status.HTTP_201_CREATED)
+async def create_users_bulk(
+    *,
+    db: Session = Depends(get_db),
+    payload: UserBulkCreate,
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Create users in bulk (onboarding imports).
+    Only accessible to superusers. Duplicates are reported in `errors`
+    by their index in the request; the other users are created.
+    """
+    user_repo = UserRepository(db)
+    indexed = list(enumerate(payload.users))
+    seen_emails: Set[str] = set()
+    seen_usernames: Set[str] = set()
+    users, errors = [], []
+    batch_size = settings.USER_BULK_BATCH_SIZE
+    for start in range(0, len(indexed), batch_size):
+        # Par lot : doublons écartés d'abord, bcrypt seulement pour les lignes insérées
+        rows, rejected = await run_in_threadpool(
+            user_repo.filter_duplicates, indexed[start:start + batch_size], seen_emails, seen_usernames
         )
-    
-    # Check if user with this username exists
-    if user_repo.get_by_username(user_in.username):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A user with this username already exists",
+        hashed_passwords = await password_executor.hash_many([user_in.password for _, user_in in rows])
+        created, failed = await run_in_threadpool(
+            user_repo.insert_many,
+            [(index, user_in, hashed) for (index, user_in), hashed in zip(rows, hashed_passwords)],
         )
-    
-    user = user_repo.create(user_in)
-    return user
+        users.extend(created)
+        errors.extend(rejected + failed)
+    return {
+        "created": users,
+        "errors": [UserBulkError(index=index, detail=detail) for index, detail in sorted(errors)],
+    }
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
@@ -85,9 +137,9 @@ def login(
     OAuth2 compatible token login, get an access token for future requests.
     """
     user_repo = UserRepository(db)
-    user = user_repo.get_by_username(form_data.username)
+    user = await run_in_threadpool(user_repo.get_by_username, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await password_executor.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -100,10 +152,16 @@ def login(
         )
 
     access_token = create_access_token(user.id)
-    refresh_token = create_refresh_token(user.id)
-    
-    # Store refresh token in database
-    user_repo.update_refresh_token(user.id, refresh_token)
+    # Nouvelle session (famille de refresh tokens), enregistrée dans Redis
+    family, jti = new_token_id(), new_token_id()
+    refresh_token = create_refresh_token(user.id, jti=jti, family=family)
+    await run_in_threadpool(refresh_token_store.start_family, user.id, family, jti)
+
+    # Schéma ou coût obsolète : nouveau hash calculé sans retarder la réponse
+    if password_needs_rehash(user.hashed_password):
+        background_tasks.add_task(
+            _rehash_password, user.id, form_data.password, user.hashed_password
+        )
     
     return {
         "access_token": access_token,
@@ -114,10 +172,13 @@ def login(
 @router.post("/refresh", response_model=Token)
 def refresh_token(
     db: Session = Depends(get_db),
-    refresh_token: str = Body(...),
+    refresh_token: str = Body(..., embed=True),
 ) -> Any:
     """
     Refresh access token.
+
+    The refresh token is single use: it is exchanged for a new one in the same
+    session, and presenting it again revokes the whole session.
     """
     try:
         payload = decode_token(refresh_token)
@@ -127,47 +188,75 @@ def refresh_token(
                 detail="Invalid refresh token",
             )
         user_id = int(payload.get("sub"))
-    except (jwt.JWTError, ValidationError):
+    except (TokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
 
-    user_repo = UserRepository(db)
-    user = user_repo.get(user_id)
-
+    user = load_principal(db, user_id)
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user",
         )
-    
-    if user.refresh_token != refresh_token:
+
+    new_jti = new_token_id()
+    if "jti" in payload:
+        family = payload.get("fam")
+        rotated = refresh_token_store.rotate(user_id, family, payload["jti"], new_jti) == ROTATED
+    else:
+        # Token émis avant le store Redis : comparé une dernière fois à la colonne
+        # users.refresh_token, lue sur le primaire, puis migré dans une famille
+        pin_primary(db)
+        user_repo = UserRepository(db)
+        db_user = user_repo.get(user_id)
+        rotated = db_user is not None and db_user.refresh_token == refresh_token
+        if rotated:
+            user_repo.update_refresh_token(user_id, None)
+            family = new_token_id()
+            refresh_token_store.start_family(user_id, family, new_jti)
+
+    if not rotated:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Refresh token has been revoked",
         )
 
-    access_token = create_access_token(user_id)
-    new_refresh_token = create_refresh_token(user_id)
-    
-    # Update refresh token in database
-    user_repo.update_refresh_token(user_id, new_refresh_token)
-    
     return {
-        "access_token": access_token,
-        "refresh_token": new_refresh_token,
+        "access_token": create_access_token(user_id),
+        "refresh_token": create_refresh_token(user_id, jti=new_jti, family=family),
         "token_type": "bearer"
     }
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
 def logout(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme),
+    refresh_token: Optional[str] = Body(None, embed=True),
 ) -> Any:
     """
-    Logout user by revoking refresh token.
+    Logout user by revoking tokens: the access token and the session of
+    `refresh_token` when it is given, every token of the user otherwise.
     """
-    user_repo = UserRepository(db)
-    user_repo.update_refresh_token(current_user.id, None)
-    return {"message": "Successfully logged out"}
\ No newline at end of file
+    family = None
+    if refresh_token:
+        try:
+            payload = decode_token(refresh_token)
+            if payload.get("sub") == str(current_user.id):
+                family = payload.get("fam")
+        except TokenError:
+            pass
+
+    if family:
+        refresh_token_store.revoke_family(current_user.id, family)
+        access_token = decode_access_token(token)
+        if access_token.jti:
+            revocation_list.revoke_token(access_token.jti, access_token.exp.timestamp())
+    else:
+        refresh_token_store.revoke_user(current_user.id)
+        revocation_list.revoke_user(current_user.id)
+        # Tokens émis avant le store Redis
+        UserRepository(db).update_refresh_token(current_user.id, None)
+    return {"message": "Successfully logged out"}
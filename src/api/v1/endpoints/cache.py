@@ -4,7 +4,7 @@ import logging
 
 from api.deps import get_current_active_superuser
 from core.cache_base import redis_client, is_redis_available
-from models.user import User
+from core.principal_cache import Principal
 from ...deps import get_current_user
 
 logger = logging.getLogger(__name__)
@@ -13,7 +13,7 @@ router = APIRouter()
 
 @router.get("/stats")
 async def get_cache_stats(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ) -> Any:
     """Obtenir des statistiques sur le cache"""
     if not current_user.is_superuser:
@@ -39,7 +39,7 @@ async def get_cache_stats(
 @router.delete("/clear", status_code=status.HTTP_204_NO_CONTENT)
 async def clear_cache(
     pattern: str = "*",
-    current_user: User = Depends(get_current_active_superuser),
+    current_user: Principal = Depends(get_current_active_superuser),
 ) -> None:
     """
     Clear cache entries matching a pattern.
@@ -0,0 +1,37 @@
+from typing import Any
+from fastapi import APIRouter, Depends, Query, status
+
+from api.deps import get_current_active_superuser
+from db.instrumentation import slow_query_log
+from core.principal_cache import Principal
+
+router = APIRouter()
+
+@router.get("/slow-queries")
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Most recent slow SQL statements of this worker process, newest first.
+    Only accessible to superusers.
+
+    `plan` is only filled for the sampled statements
+    (`SLOW_QUERY_EXPLAIN_SAMPLE_RATE`).
+    """
+    entries = list(slow_query_log.entries)[::-1][:limit]
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "explain_sample_rate": slow_query_log.explain_sample_rate,
+        "items": entries,
+    }
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries(
+    current_user: Principal = Depends(get_current_active_superuser),
+) -> None:
+    """
+    Empty the slow query buffer of this worker process.
+    Only accessible to superusers.
+    """
+    slow_query_log.clear()
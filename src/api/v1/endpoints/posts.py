@@ -1,20 +1,31 @@
-from typing import Any, Optional
-import json
+from datetime import datetime
+from typing import Any, Iterator, Literal, Optional, Tuple, Union
 import logging
 from fastapi import APIRouter, Depends, Query, HTTPException, status, Response, Request
-from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from api.deps import get_current_user, get_db
 from db.repositories.post import PostRepository
-from models.user import User
+from db.session import SessionLocal
+from db.search import decode_cursor, encode_cursor
+from core.principal_cache import Principal
+from core.compression import compress_body, negotiate, pack, unpack
+from core.serialization import encode_model, json_response
 from schemas.post import (
+    POST_FIELDS,
+    POST_INCLUDES,
     Post,
     PostCreate,
     PostUpdate,
     PostWithAuthor,
     PostPage,
-    Tag,
+    PostSearchPage,
+    PostSearchResult,
+    PostSummaryPage,
+    TagWithCount,
+    sparse_post_model,
+    sparse_post_page_model,
 )
 from core.cache import redis_client
 
@@ -22,9 +33,44 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+FIELDS_DESCRIPTION = f"Comma-separated post fields to return ({', '.join(POST_FIELDS)}); `id` is always included"
+INCLUDE_DESCRIPTION = f"Comma-separated relations to embed ({', '.join(POST_INCLUDES)})"
+
+def _parse_names(value: Optional[str], allowed: Tuple[str, ...], param: str) -> Optional[Tuple[str, ...]]:
+    """Liste séparée par des virgules, validée puis normalisée (ordre canonique, sans doublon)."""
+    if value is None:
+        return None
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {param}: {', '.join(sorted(unknown))}"
+        )
+    return tuple(name for name in allowed if name in names)
+
+def sparse_fieldset(
+    fields: Optional[str],
+    include: Optional[str],
+    default_fields: Tuple[str, ...],
+) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    """
+    `(fields, include)` normalisés, ou None si aucun des deux paramètres n'est
+    passé (réponse complète habituelle).
+    """
+    field_names = _parse_names(fields, POST_FIELDS, "fields")
+    include_names = _parse_names(include, POST_INCLUDES, "include")
+    if field_names is None and include_names is None:
+        return None
+    if field_names is None:
+        field_names = default_fields
+    elif "id" not in field_names:
+        field_names = ("id", *field_names)
+    return field_names, include_names or ()
+
 @router.get(
     "/",
-    response_model=PostPage,
+    response_model=Union[PostPage, PostSummaryPage],
     responses={
         200: {
             "description": "Liste des posts avec pagination",
@@ -57,25 +103,54 @@ router = APIRouter()
     }
 )
 async def get_posts(
+    *,
     db: Session = Depends(get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     author_id: Optional[int] = None,
     tag: Optional[str] = None,
     published: Optional[bool] = None,
-    current_user: User = Depends(get_current_user),
-    request: Request = None,
+    view: Literal["summary", "full"] = Query("full"),
+    tags: Optional[str] = Query(None, description="Comma-separated tag names"),
+    tag_mode: Literal["any", "all"] = Query("any"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    current_user: Principal = Depends(get_current_user),
+    request: Request,
 ) -> Any:
     """
     Retrieve posts with pagination.
+
+    `tags=a,b` keeps posts having any (`tag_mode=any`) or all (`tag_mode=all`)
+    of the tags. `view=summary` returns items without `content`, which is not
+    even read from the database.
+
+    `fields=id,title,updated_at` and `include=author,tags` return only those
+    fields and relations: other columns are not read and other relations are
+    not joined. `fields` takes precedence over `view`.
     """
+    tag_names = sorted({name.strip() for name in tags.split(",") if name.strip()}) if tags else []
+    sparse = sparse_fieldset(
+        fields,
+        include,
+        tuple(name for name in POST_FIELDS if view == "full" or name != "content"),
+    )
+
     # Check if cached response exists
-    cache_key = f"posts:list:skip={skip}:limit={limit}:author={author_id}:tag={tag}:published={published}"
+    cache_key = (
+        f"posts:list:view={view}:skip={skip}:limit={limit}:author={author_id}:tag={tag}"
+        f":tags={','.join(tag_names)}:tag_mode={tag_mode}:published={published}"
+    )
+    if sparse:
+        cache_key += f":fields={','.join(sparse[0])}:include={','.join(sparse[1])}"
+    # Entrées précompressées, une par encodage négocié
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    cache_key += f":enc={encoding or 'identity'}"
     if redis_client:
         try:
             cached = redis_client.get(cache_key)
             if cached:
-                return json.loads(cached)
+                return json_response(*unpack(cached))
         except Exception as e:
             logger.warning(f"Redis cache error: {e}")
 
@@ -86,20 +161,29 @@ async def get_posts(
         limit=limit,
         author_id=author_id,
         tag=tag,
-        published=published
+        published=published,
+        summary=view == "summary",
+        tags=tag_names,
+        tag_mode=tag_mode,
+        fields=sparse[0] if sparse else None,
+        include=sparse[1] if sparse else ()
     )
-    
     # Calculate total pages
     pages = (total + limit - 1) // limit
     
-    # Prepare response
-    response = {
+    # Validation et encodage une seule fois : les mêmes bytes sont mis en
+    # cache et renvoyés, sans resérialisation par FastAPI
+    if sparse:
+        page_model = sparse_post_page_model(*sparse)
+    else:
+        page_model = PostSummaryPage if view == "summary" else PostPage
+    body, body_encoding = compress_body(encode_model(page_model, {
         "items": posts,
         "total": total,
         "page": (skip // limit) + 1,
         "size": limit,
         "pages": pages
-    }
+    }), encoding)
     
     # Cache the response
     if redis_client:
@@ -107,19 +191,19 @@ async def get_posts(
             redis_client.setex(
                 cache_key,
                 60 * 5,  # Cache for 5 minutes
-                json.dumps(jsonable_encoder(response))
+                pack(body, body_encoding)
             )
         except Exception as e:
             logger.warning(f"Redis cache error: {e}")
     
-    return response
+    return json_response(body, body_encoding)
 
 @router.post("/", response_model=Post, status_code=status.HTTP_201_CREATED)
 async def create_post(
     *,
     db: Session = Depends(get_db),
     post_in: PostCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Create new post.
@@ -132,6 +216,7 @@ async def create_post(
         try:
             # Invalider la liste des posts
             keys_to_delete = redis_client.keys("posts:list:*")
+            keys_to_delete.extend(redis_client.keys("tags:list:*"))
             if keys_to_delete:
                 redis_client.delete(*keys_to_delete)
                 logger.info(f"Invalidated {len(keys_to_delete)} cache entries after post creation")
@@ -139,76 +224,157 @@ async def create_post(
             logger.warning(f"Redis cache invalidation error: {e}")
     
     return post
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Un post JSON par ligne (NDJSON), triés par id",
+            "content": {"application/x-ndjson": {}},
+        }
+    }
+)
+def export_posts(
+    author_id: Optional[int] = None,
+    tag: Optional[str] = None,
+    published: Optional[bool] = None,
+    updated_since: Optional[datetime] = None,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Stream every matching post as NDJSON.
+
+    Accepts the same filters as the list endpoint, plus `updated_since`.
+    """
+    def ndjson() -> Iterator[bytes]:
+        # Session dédiée au flux : celle de la requête (get_db) peut être fermée
+        # avant l'envoi du corps, selon la version de FastAPI
+        with SessionLocal() as export_db:
+            batches = PostRepository(export_db).iter_export(
+                author_id=author_id,
+                tag=tag,
+                published=published,
+                updated_since=updated_since
+            )
+            # Un bloc par lot : la réponse est envoyée au fur et à mesure de la lecture
+            for batch in batches:
+                yield "".join(
+                    Post.model_validate(post).model_dump_json() + "\n" for post in batch
+                ).encode()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.get("/search", response_model=PostSearchPage)
+def search_posts(
+    db: Session = Depends(get_db),
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    author_id: Optional[int] = None,
+    tag: Optional[str] = None,
+    published: Optional[bool] = None,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Full-text search over post title, summary and content.
+
+    Results are ranked by relevance. Pass `next_cursor` back as `cursor`
+    to fetch the next page.
+    """
+    try:
+        after = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    post_repo = PostRepository(db)
+    # Un élément de plus pour savoir s'il existe une page suivante
+    results = post_repo.search(
+        q,
+        limit=limit + 1,
+        after=after,
+        author_id=author_id,
+        tag=tag,
+        published=published
+    )
+
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last_post, last_rank = results[-1]
+        next_cursor = encode_cursor(last_rank, last_post.id)
+
+    items = [
+        PostSearchResult.model_validate({**Post.model_validate(post).model_dump(), "rank": rank})
+        for post, rank in results
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
 @router.get("/{post_id}", response_model=PostWithAuthor)
 async def get_post(
     *,
     db: Session = Depends(get_db),
     post_id: int,
-    current_user: User = Depends(get_current_user),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    current_user: Principal = Depends(get_current_user),
+    request: Request,
 ) -> Any:
+    """
+    Get a post with its author and tags, or only the requested `fields`
+    and `include` relations.
+    """
+    sparse = sparse_fieldset(fields, include, POST_FIELDS)
     cache_key = f"posts:detail:{post_id}"
+    if sparse:
+        cache_key += f":fields={','.join(sparse[0])}:include={','.join(sparse[1])}"
+    # Entrées précompressées, une par encodage négocié
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    cache_key += f":enc={encoding or 'identity'}"
     if redis_client:
         try:
             cached = redis_client.get(cache_key)
             if cached:
-                return json.loads(cached)
+                return json_response(*unpack(cached))
         except Exception as e:
             logger.warning(f"Redis cache error: {e}")
     
     post_repo = PostRepository(db)
-    post = post_repo.get(post_id)
+    if sparse:
+        post = post_repo.get(post_id, fields=sparse[0], include=sparse[1])
+    else:
+        post = post_repo.get(post_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
-    _ = post.author  # Forcer le chargement de l'auteur
+    body, body_encoding = compress_body(
+        encode_model(sparse_post_model(*sparse) if sparse else PostWithAuthor, post), encoding
+    )
 
-    # Sérialiser l'objet ORM pour correspondre au schéma PostWithAuthor
-    post_data = jsonable_encoder(post)
-    
     if redis_client:
         try:
             redis_client.setex(
                 cache_key,
                 60 * 5,  # 5 minutes
-                json.dumps(post_data)
+                pack(body, body_encoding)
             )
         except Exception as e:
             logger.warning(f"Redis cache error: {e}")
-    return post_data
-    
-    post_repo = PostRepository(db)
-    post = post_repo.get(post_id)
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
-    # Forcer le chargement de la relation auteur
-    _ = post.author  
+    return json_response(body, body_encoding)
 
-    # Convertir l'objet ORM en dictionnaire sérialisable
-    post_data = jsonable_encoder(post)
-    
-    # Mise en cache de la réponse
-    if redis_client:
-        try:
-            redis_client.setex(
-                cache_key,
-                60 * 5,  # 5 minutes
-                json.dumps(post_data)
-            )
-        except Exception as e:
-            logger.warning(f"Redis cache error: {e}")
-    return post_data
 @router.put("/{post_id}", response_model=Post)
 async def update_post(
     *,
     db: Session = Depends(get_db),
     post_id: int,
     post_in: PostUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Update post.
@@ -227,7 +393,9 @@ async def update_post(
         try:
             # Invalider les caches spécifiques
             keys_to_delete = redis_client.keys(f"posts:detail:{post_id}")
+            keys_to_delete.extend(redis_client.keys(f"posts:detail:{post_id}:*"))
             keys_to_delete.extend(redis_client.keys("posts:list:*"))
+            keys_to_delete.extend(redis_client.keys("tags:list:*"))
             
             if keys_to_delete:
                 redis_client.delete(*keys_to_delete)
@@ -242,7 +410,7 @@ async def delete_post(
     *,
     db: Session = Depends(get_db),
     post_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> None:
     """
     Delete post.
@@ -261,7 +429,9 @@ async def delete_post(
         try:
             # Invalider les caches spécifiques
             keys_to_delete = redis_client.keys(f"posts:detail:{post_id}")
+            keys_to_delete.extend(redis_client.keys(f"posts:detail:{post_id}:*"))
             keys_to_delete.extend(redis_client.keys("posts:list:*"))
+            keys_to_delete.extend(redis_client.keys("tags:list:*"))
             
             if keys_to_delete:
                 redis_client.delete(*keys_to_delete)
@@ -271,13 +441,42 @@ async def delete_post(
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-@router.get("/tags/", response_model=list[Tag])
+@router.get("/tags/", response_model=list[TagWithCount])
 def get_tags(
+    *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    sort: Literal["popular", "name"] = Query("popular"),
+    current_user: Principal = Depends(get_current_user),
+    request: Request,
 ) -> Any:
     """
-    Get all tags.
+    Get tags with their number of posts, most popular first (`sort=popular`)
+    or alphabetically (`sort=name`).
     """
-    tags = db.query(Tag).all()
-    return tags
\ No newline at end of file
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    cache_key = f"tags:list:sort={sort}:skip={skip}:limit={limit}:enc={encoding or 'identity'}"
+    if redis_client:
+        try:
+            cached = redis_client.get(cache_key)
+            if cached:
+                return json_response(*unpack(cached))
+        except Exception as e:
+            logger.warning(f"Redis cache error: {e}")
+
+    post_repo = PostRepository(db)
+    body, body_encoding = compress_body(
+        encode_model(list[TagWithCount], post_repo.get_tags(skip=skip, limit=limit, sort=sort)), encoding
+    )
+
+    if redis_client:
+        try:
+            redis_client.setex(
+                cache_key,
+                60 * 5,  # 5 minutes
+                pack(body, body_encoding)
+            )
+        except Exception as e:
+            logger.warning(f"Redis cache error: {e}")
+    return json_response(body, body_encoding)
\ No newline at end of file
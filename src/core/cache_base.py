@@ -1,9 +1,9 @@
-import json
 import logging
 from typing import Any
 from redis import Redis
 
 from core.config import settings
+from core.serialization import dumps, loads
 
 logger = logging.getLogger(__name__)
 
@@ -33,18 +33,18 @@ def is_redis_available() -> bool:
         logger.warning(f"Redis is not available: {str(e)}")
         return False
 
-def serialize_response(response_data: Any) -> str:
-    """Serialize response data to JSON string."""
+def serialize_response(response_data: Any) -> bytes:
+    """Serialize response data to JSON bytes."""
     try:
-        return json.dumps(response_data)
+        return dumps(response_data)
     except Exception as e:
         logger.error(f"Failed to serialize response: {str(e)}")
         return None
 
-def deserialize_response(response_data: str) -> Any:
-    """Deserialize JSON string to response data."""
+def deserialize_response(response_data: bytes) -> Any:
+    """Deserialize JSON bytes to response data."""
     try:
-        return json.loads(response_data)
+        return loads(response_data)
     except Exception as e:
         logger.error(f"Failed to deserialize response: {str(e)}")
         return None
\ No newline at end of file
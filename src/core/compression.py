@@ -0,0 +1,110 @@
+import zlib
+from typing import Dict, Optional, Sequence, Tuple
+
+from core.config import settings
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:  # br désactivé
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:  # zstd désactivé
+    ZSTD_AVAILABLE = False
+
+# Niveaux "temps réel" : compromis taux / CPU pour une compression par requête
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+_AVAILABLE = {"br": BROTLI_AVAILABLE, "zstd": ZSTD_AVAILABLE, "gzip": True}
+
+# Encodages activés, par ordre de préférence du serveur
+ENCODINGS: Tuple[str, ...] = tuple(
+    encoding for encoding in settings.COMPRESSION_ENCODINGS if _AVAILABLE.get(encoding)
+)
+
+
+def negotiate(accept_encoding: Optional[str], encodings: Sequence[str] = ENCODINGS) -> Optional[str]:
+    """
+    Encodage à utiliser d'après `Accept-Encoding` : la valeur `q` la plus haute
+    l'emporte, puis l'ordre de `encodings`. None : réponse non compressée.
+    """
+    if not accept_encoding or not encodings:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 : en-tête gzip
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_body(
+    body: bytes,
+    encoding: Optional[str],
+    minimum_size: int = settings.COMPRESSION_MINIMUM_SIZE,
+) -> Tuple[bytes, Optional[str]]:
+    """Compresse `body` si un encodage est accepté et le corps assez gros ; retourne (corps, encodage effectif)."""
+    if encoding is None or len(body) < minimum_size:
+        return body, None
+    return compress(body, encoding), encoding
+
+
+class StreamCompressor:
+    """Compression d'une réponse en plusieurs morceaux, chacun envoyé dès qu'il est compressé."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        if self.encoding == "zstd":
+            return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def pack(body: bytes, encoding: Optional[str]) -> bytes:
+    """Entrée de cache : encodage du corps, puis le corps (`br:...`, `identity:...`)."""
+    return (encoding or "identity").encode() + b":" + body
+
+
+def unpack(value: bytes) -> Tuple[bytes, Optional[str]]:
+    encoding, _, body = value.partition(b":")
+    return body, None if encoding == b"identity" else encoding.decode()
@@ -1,18 +1,57 @@
-from typing import Any, Dict, List, Optional, Union
+import json
+from typing import Annotated, Any, Dict, List, Optional, Union
 from pydantic import AnyHttpUrl, EmailStr, field_validator 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "FastAPI Template"
     VERSION: str = "1.0.0"
     API_V1_STR: str = "/api/v1"
     ENVIRONMENT: str = "development"
+    DEBUG: bool = False
     
     # SECURITY
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # "HS256" (SECRET_KEY partagé), "ES256" ou "EdDSA" : clés PEM dans JWT_SIGNING_KEYS,
+    # la première (privée) signe, les suivantes vérifient encore les tokens émis avant rotation
     ALGORITHM: str = "HS256"
+    JWT_SIGNING_KEYS: Annotated[List[str], NoDecode] = []
+    # Durée de mise en cache de /.well-known/jwks.json par les clients (secondes)
+    JWKS_MAX_AGE: int = 300
+
+    @field_validator("JWT_SIGNING_KEYS", mode="before")
+    def assemble_signing_keys(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
+        # NoDecode : "a.pem,b.pem" comme '["a.pem", "b.pem"]' arrivent ici bruts
+        if isinstance(v, str) and v.startswith("["):
+            return json.loads(v)
+        if isinstance(v, str):
+            return [i.strip() for i in v.split(",") if i.strip()]
+        elif isinstance(v, list):
+            return v
+        raise ValueError(v)
+
+    # Pool dédié à bcrypt : "thread" ou "process" ; au-delà de WORKERS + QUEUE_SIZE tâches, 503
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+    # Taille des lots d'INSERT de POST /auth/users/bulk
+    USER_BULK_BATCH_SIZE: int = 500
+    # Schéma des nouveaux hashs ("bcrypt" ou "argon2", qui requiert argon2-cffi) et coûts,
+    # à calibrer avec scripts/calibrate_password_hash.py ; les anciens hashs sont
+    # recalculés à la connexion suivante
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # Kio
+    ARGON2_PARALLELISM: int = 4
+    # Access tokens déjà vérifiés gardés en mémoire jusqu'à expiration (0 pour désactiver)
+    VERIFIED_TOKEN_CACHE_SIZE: int = 10_000
+    # Filtre de Bloom des access tokens révoqués, par worker
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
     
     # CORS
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
@@ -41,6 +80,40 @@ class Settings(BaseSettings):
             return f"mysql+pymysql://{self.DATABASE_USER}:{self.DATABASE_PASSWORD}@{self.DATABASE_HOST}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
         raise ValueError("DATABASE_TYPE must be either 'postgresql' or 'mysql'")
 
+    # CONNECTION POOL
+    DB_POOL_PROFILE: str = "default"  # "default" or "pgbouncer"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 3600
+    DB_POOL_PRE_PING: bool = True
+    # Connexions Postgres allouées au service : réparties entre tous les processus
+    DB_CONNECTION_BUDGET: Optional[int] = None
+    WEB_CONCURRENCY: int = 1
+    APP_REPLICAS: int = 1
+
+    # READ REPLICAS
+    DATABASE_REPLICA_URLS: List[str] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 10.0
+    READ_CONSISTENCY_COOKIE: str = "read_consistency"
+
+    @field_validator("DATABASE_REPLICA_URLS", mode="before")
+    def assemble_replica_urls(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
+        if isinstance(v, str) and not v.startswith("["):
+            return [i.strip() for i in v.split(",") if i.strip()]
+        elif isinstance(v, (list, str)):
+            return v
+        raise ValueError(v)
+
+    # SQL INSTRUMENTATION
+    # Au-delà de ce nombre d'exécutions de la même requête, une requête HTTP est signalée (N+1)
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+    # Requêtes lentes : 0 désactive le journal ; part des requêtes lentes passées à EXPLAIN
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.0
+    SLOW_QUERY_LOG_SIZE: int = 100
+
     # REDIS
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
@@ -50,6 +123,28 @@ class Settings(BaseSettings):
     @property
     def REDIS_URL(self) -> str:
         return f"redis://:{self.REDIS_PASSWORD}@{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
+
+    # PRINCIPAL CACHE
+    # Identité (id, rôle, statut) des utilisateurs authentifiés, en mémoire puis dans Redis
+    PRINCIPAL_CACHE_TTL: int = 30
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    
+    # COMPRESSION
+    # Encodages proposés aux clients, par ordre de préférence ("br" et "zstd" requièrent
+    # brotli / zstandard, ignorés s'ils manquent ; liste vide pour désactiver). Les réponses
+    # de moins de COMPRESSION_MINIMUM_SIZE octets ne sont pas compressées
+    COMPRESSION_ENCODINGS: Annotated[List[str], NoDecode] = ["br", "zstd", "gzip"]
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    @field_validator("COMPRESSION_ENCODINGS", mode="before")
+    def assemble_compression_encodings(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
+        if isinstance(v, str) and v.startswith("["):
+            return json.loads(v)
+        if isinstance(v, str):
+            return [i.strip().lower() for i in v.split(",") if i.strip()]
+        elif isinstance(v, list):
+            return v
+        raise ValueError(v)
     
     # LOGGING
     LOG_LEVEL: str = "INFO"
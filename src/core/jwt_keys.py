@@ -0,0 +1,120 @@
+import base64
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = ("ES256", "EdDSA")
+
+
+class SigningKey:
+    """Clé asymétrique de signature (ou de vérification seule) identifiée par son `kid`."""
+
+    def __init__(self, algorithm: str, key: Any):
+        self.algorithm = algorithm
+        if isinstance(key, (ec.EllipticCurvePrivateKey, ed25519.Ed25519PrivateKey)):
+            self.private_key = key
+            self.public_key = key.public_key()
+        else:
+            self.private_key = None
+            self.public_key = key
+        self._check_type()
+        self.jwk = self._public_jwk()
+        self.kid = jwk_thumbprint(self.jwk)
+        self.jwk.update({"kid": self.kid, "alg": algorithm, "use": "sig"})
+
+    def _check_type(self) -> None:
+        if self.algorithm == "ES256":
+            valid = isinstance(self.public_key, ec.EllipticCurvePublicKey) and self.public_key.curve.name == "secp256r1"
+        else:
+            valid = isinstance(self.public_key, ed25519.Ed25519PublicKey)
+        if not valid:
+            raise ValueError(f"Key of type {type(self.public_key).__name__} cannot be used with {self.algorithm}")
+
+    def _public_jwk(self) -> Dict[str, str]:
+        if self.algorithm == "ES256":
+            return json.loads(jwt.algorithms.ECAlgorithm.to_jwk(self.public_key))
+        return json.loads(jwt.algorithms.OKPAlgorithm.to_jwk(self.public_key))
+
+    @classmethod
+    def from_pem(cls, algorithm: str, pem: bytes) -> "SigningKey":
+        if b"PRIVATE KEY" in pem:
+            return cls(algorithm, serialization.load_pem_private_key(pem, password=None))
+        return cls(algorithm, serialization.load_pem_public_key(pem))
+
+
+def jwk_thumbprint(jwk: Dict[str, str]) -> str:
+    """Empreinte RFC 7638 : SHA-256 des membres obligatoires de la JWK, en base64url."""
+    required = {"EC": ("crv", "kty", "x", "y"), "OKP": ("crv", "kty", "x")}[jwk["kty"]]
+    canonical = json.dumps({name: jwk[name] for name in required}, separators=(",", ":"), sort_keys=True)
+    digest = hashlib.sha256(canonical.encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+class KeySet:
+    """
+    Clés de signature des JWT.
+
+    En HS256, le secret partagé `SECRET_KEY`. En ES256/EdDSA, une liste de clés :
+    la première (privée) signe les nouveaux tokens, les suivantes (privées ou
+    publiques) ne servent plus qu'à vérifier les tokens émis avant une rotation.
+    Toutes les clés publiques sont exposées dans le JWKS.
+    """
+
+    def __init__(self, algorithm: str, secret: Optional[str] = None, keys: Optional[List[SigningKey]] = None):
+        self.algorithm = algorithm
+        self.secret = secret
+        self.keys = {key.kid: key for key in keys or []}
+        self.signing_key = keys[0] if keys else None
+        if algorithm in ASYMMETRIC_ALGORITHMS and (self.signing_key is None or self.signing_key.private_key is None):
+            raise ValueError(f"{algorithm} requires a private signing key first in JWT_SIGNING_KEYS")
+        self._jwks = json.dumps({"keys": [key.jwk for key in self.keys.values()]}).encode()
+
+    @property
+    def asymmetric(self) -> bool:
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        if not self.asymmetric:
+            return jwt.encode(payload, self.secret, algorithm=self.algorithm)
+        return jwt.encode(
+            payload,
+            self.signing_key.private_key,
+            algorithm=self.algorithm,
+            headers={"kid": self.signing_key.kid},
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        if not self.asymmetric:
+            return jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return jwt.decode(token, key.public_key, algorithms=[self.algorithm])
+
+    def jwks(self) -> bytes:
+        """Document JWKS sérialisé une fois pour toutes (vide en HS256)."""
+        return self._jwks
+
+
+def load_key_set(algorithm: str, secret: str, key_files: List[str]) -> KeySet:
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        return KeySet(algorithm, secret=secret)
+    keys = []
+    for path in key_files:
+        with open(path, "rb") as f:
+            keys.append(SigningKey.from_pem(algorithm, f.read()))
+    logger.info(f"Loaded {len(keys)} JWT signing key(s) for {algorithm}")
+    return KeySet(algorithm, keys=keys)
+
+
+key_set = load_key_set(settings.ALGORITHM, settings.SECRET_KEY, settings.JWT_SIGNING_KEYS)
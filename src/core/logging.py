@@ -8,6 +8,9 @@ from typing import Any
 
 from .config import settings
 
+# Attributs standard d'un LogRecord : les autres proviennent de `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
 class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         log_obj = {
@@ -21,11 +24,16 @@ class JSONFormatter(logging.Formatter):
         
         if hasattr(record, "request_id"):
             log_obj["request_id"] = record.request_id
+
+        # Champs passés via `extra` (path, status_code, db_queries...)
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in log_obj:
+                log_obj[key] = value
             
         if record.exc_info:
             log_obj["exception"] = self.formatException(record.exc_info)
             
-        return json.dumps(log_obj)
+        return json.dumps(log_obj, default=str)
 
 def setup_logging() -> None:
     # Create logs directory if it doesn't exist
@@ -0,0 +1,73 @@
+import logging
+import os
+from typing import Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        REGISTRY,
+        generate_latest,
+        multiprocess,
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # dépendance optionnelle : métriques désactivées sans prometheus-client
+    PROMETHEUS_AVAILABLE = False
+
+
+class _NoopMetric:
+    """Remplace une métrique Prometheus quand prometheus-client est absent."""
+
+    def labels(self, *args: Any, **kwargs: Any) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+
+def counter(name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Any:
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Counter(name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Any:
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    # Avec gunicorn, chaque worker écrit sa valeur : on additionne les workers vivants
+    return Gauge(name, documentation, labelnames, multiprocess_mode="livesum")
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Tuple[str, ...] = (),
+    buckets: Tuple[float, ...] = Histogram.DEFAULT_BUCKETS if PROMETHEUS_AVAILABLE else (),
+) -> Any:
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Histogram(name, documentation, labelnames, buckets=buckets)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Sérialise les métriques au format texte Prometheus."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,187 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+from core.metrics import gauge, histogram
+from core.security import build_password_context, get_password_hash, hash_passwords, verify_password
+
+password_hash_queue_wait = histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a password hash/verify job waited for a free worker",
+    ("operation",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+password_hash_duration = histogram(
+    "password_hash_seconds",
+    "CPU time of a password hash/verify job",
+    ("operation",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2),
+)
+password_hash_in_flight = gauge(
+    "password_hash_in_flight",
+    "Password hash/verify jobs queued or running",
+)
+
+
+class PasswordHashingBusy(HTTPException):
+    """File d'attente du hachage pleine : le client doit réessayer plus tard."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, please retry later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def _timed(func: Callable, *args: Any) -> Tuple[Any, float, float]:
+    # Exécutée dans le worker : horloge murale, comparable entre processus
+    started = time.time()
+    result = func(*args)
+    return result, started, time.time() - started
+
+
+class PasswordExecutor:
+    """
+    Pool dédié au hachage des mots de passe, séparé du pool de threads d'AnyIO
+    qui exécute les endpoints synchrones.
+
+    Au plus `workers + max_queue` tâches sont acceptées en même temps ; au-delà,
+    `PasswordHashingBusy` (503) est levée immédiatement plutôt que de laisser
+    les connexions s'accumuler.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 32, use_processes: bool = False, retry_after: int = 1):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> Executor:
+        # Création paresseuse : pas de fork au chargement du module
+        with self._lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+            return self._executor
+
+    async def run(self, operation: str, func: Callable, *args: Any) -> Any:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                raise PasswordHashingBusy(self.retry_after)
+            self._in_flight += 1
+        password_hash_in_flight.inc()
+        submitted = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, duration = await loop.run_in_executor(self._get_executor(), _timed, func, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            password_hash_in_flight.dec()
+        password_hash_queue_wait.labels(operation=operation).observe(max(started - submitted, 0.0))
+        password_hash_duration.labels(operation=operation).observe(duration)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self.run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run("verify", verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: List[str], chunk_size: int = 16) -> List[str]:
+        """
+        Hache un lot en parallèle, par tranches de `chunk_size`. Au plus la moitié
+        des workers y est consacrée : les connexions gardent le reste du pool.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.workers // 2))
+
+        async def hash_chunk(chunk: List[str]) -> List[str]:
+            async with semaphore:
+                return await self.run("hash_many", hash_passwords, chunk)
+
+        chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+        results = await asyncio.gather(*(hash_chunk(chunk) for chunk in chunks))
+        return [hashed for chunk in results for hashed in chunk]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def measure_hash_time(scheme: str, samples: int = 3, **costs: int) -> float:
+    """Durée médiane (ms) d'un hachage avec le schéma et les coûts donnés."""
+    context = build_password_context(scheme=scheme, **costs)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(
+    scheme: str,
+    target_ms: float,
+    samples: int = 3,
+    argon2_memory_cost: int = 65536,
+    argon2_parallelism: int = 4,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Cherche le coût le plus élevé dont le hachage reste sous `target_ms` sur
+    cette machine : nombre de rounds bcrypt (chaque round double le temps), ou
+    `time_cost` argon2 à mémoire et parallélisme fixés.
+
+    Retourne le coût retenu et les mesures effectuées.
+    """
+    if scheme == "bcrypt":
+        costs = range(4, 32)
+
+        def measure(cost: int) -> float:
+            return measure_hash_time(scheme, samples, bcrypt_rounds=cost)
+    else:
+        costs = range(1, 101)
+
+        def measure(cost: int) -> float:
+            return measure_hash_time(
+                scheme,
+                samples,
+                argon2_time_cost=cost,
+                argon2_memory_cost=argon2_memory_cost,
+                argon2_parallelism=argon2_parallelism,
+            )
+
+    measurements: List[Dict[str, Any]] = []
+    chosen = costs[0]
+    for cost in costs:
+        elapsed = measure(cost)
+        measurements.append({"cost": cost, "ms": elapsed})
+        if elapsed > target_ms:
+            break
+        chosen = cost
+    return chosen, measurements
+
+
+password_executor = PasswordExecutor(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+    use_processes=settings.PASSWORD_HASH_EXECUTOR == "process",
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
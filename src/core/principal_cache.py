@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from core import cache_base
+from core.config import settings
+from core.serialization import dumps, loads
+from models.user import UserRole
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Identité d'un utilisateur authentifié, sans accès à la base de données."""
+
+    id: int
+    role: UserRole
+    is_active: bool
+    is_superuser: bool
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        return cls(id=user.id, role=UserRole(user.role), is_active=user.is_active, is_superuser=user.is_superuser)
+
+
+class PrincipalCache:
+    """
+    Cache des `Principal` par id utilisateur : LRU en mémoire (par processus)
+    devant Redis (partagé), tous deux avec un TTL court.
+
+    `invalidate` purge la mémoire locale et Redis ; les autres processus gardent
+    au plus `ttl` secondes une copie locale périmée.
+    """
+
+    key_prefix = "auth:principal"
+
+    def __init__(self, ttl: int = 30, max_size: int = 10_000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.key_prefix}:{user_id}"
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    return entry[1]
+                del self._entries[user_id]
+
+        principal = self._get_shared(user_id)
+        if principal is not None:
+            self._store_local(principal)
+        return principal
+
+    def set(self, principal: Principal) -> None:
+        if self.ttl <= 0:
+            return
+        self._store_local(principal)
+        redis_client = cache_base.redis_client
+        if redis_client is None:
+            return
+        try:
+            redis_client.setex(self._key(principal.id), self.ttl, dumps(principal))
+        except Exception as e:
+            logger.warning(f"Failed to cache principal {principal.id}: {str(e)}")
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+        redis_client = cache_base.redis_client
+        if redis_client is None:
+            return
+        try:
+            redis_client.delete(self._key(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate principal {user_id}: {str(e)}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _store_local(self, principal: Principal) -> None:
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, user_id: int) -> Optional[Principal]:
+        redis_client = cache_base.redis_client
+        if redis_client is None or self.ttl <= 0:
+            return None
+        try:
+            cached = redis_client.get(self._key(user_id))
+            if not cached:
+                return None
+            data = loads(cached)
+            return Principal(
+                id=data["id"],
+                role=UserRole(data["role"]),
+                is_active=data["is_active"],
+                is_superuser=data["is_superuser"],
+            )
+        except Exception as e:
+            logger.warning(f"Failed to read cached principal {user_id}: {str(e)}")
+            return None
+
+
+principal_cache = PrincipalCache(ttl=settings.PRINCIPAL_CACHE_TTL, max_size=settings.PRINCIPAL_CACHE_SIZE)
@@ -0,0 +1,135 @@
+import logging
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from fastapi import HTTPException, status
+from redis import Redis, RedisError
+
+from core.cache_base import redis_client
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Résultats de RefreshTokenStore.rotate
+ROTATED = "rotated"
+REUSED = "reused"
+INVALID = "invalid"
+
+
+def new_token_id() -> str:
+    return uuid.uuid4().hex
+
+
+class SessionStoreUnavailable(HTTPException):
+    """Redis injoignable : aucune session ne peut être ouverte, renouvelée ni révoquée."""
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Session store is not available",
+        )
+
+
+class RefreshTokenStore:
+    """
+    Refresh tokens actifs, dans Redis plutôt que dans `users.refresh_token`.
+
+    Chaque connexion ouvre une famille (une session, un appareil) :
+
+    - `auth:refresh:{jti}` -> famille, pour le dernier token émis de la famille ;
+    - `auth:family:{family}` -> id utilisateur, tant que la session est valide ;
+    - `auth:user:{user_id}:families` -> familles de l'utilisateur (déconnexion globale).
+
+    Toutes les clés expirent avec le token. Un token déjà consommé qui est
+    présenté à nouveau révoque toute sa famille (détection de réutilisation).
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    @contextmanager
+    def _client(self) -> Iterator[Redis]:
+        if redis_client is None:
+            raise SessionStoreUnavailable()
+        try:
+            yield redis_client
+        except RedisError as e:
+            logger.error(f"Session store error: {str(e)}")
+            raise SessionStoreUnavailable() from e
+
+    @staticmethod
+    def _token_key(jti: str) -> str:
+        return f"auth:refresh:{jti}"
+
+    @staticmethod
+    def _family_key(family: str) -> str:
+        return f"auth:family:{family}"
+
+    @staticmethod
+    def _user_key(user_id: int) -> str:
+        return f"auth:user:{user_id}:families"
+
+    def start_family(self, user_id: int, family: str, jti: str) -> None:
+        """Enregistre le premier token d'une nouvelle session."""
+        with self._client() as client:
+            pipe = client.pipeline(transaction=True)
+            pipe.set(self._family_key(family), str(user_id), ex=self.ttl)
+            pipe.set(self._token_key(jti), family, ex=self.ttl)
+            pipe.sadd(self._user_key(user_id), family)
+            pipe.expire(self._user_key(user_id), self.ttl)
+            pipe.execute()
+
+    def rotate(self, user_id: int, family: str, jti: str, new_jti: str) -> str:
+        """
+        Consomme `jti` et enregistre `new_jti` dans la même famille, en un seul
+        aller-retour. Retourne ROTATED, REUSED (famille révoquée) ou INVALID.
+        """
+        with self._client() as client:
+            pipe = client.pipeline(transaction=True)
+            pipe.getdel(self._token_key(jti))
+            pipe.get(self._family_key(family))
+            pipe.set(self._token_key(new_jti), family, ex=self.ttl)
+            pipe.expire(self._family_key(family), self.ttl)
+            # L'index des familles doit vivre aussi longtemps que la session (revoke_user)
+            pipe.expire(self._user_key(user_id), self.ttl)
+            current_family, owner = pipe.execute()[:2]
+
+            if _decode(current_family) == family and _decode(owner) == str(user_id):
+                return ROTATED
+
+            # Échec : le nouveau token n'est pas valide, et un token déjà consommé
+            # d'une famille encore active signale un vol probable
+            reused = current_family is None and owner is not None
+            if reused:
+                client.delete(self._token_key(new_jti), self._family_key(family))
+                logger.warning(
+                    "Refresh token reuse detected, session revoked",
+                    extra={"user_id": user_id, "family": family},
+                )
+            else:
+                client.delete(self._token_key(new_jti))
+        return REUSED if reused else INVALID
+
+    def revoke_family(self, user_id: int, family: str) -> None:
+        with self._client() as client:
+            pipe = client.pipeline(transaction=True)
+            pipe.delete(self._family_key(family))
+            pipe.srem(self._user_key(user_id), family)
+            pipe.execute()
+
+    def revoke_user(self, user_id: int) -> None:
+        """Révoque toutes les sessions de l'utilisateur."""
+        with self._client() as client:
+            families = client.smembers(self._user_key(user_id))
+            keys = [self._family_key(_decode(family)) for family in families]
+            client.delete(self._user_key(user_id), *keys)
+
+
+def _decode(value: Optional[bytes]) -> Optional[str]:
+    if isinstance(value, bytes):
+        return value.decode()
+    return value
+
+
+refresh_token_store = RefreshTokenStore(ttl=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600)
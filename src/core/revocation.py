@@ -0,0 +1,218 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from fastapi import HTTPException, status
+from redis import RedisError
+
+from core.cache_base import redis_client
+from core.config import settings
+from core.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+revocation_filter_hits = counter(
+    "auth_revocation_filter_hits_total",
+    "Access tokens matched by the revocation Bloom filter, by Redis confirmation result",
+    ("result",),
+)
+
+
+class RevocationUnavailable(HTTPException):
+    """Redis injoignable : la révocation n'a pas pu être enregistrée ni diffusée aux autres workers."""
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token revocation is not available",
+        )
+
+
+class BloomFilter:
+    """Filtre de Bloom : pas de faux négatif, faux positifs au taux `error_rate` jusqu'à `capacity` éléments."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        with self._lock:
+            for position in self._positions(item):
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """
+    Access tokens révoqués avant leur expiration.
+
+    Une révocation vise un token (`jti:{jti}`, à la déconnexion) ou tous les
+    tokens d'un utilisateur émis avant un instant (`user:{id}`, déconnexion
+    globale, désactivation, suppression). Redis fait foi :
+
+    - `auth:revoked:{item}` : la révocation elle-même, jusqu'à expiration des tokens visés ;
+    - `auth:revoked` (sorted set, score = expiration) : de quoi reconstruire le filtre ;
+    - canal `auth:revocations` : diffusion aux autres workers (`{item} {expiration}`).
+
+    Chaque worker garde un filtre de Bloom des éléments révoqués, reconstruit au
+    démarrage (et à chaque reconnexion) puis alimenté par pub/sub : une requête
+    ordinaire est vérifiée en mémoire, Redis n'est interrogé que si le filtre répond.
+    Le filtre est reconstruit dès que l'un de ses éléments a expiré (`maintain`).
+    """
+
+    channel = "auth:revocations"
+    index_key = "auth:revoked"
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001, maintenance_interval: float = 60.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.maintenance_interval = maintenance_interval
+        self._filter = BloomFilter(capacity, error_rate)
+        # Plus proche expiration parmi les éléments du filtre : au-delà, il est reconstruit
+        self._next_expiry = math.inf
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _key(item: str) -> str:
+        return f"auth:revoked:{item}"
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        self._revoke(f"jti:{jti}", "1", expires_at)
+
+    def revoke_user(self, user_id: int) -> None:
+        """Révoque les access tokens de l'utilisateur émis jusqu'à maintenant."""
+        now = time.time()
+        self._revoke(f"user:{user_id}", repr(now), now + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+    def _revoke(self, item: str, value: str, expires_at: float) -> None:
+        ttl = math.ceil(expires_at - time.time())
+        if ttl <= 0:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.set(self._key(item), value, ex=ttl)
+            pipe.zadd(self.index_key, {item: expires_at})
+            pipe.publish(self.channel, f"{item} {expires_at!r}")
+            pipe.execute()
+        except RedisError as e:
+            # Les autres workers accepteraient encore le token : l'appelant ne doit pas conclure au succès
+            logger.error(f"Failed to publish token revocation {item}: {str(e)}")
+            raise RevocationUnavailable() from e
+        finally:
+            # Visible tout de suite dans ce worker, sans attendre le message pub/sub
+            self._add(item, expires_at)
+
+    def _add(self, item: str, expires_at: float) -> None:
+        self._filter.add(item)
+        self._next_expiry = min(self._next_expiry, expires_at)
+
+    def is_revoked(self, user_id: int, jti: Optional[str], issued_at: Optional[float]) -> bool:
+        items = [f"user:{user_id}"] + ([f"jti:{jti}"] if jti else [])
+        candidates = [item for item in items if item in self._filter]
+        if not candidates:
+            return False
+        revoked = self._confirm(candidates, issued_at or 0.0)
+        revocation_filter_hits.labels(result="revoked" if revoked else "false_positive").inc()
+        return revoked
+
+    def _confirm(self, items: List[str], issued_at: float) -> bool:
+        try:
+            values = redis_client.mget([self._key(item) for item in items])
+        except Exception as e:
+            # Le filtre a répondu et Redis ne peut pas le démentir : on refuse
+            logger.warning(f"Failed to confirm token revocation: {str(e)}")
+            return True
+        for item, value in zip(items, values):
+            if value is None:
+                continue
+            if item.startswith("jti:") or issued_at < float(value):
+                return True
+        return False
+
+    def rebuild(self) -> None:
+        """Reconstruit le filtre depuis Redis, sans les révocations expirées."""
+        now = time.time()
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zremrangebyscore(self.index_key, "-inf", now)
+        pipe.zrangebyscore(self.index_key, now, "+inf", withscores=True)
+        _, items = pipe.execute()
+        bloom = BloomFilter(max(self.capacity, 2 * len(items)), self.error_rate)
+        for item, _ in items:
+            bloom.add(item.decode() if isinstance(item, bytes) else item)
+        self._filter = bloom
+        self._next_expiry = min((expires_at for _, expires_at in items), default=math.inf)
+
+    def maintain(self) -> None:
+        """
+        Reconstruit le filtre dès qu'une révocation qu'il contient a expiré (sinon
+        l'utilisateur visé passerait par Redis à chaque requête), ou s'il est saturé.
+        """
+        if time.time() >= self._next_expiry or self._filter.count > self._filter.capacity:
+            self.rebuild()
+
+    def start(self) -> None:
+        """Démarre l'abonnement pub/sub du worker (thread démon)."""
+        if redis_client is None or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="token-revocations", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Après l'abonnement : rien de publié pendant la reconstruction n'est perdu
+                self.rebuild()
+                last_maintenance = time.monotonic()
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        data = message["data"]
+                        item, _, expires_at = (data.decode() if isinstance(data, bytes) else data).partition(" ")
+                        # Message sans expiration : reconstruction à la prochaine maintenance
+                        self._add(item, float(expires_at) if expires_at else 0.0)
+                    if time.monotonic() - last_maintenance > self.maintenance_interval:
+                        last_maintenance = time.monotonic()
+                        self.maintain()
+            except Exception as e:
+                logger.warning(f"Token revocation subscription failed: {str(e)}")
+                self._stop.wait(5)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+)
@@ -1,29 +1,80 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Union
-from jose import jwt
+from typing import Any, List, Optional, Tuple, Union
+from jwt import InvalidTokenError, PyJWTError as TokenError
 from passlib.context import CryptContext
 from .config import settings
+from .jwt_keys import key_set
+from schemas.user import TokenPayload
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+
+def build_password_context(
+    scheme: str = "bcrypt",
+    bcrypt_rounds: int = 12,
+    argon2_time_cost: int = 3,
+    argon2_memory_cost: int = 65536,
+    argon2_parallelism: int = 4,
+) -> CryptContext:
+    """
+    Contexte passlib dont `scheme` produit les nouveaux hashs. Les autres schémas
+    restent vérifiables mais sont dépréciés, et un coût différent de celui
+    configuré est signalé par `needs_update` : ces hashs sont recalculés à la
+    prochaine connexion.
+    """
+    if scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"Unknown password hash scheme: {scheme}")
+    return CryptContext(
+        schemes=[scheme] + [other for other in PASSWORD_SCHEMES if other != scheme],
+        deprecated="auto",
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+pwd_context = build_password_context(
+    scheme=settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds=settings.BCRYPT_ROUNDS,
+    argon2_time_cost=settings.ARGON2_TIME_COST,
+    argon2_memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2_parallelism=settings.ARGON2_PARALLELISM,
+)
 
 def create_access_token(subject: Union[str, Any]) -> str:
     expire = datetime.utcnow() + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
+    # jti et iat (à la microseconde) permettent de révoquer le token (core.revocation) ;
+    # type : un refresh token, signé par la même clé, n'est pas accepté à sa place
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "jti": uuid.uuid4().hex,
+        "iat": time.time(),
+        "type": "access",
+    }
+    return key_set.encode(to_encode)
 
-def create_refresh_token(user_id: int) -> str:
-    expire = datetime.utcnow() + timedelta(days=7)
+def create_refresh_token(user_id: int, jti: Optional[str] = None, family: Optional[str] = None) -> str:
+    """`jti` et `family` identifient le token dans le store Redis (core.refresh_tokens)."""
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     payload = {
-        "sub": user_id,
+        "sub": str(user_id),
         "exp": expire,
         "type": "refresh"
     }
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    if jti:
+        payload["jti"] = jti
+        payload["fam"] = family
+    return key_set.encode(payload)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -31,7 +82,71 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Lot de hachages en une seule tâche (picklable pour un pool de processus)."""
+    return [pwd_context.hash(password) for password in passwords]
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
 def decode_token(token: str) -> dict:
-    return jwt.decode(
-        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-    )
\ No newline at end of file
+    """Vérifie la signature et l'expiration ; lève `TokenError` sinon."""
+    return key_set.decode(token)
+
+class VerifiedTokenCache:
+    """
+    Tokens dont la signature a déjà été vérifiée, par empreinte du token,
+    jusqu'à leur expiration. Un client renvoie le même access token à chaque
+    requête pendant toute sa durée de vie : seule la première est vérifiée.
+
+    Seuls les tokens valides sont conservés ; LRU borné à `max_size` entrées.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[Any]:
+        key = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, token: str, value: Any, expires_at: float) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[self._digest(token)] = (expires_at, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+verified_token_cache = VerifiedTokenCache(max_size=settings.VERIFIED_TOKEN_CACHE_SIZE)
+
+def decode_access_token(token: str) -> TokenPayload:
+    """
+    `decode_token` + validation `TokenPayload`, servis depuis `verified_token_cache`
+    pour un token déjà vérifié. Lève les mêmes exceptions que `decode_token`,
+    et `TokenError` pour un token qui n'est pas un access token (refresh token).
+    """
+    token_data = verified_token_cache.get(token)
+    if token_data is None:
+        token_data = TokenPayload(**decode_token(token))
+        if token_data.type != "access":
+            raise InvalidTokenError("Not an access token")
+        verified_token_cache.set(token, token_data, token_data.exp.timestamp())
+    return token_data
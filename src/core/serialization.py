@@ -0,0 +1,77 @@
+import functools
+import json
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:  # repli sur json (bibliothèque standard)
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    # orjson gère nativement datetime, date, enum, UUID et dataclasses
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return jsonable_encoder(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encodeur JSON commun aux réponses HTTP et aux entrées de cache."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(jsonable_encoder(obj), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data: Any) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """`JSONResponse` encodée par `dumps` (orjson si disponible)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@functools.lru_cache(maxsize=None)
+def _adapter(model_type: Any) -> TypeAdapter:
+    return TypeAdapter(model_type)
+
+
+def encode_model(model_type: Any, data: Any) -> bytes:
+    """
+    Valide `data` (objets ORM compris) contre `model_type` puis l'encode en
+    JSON par le cœur Rust de Pydantic, sans dict intermédiaire. Les bytes
+    obtenus servent à la fois de corps de réponse et d'entrée de cache.
+    """
+    adapter = _adapter(model_type)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def json_response(
+    body: bytes,
+    encoding: Optional[str] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Réponse à partir d'un JSON déjà encodé : FastAPI ne le revalide pas.
+    Avec `encoding`, le corps est déjà compressé (voir core.compression).
+    """
+    headers = dict(headers or {})
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
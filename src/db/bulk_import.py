@@ -0,0 +1,335 @@
+"""
+Import en masse d'utilisateurs, de tags et de posts depuis des fichiers NDJSON ou CSV.
+
+Les lignes sont chargées par lots, chaque lot dans sa propre transaction :
+`COPY` sur PostgreSQL, INSERT multi-lignes sur MySQL (executemany de PyMySQL),
+`executemany` sur SQLite. Après chaque lot, le nombre d'enregistrements traités
+est écrit dans un fichier de checkpoint pour pouvoir reprendre un import interrompu.
+
+Formats attendus (un enregistrement par ligne NDJSON ou par ligne CSV) :
+
+- users : email, username, password ou hashed_password, full_name, role, is_active...
+- tags : name, description
+- posts : title, content, summary, published, author_id, tags (liste de noms,
+  ou objets `{"name": ...}` comme dans l'export NDJSON ; séparés par `|` en CSV)
+
+`id`, `created_at` et `updated_at` sont optionnels.
+"""
+import csv
+import io
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import Table, bindparam, func, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+
+from core.security import get_password_hash
+from models.post import Post, PostTag, Tag
+from models.user import User, UserRole
+
+# (type d'enregistrement, enregistrements traités, lignes insérées par seconde)
+ProgressCallback = Callable[[str, int, float], None]
+
+CSV_TAG_SEPARATOR = "|"
+
+
+def read_records(path: str, fmt: Optional[str] = None, skip: int = 0) -> Iterator[Dict[str, Any]]:
+    """Lit un fichier NDJSON ou CSV enregistrement par enregistrement, sans tout charger."""
+    fmt = fmt or ("csv" if path.endswith(".csv") else "ndjson")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            records: Iterable[Dict[str, Any]] = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        yield from islice(records, skip, None)
+
+
+def _batched(records: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _empty(value: Any) -> bool:
+    return value is None or value == ""
+
+
+def _int(value: Any) -> Optional[int]:
+    return None if _empty(value) else int(value)
+
+
+def _bool(value: Any, default: bool) -> bool:
+    if _empty(value):
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "t", "yes", "y")
+    return bool(value)
+
+
+def _datetime(value: Any) -> Optional[datetime]:
+    if _empty(value):
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+def _role(value: Any) -> UserRole:
+    if _empty(value):
+        return UserRole.USER
+    try:
+        return UserRole(value.lower())
+    except ValueError:
+        return UserRole[value.upper()]
+
+
+def _tag_names(value: Any) -> List[str]:
+    if _empty(value):
+        return []
+    if isinstance(value, str):
+        value = value.split(CSV_TAG_SEPARATOR)
+    names = [tag["name"] if isinstance(tag, dict) else tag for tag in value]
+    # Dédoublonnage en conservant l'ordre
+    return list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+
+
+class BulkImporter:
+    """Charge des fichiers d'import dans la base, par lots et de manière reprenable."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        batch_size: int = 10_000,
+        hash_workers: int = 1,
+        checkpoint_path: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+    ):
+        self.engine = engine
+        self.dialect = engine.dialect.name
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint: Dict[str, int] = {}
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding="utf-8") as f:
+                self.checkpoint = json.load(f)
+        self.progress = progress
+        self._executor = ProcessPoolExecutor(hash_workers) if hash_workers > 1 else None
+        self._next_ids: Dict[str, int] = {}
+        self._tag_ids: Optional[Dict[str, int]] = None
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+        if self.dialect == "postgresql":
+            # COPY avec des id explicites ne fait pas avancer les séquences
+            with self.engine.begin() as conn:
+                for table in (User.__table__, Tag.__table__, Post.__table__):
+                    conn.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                        f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+                    ))
+
+    def __enter__(self) -> "BulkImporter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def import_users(self, path: str, fmt: Optional[str] = None) -> int:
+        return self._run("users", path, fmt, self._load_users)
+
+    def import_tags(self, path: str, fmt: Optional[str] = None) -> int:
+        return self._run("tags", path, fmt, self._load_tags)
+
+    def import_posts(self, path: str, fmt: Optional[str] = None) -> int:
+        return self._run("posts", path, fmt, self._load_posts)
+
+    def _run(
+        self,
+        kind: str,
+        path: str,
+        fmt: Optional[str],
+        load_batch: Callable[[Connection, List[Dict[str, Any]]], int],
+    ) -> int:
+        """Charge un fichier ; retourne le nombre de lignes insérées (toutes tables confondues)."""
+        key = f"{kind}:{os.path.abspath(path)}"
+        done = self.checkpoint.get(key, 0)
+        rows = 0
+        start = time.perf_counter()
+        for batch in _batched(read_records(path, fmt, skip=done), self.batch_size):
+            with self.engine.begin() as conn:
+                rows += load_batch(conn, batch)
+            done += len(batch)
+            self._save_checkpoint(key, done)
+            if self.progress:
+                self.progress(kind, done, rows / (time.perf_counter() - start))
+        return rows
+
+    def _save_checkpoint(self, key: str, done: int) -> None:
+        self.checkpoint[key] = done
+        if not self.checkpoint_path:
+            return
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _assign_id(self, conn: Connection, table: Table, id: Optional[int]) -> int:
+        if table.name not in self._next_ids:
+            self._next_ids[table.name] = (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+        if id is None:
+            id = self._next_ids[table.name]
+        self._next_ids[table.name] = max(self._next_ids[table.name], id + 1)
+        return id
+
+    def _hash_passwords(self, passwords: List[str]) -> List[str]:
+        if self._executor is None:
+            return [get_password_hash(password) for password in passwords]
+        return list(self._executor.map(get_password_hash, passwords, chunksize=16))
+
+    def _load_users(self, conn: Connection, records: List[Dict[str, Any]]) -> int:
+        now = datetime.utcnow()
+        hashes = iter(self._hash_passwords([
+            record["password"] for record in records if _empty(record.get("hashed_password"))
+        ]))
+        rows = []
+        for record in records:
+            created_at = _datetime(record.get("created_at")) or now
+            rows.append({
+                "id": self._assign_id(conn, User.__table__, _int(record.get("id"))),
+                "email": record["email"],
+                "username": record["username"],
+                "hashed_password": (
+                    next(hashes) if _empty(record.get("hashed_password")) else record["hashed_password"]
+                ),
+                "full_name": record.get("full_name") or None,
+                "role": _role(record.get("role")),
+                "is_active": _bool(record.get("is_active"), True),
+                "is_superuser": _bool(record.get("is_superuser"), False),
+                "created_at": created_at,
+                "updated_at": _datetime(record.get("updated_at")) or created_at,
+            })
+        return self._insert(conn, User.__table__, rows)
+
+    def _known_tags(self, conn: Connection) -> Dict[str, int]:
+        if self._tag_ids is None:
+            self._tag_ids = dict(conn.execute(select(Tag.name, Tag.id)).all())
+        return self._tag_ids
+
+    def _new_tag_rows(
+        self, conn: Connection, records: List[Dict[str, Any]], now: datetime
+    ) -> List[Dict[str, Any]]:
+        """Lignes à insérer pour les tags inconnus (la table n'est lue qu'une fois)."""
+        known = self._known_tags(conn)
+        rows = []
+        for record in records:
+            name = record["name"]
+            if name in known:
+                continue
+            created_at = _datetime(record.get("created_at")) or now
+            row = {
+                "id": self._assign_id(conn, Tag.__table__, _int(record.get("id"))),
+                "name": name,
+                "description": record.get("description") or None,
+                "created_at": created_at,
+                "updated_at": _datetime(record.get("updated_at")) or created_at,
+            }
+            known[name] = row["id"]
+            rows.append(row)
+        return rows
+
+    def _load_tags(self, conn: Connection, records: List[Dict[str, Any]]) -> int:
+        return self._insert(conn, Tag.__table__, self._new_tag_rows(conn, records, datetime.utcnow()))
+
+    def _load_posts(self, conn: Connection, records: List[Dict[str, Any]]) -> int:
+        now = datetime.utcnow()
+        post_rows = []
+        post_tags = []
+        for record in records:
+            created_at = _datetime(record.get("created_at")) or now
+            post_id = self._assign_id(conn, Post.__table__, _int(record.get("id")))
+            post_rows.append({
+                "id": post_id,
+                "title": record["title"],
+                "content": record["content"],
+                "summary": record.get("summary") or None,
+                "published": _bool(record.get("published"), False),
+                "author_id": int(record["author_id"]),
+                "views_count": _int(record.get("views_count")) or 0,
+                "created_at": created_at,
+                "updated_at": _datetime(record.get("updated_at")) or created_at,
+            })
+            post_tags.append((post_id, created_at, _tag_names(record.get("tags"))))
+
+        # Les tags référencés mais absents de la base sont créés au passage
+        tag_rows = self._new_tag_rows(
+            conn,
+            [{"name": name} for _, _, names in post_tags for name in names],
+            now,
+        )
+        tag_ids = self._known_tags(conn)
+        link_rows = [
+            {"post_id": post_id, "tag_id": tag_ids[name], "created_at": created_at, "updated_at": created_at}
+            for post_id, created_at, names in post_tags
+            for name in names
+        ]
+        inserted = (
+            self._insert(conn, Tag.__table__, tag_rows)
+            + self._insert(conn, Post.__table__, post_rows)
+            + self._insert(conn, PostTag.__table__, link_rows)
+        )
+        self._increment_tag_counts(conn, Counter(row["tag_id"] for row in link_rows))
+        return inserted
+
+    def _increment_tag_counts(self, conn: Connection, counts: Counter) -> None:
+        """Maintient `tags.post_count` : une mise à jour par tag touché dans le lot."""
+        if not counts:
+            return
+        tags = Tag.__table__
+        conn.execute(
+            update(tags)
+            .where(tags.c.id == bindparam("tag_pk"))
+            .values(post_count=tags.c.post_count + bindparam("delta")),
+            [{"tag_pk": tag_id, "delta": delta} for tag_id, delta in counts.items()],
+        )
+
+    def _insert(self, conn: Connection, table: Table, rows: List[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+        if self.dialect == "postgresql":
+            self._copy(conn, table, rows)
+        else:
+            # executemany : PyMySQL le réécrit en INSERT multi-lignes, SQLite le
+            # prépare une seule fois pour tout le lot
+            conn.execute(insert(table), rows)
+        return len(rows)
+
+    def _copy(self, conn: Connection, table: Table, rows: List[Dict[str, Any]]) -> None:
+        columns = list(rows[0].keys())
+        # Mêmes conversions que pour un INSERT (ex. Enum -> nom du membre)
+        processors = [table.c[column].type.bind_processor(conn.dialect) for column in columns]
+        buffer = io.StringIO()
+        # Chaînes entre guillemets, NULL non quoté : "" et NULL restent distincts
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for row in rows:
+            writer.writerow([
+                value if processor is None or value is None else processor(value)
+                for value, processor in zip(row.values(), processors)
+            ])
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
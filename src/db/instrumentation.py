@@ -0,0 +1,216 @@
+import contextvars
+import functools
+import logging
+import random
+import re
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from core.config import settings
+from core.metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+db_queries_per_request = histogram(
+    "db_queries_per_request",
+    "SQL queries issued while handling an HTTP request",
+    ("endpoint",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+db_time_per_request = histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL queries while handling an HTTP request",
+    ("endpoint",),
+)
+db_n_plus_one_requests = counter(
+    "db_n_plus_one_requests_total",
+    "Requests in which a statement shape was executed more than the N+1 threshold",
+    ("endpoint",),
+)
+db_slow_queries = counter(
+    "db_slow_queries_total",
+    "SQL statements slower than SLOW_QUERY_THRESHOLD_MS",
+)
+
+
+class QueryStats:
+    """Requêtes SQL émises pendant le traitement d'une requête HTTP."""
+
+    def __init__(self, route: Optional[str] = None):
+        self.route = route
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Formes de requêtes exécutées plus de `threshold` fois (N+1 probable)."""
+        return {shape: n for shape, n in self.fingerprints.items() if n > threshold}
+
+
+query_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+
+_SPACES = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_PLACEHOLDER_LISTS = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Forme normalisée d'une requête : littéraux remplacés par `?` et listes
+    `IN (...)` réduites, pour que deux exécutions de la même requête avec des
+    paramètres différents aient la même empreinte.
+    """
+    shape = _SPACES.sub(" ", statement).strip()
+    shape = _LITERALS.sub("?", shape)
+    return _PLACEHOLDER_LISTS.sub("(?)", shape)
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Types des paramètres liés, sans leurs valeurs (qui peuvent être sensibles)."""
+    if executemany:
+        rows = list(parameters)
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN (ANALYZE off) ",
+    "mysql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+class SlowQueryLog:
+    """
+    Journal des requêtes SQL lentes.
+
+    Chaque requête au-delà de `threshold_ms` est loggée (SQL normalisé, types des
+    paramètres, durée, route). Une fraction `explain_sample_rate` d'entre elles
+    est ré-exécutée avec EXPLAIN (sans ANALYZE) ; les dernières `size` entrées
+    sont conservées en mémoire, par processus.
+    """
+
+    def __init__(self, threshold_ms: float = 500.0, explain_sample_rate: float = 0.0, size: int = 100):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.entries: deque = deque(maxlen=size)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def record(
+        self,
+        conn: Connection,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+        duration: float,
+    ) -> None:
+        stats = query_stats.get()
+        entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "route": stats.route if stats else None,
+            "duration_ms": round(duration * 1000, 3),
+            "sql": fingerprint(statement),
+            "parameters": parameter_shape(parameters, executemany),
+            "plan": None,
+        }
+        if self._should_explain(conn, statement, context, executemany):
+            entry["plan"] = self._explain(conn, statement, parameters)
+        db_slow_queries.inc()
+        logger.warning(
+            f"Slow query ({entry['duration_ms']:.1f} ms)",
+            extra={key: value for key, value in entry.items() if key not in ("timestamp", "plan")},
+        )
+        self.entries.append(entry)
+
+    def _should_explain(self, conn: Connection, statement: str, context: Any, executemany: bool) -> bool:
+        return (
+            not executemany
+            and conn.dialect.name in EXPLAIN_PREFIXES
+            # Seules les lectures sont ré-exécutées ; pas pendant un curseur côté serveur
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and not context.execution_options.get("stream_results", False)
+            and random.random() < self.explain_sample_rate
+        )
+
+    def _explain(self, conn: Connection, statement: str, parameters: Any) -> List[str]:
+        conn.info["explaining"] = True
+        try:
+            # Savepoint : un EXPLAIN en échec n'interrompt pas la transaction de la requête (PostgreSQL)
+            with conn.begin_nested():
+                rows = conn.exec_driver_sql(EXPLAIN_PREFIXES[conn.dialect.name] + statement, parameters).fetchall()
+            return [" | ".join(str(column) for column in row) for row in rows]
+        except Exception as e:
+            logger.warning(f"EXPLAIN of slow query failed: {str(e)}")
+            return [f"EXPLAIN failed: {str(e)}"]
+        finally:
+            conn.info["explaining"] = False
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    size=settings.SLOW_QUERY_LOG_SIZE,
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if query_stats.get() is not None or slow_query_log.enabled:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    start = getattr(context, "_query_start_time", None)
+    if start is None or conn.info.get("explaining"):
+        return
+    duration = time.perf_counter() - start
+    stats = query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if slow_query_log.enabled and duration * 1000 >= slow_query_log.threshold_ms:
+        slow_query_log.record(conn, statement, parameters, context, executemany, duration)
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Comptabilise les requêtes du moteur dans le `QueryStats` de la requête HTTP courante."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def observe_request(stats: QueryStats, endpoint: str, n_plus_one_threshold: int) -> Dict[str, Any]:
+    """Publie les métriques d'une requête HTTP et retourne le résumé à journaliser."""
+    repeated = stats.repeated(n_plus_one_threshold)
+    db_queries_per_request.labels(endpoint=endpoint).observe(stats.count)
+    db_time_per_request.labels(endpoint=endpoint).observe(stats.total_time)
+    if repeated:
+        db_n_plus_one_requests.labels(endpoint=endpoint).inc()
+    return {
+        "db_queries": stats.count,
+        "db_time": stats.total_time,
+        "n_plus_one": repeated,
+    }
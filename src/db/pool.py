@@ -0,0 +1,150 @@
+import logging
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+from core.config import Settings
+from core.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+POOL_CHECKOUT_SECONDS = histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a connection from the pool",
+    ("pool",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+POOL_CHECKOUT_TIMEOUTS = counter(
+    "db_pool_checkout_timeouts_total",
+    "Pool checkouts that timed out",
+    ("pool",),
+)
+POOL_IN_USE = gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out",
+    ("pool",),
+)
+POOL_OVERFLOW = gauge(
+    "db_pool_overflow_connections",
+    "Connections opened beyond pool_size",
+    ("pool",),
+)
+POOL_CONNECTIONS_CREATED = counter(
+    "db_pool_connections_created_total",
+    "New DBAPI connections opened",
+    ("pool",),
+)
+POOL_CONNECTION_AGE = histogram(
+    "db_pool_connection_age_seconds",
+    "Age of connections when they are checked out",
+    ("pool",),
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200),
+)
+
+
+class InstrumentedPoolMixin:
+    """Mesure l'attente de checkout (y compris l'ouverture de connexion)."""
+
+    metrics_name = "primary"
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.labels(self.metrics_name).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedNullPool(InstrumentedPoolMixin, NullPool):
+    pass
+
+
+def engine_options(settings: Settings) -> Dict[str, Any]:
+    """
+    Paramètres de pool pour `create_engine` selon `DB_POOL_PROFILE`.
+
+    - "default" : QueuePool par processus, dimensionné par DB_POOL_SIZE /
+      DB_MAX_OVERFLOW, ou réparti depuis DB_CONNECTION_BUDGET.
+    - "pgbouncer" : NullPool, la mutualisation est faite par PgBouncer en mode
+      transaction ; chaque session ouvre une connexion vers le pooler.
+    """
+    if settings.DB_POOL_PROFILE == "pgbouncer":
+        return {"poolclass": InstrumentedNullPool}
+    if settings.DB_POOL_PROFILE != "default":
+        raise ValueError("DB_POOL_PROFILE must be either 'default' or 'pgbouncer'")
+
+    pool_size = settings.DB_POOL_SIZE
+    max_overflow = settings.DB_MAX_OVERFLOW
+    if settings.DB_CONNECTION_BUDGET:
+        processes = settings.WEB_CONCURRENCY * settings.APP_REPLICAS
+        pool_size = max(1, settings.DB_CONNECTION_BUDGET // processes)
+        max_overflow = 0
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def max_connections(settings: Settings) -> int:
+    """Nombre maximal de connexions ouvertes par l'ensemble des processus."""
+    options = engine_options(settings)
+    if options["poolclass"] is InstrumentedNullPool:
+        return 0
+    per_process = options["pool_size"] + options["max_overflow"]
+    return per_process * settings.WEB_CONCURRENCY * settings.APP_REPLICAS
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Branche les métriques Prometheus sur les événements du pool."""
+    pool = engine.pool
+    if isinstance(pool, InstrumentedPoolMixin):
+        pool.metrics_name = name
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        connection_record.info["connected_at"] = time.time()
+        POOL_CONNECTIONS_CREATED.labels(name).inc()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        POOL_IN_USE.labels(name).inc()
+        connected_at = connection_record.info.get("connected_at")
+        if connected_at is not None:
+            POOL_CONNECTION_AGE.labels(name).observe(time.time() - connected_at)
+        if isinstance(engine.pool, QueuePool):
+            POOL_OVERFLOW.labels(name).set(max(0, engine.pool.overflow()))
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        POOL_IN_USE.labels(name).dec()
+        if isinstance(engine.pool, QueuePool):
+            POOL_OVERFLOW.labels(name).set(max(0, engine.pool.overflow()))
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"class": type(pool).__name__}
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+        "checked_in": pool.checkedin(),
+    }
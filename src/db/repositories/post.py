@@ -1,77 +1,353 @@
-from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session, defer, joinedload, load_only, raiseload, selectinload
+from sqlalchemy import Select, and_, bindparam, event, func, or_, select, update
 from fastapi import HTTPException, status
 
+from db.routing import read_only, read_write
+from db.search import has_search_terms, search_subquery
 from models.post import Post, Tag, PostTag
+from models.user import User
 from schemas.post import PostCreate, PostUpdate
 
+# Requêtes "chaudes" construites une seule fois (compilation SQL mise en cache)
+GET_POST_BY_ID = select(Post).where(Post.id == bindparam("post_id"))
+GET_TAG_BY_NAME = select(Tag).where(Tag.name == bindparam("name"))
+
+class TagIdCache:
+    """
+    Cache nom de tag -> id, propre au processus.
+
+    Un tag n'est jamais renommé ni supprimé par l'API : seuls les noms existants
+    sont mis en cache, et le cache est vidé si la table `tags` est supprimée.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, names: Iterable[str]) -> Tuple[Dict[str, int], List[str]]:
+        """Retourne les ids connus et la liste des noms absents du cache."""
+        found, missing = {}, []
+        for name in names:
+            if name in self._ids:
+                found[name] = self._ids[name]
+            else:
+                missing.append(name)
+        return found, missing
+
+    def update(self, ids: Dict[str, int]) -> None:
+        with self._lock:
+            if len(self._ids) + len(ids) > self.max_size:
+                self._ids.clear()
+            self._ids.update(ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+tag_id_cache = TagIdCache()
+
+@event.listens_for(Tag.__table__, "after_drop")
+def _clear_tag_id_cache(*args, **kwargs) -> None:
+    tag_id_cache.clear()
+
+def tagged_post_ids(tag_ids: List[int], mode: str = "any") -> Select:
+    """
+    Sous-requête des ids de posts ayant au moins un (`any`) ou tous (`all`) les tags.
+
+    `any` est une simple semi-jointure IN ; `all` regroupe par post et ne garde
+    que ceux qui ont autant de tags distincts que demandé. Les deux lisent
+    uniquement l'index (tag_id, post_id) de post_tags.
+    """
+    query = select(PostTag.post_id).where(PostTag.tag_id.in_(tag_ids))
+    if mode == "all" and len(tag_ids) > 1:
+        query = query.group_by(PostTag.post_id).having(
+            func.count(PostTag.tag_id.distinct()) == len(tag_ids)
+        )
+    return query
+
+def sparse_post_options(fields: Sequence[str], include: Sequence[str] = ()) -> list:
+    """
+    Options de chargement d'un sparse fieldset : seules les colonnes `fields`
+    sont lues, et seules les relations de `include` sont chargées (tags par
+    une requête IN, auteur par jointure). Le reste lève une erreur au lieu
+    d'être chargé paresseusement.
+    """
+    options = [load_only(*(getattr(Post, name) for name in fields), raiseload=True)]
+    if "tags" in include:
+        options.append(selectinload(Post.tags))
+    if "author" in include:
+        options.append(
+            joinedload(Post.author).load_only(User.id, User.username, User.email, User.full_name)
+        )
+    options.append(raiseload("*"))
+    return options
+
 class PostRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    @read_only
     def get_tag_by_name(self, name: str) -> Optional[Tag]:
-        return self.db.query(Tag).filter(Tag.name == name).first()
+        return self.db.scalars(GET_TAG_BY_NAME, {"name": name}).first()
 
-    def create_tag(self, name: str, description: Optional[str] = None) -> Tag:
-        db_tag = Tag(name=name, description=description)
-        self.db.add(db_tag)
+    def _get_or_create_tags(self, names: List[str]) -> List[Tag]:
+        """
+        Tags correspondant à `names` (dédoublonnés, dans l'ordre).
+
+        Une seule requête pour les tags existants ; les autres sont ajoutés à la
+        session sans commit, pour être insérés dans la même transaction que le post.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return []
+        existing = {
+            tag.name: tag
+            for tag in self.db.scalars(select(Tag).where(Tag.name.in_(names)))
+        }
+        tags = []
+        for name in names:
+            tag = existing.get(name)
+            if tag is None:
+                tag = Tag(name=name)
+                self.db.add(tag)
+            tags.append(tag)
+        return tags
+
+    @read_only
+    def get_tags(
+        self,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        sort: str = "name"
+    ) -> List[Tag]:
+        """Liste des tags, par nom ou par popularité (`sort="popular"`)."""
+        query = self.db.query(Tag)
+        if sort == "popular":
+            query = query.order_by(Tag.post_count.desc(), Tag.name)
+        else:
+            query = query.order_by(Tag.name)
+        return query.offset(skip).limit(limit).all()
+
+    def _adjust_tag_counts(self, added: Iterable[int] = (), removed: Iterable[int] = ()) -> None:
+        """
+        Met à jour `Tag.post_count` dans la transaction courante.
+
+        Incrément SQL (`post_count = post_count + 1`) : pas de lecture préalable,
+        donc pas de mise à jour perdue entre requêtes concurrentes.
+        """
+        for tag_ids, delta in ((set(added), 1), (set(removed), -1)):
+            if tag_ids:
+                self.db.execute(
+                    update(Tag)
+                    .where(Tag.id.in_(tag_ids))
+                    .values(post_count=Tag.post_count + delta)
+                )
+
+    @read_write
+    def refresh_tag_counts(self) -> None:
+        """Recalcule tous les `post_count` depuis post_tags (rattrapage, ex. après un import)."""
+        counts = (
+            select(func.count(PostTag.post_id.distinct()))
+            .where(PostTag.tag_id == Tag.id)
+            .scalar_subquery()
+        )
+        self.db.execute(
+            update(Tag).values(post_count=counts),
+            execution_options={"synchronize_session": False},
+        )
         self.db.commit()
-        self.db.refresh(db_tag)
-        return db_tag
+        self.db.expire_all()
 
-    def get_or_create_tag(self, name: str) -> Tag:
-        tag = self.get_tag_by_name(name)
-        if not tag:
-            tag = self.create_tag(name)
-        return tag
+    @read_only
+    def get_tag_ids(self, names: List[str]) -> Dict[str, int]:
+        """Résout des noms de tags en ids ; les noms inconnus sont absents du résultat."""
+        ids, missing = tag_id_cache.get_many(names)
+        if missing:
+            found = dict(self.db.execute(
+                select(Tag.name, Tag.id).where(Tag.name.in_(missing))
+            ).all())
+            tag_id_cache.update(found)
+            ids.update(found)
+        return ids
 
-    def get(self, post_id: int) -> Optional[Post]:
-        return self.db.query(Post).filter(Post.id == post_id).first()
+    @read_only
+    def get(
+        self,
+        post_id: int,
+        fields: Optional[Sequence[str]] = None,
+        include: Sequence[str] = ()
+    ) -> Optional[Post]:
+        """Avec `fields`, ne charge que ces colonnes et les relations de `include`."""
+        statement = GET_POST_BY_ID
+        if fields is not None:
+            statement = statement.options(*sparse_post_options(fields, include))
+        return self.db.scalars(statement, {"post_id": post_id}).first()
 
+    @read_only
     def get_multi(
         self, 
         skip: int = 0, 
         limit: int = 100, 
         author_id: Optional[int] = None,
         tag: Optional[str] = None,
-        published: Optional[bool] = None
+        published: Optional[bool] = None,
+        summary: bool = False,
+        tags: Optional[List[str]] = None,
+        tag_mode: str = "any",
+        fields: Optional[Sequence[str]] = None,
+        include: Sequence[str] = ()
     ) -> Tuple[List[Post], int]:
+        """
+        Liste paginée des posts.
+
+        `tags` filtre sur plusieurs tags : au moins un (`tag_mode="any"`) ou
+        tous (`tag_mode="all"`) ; `tag` est ajouté à cette liste.
+        Avec `summary=True`, `content` n'est pas chargé (et ne peut pas l'être
+        par accident) : pour les listes qui n'affichent que titre et résumé.
+        `fields` et `include` (sparse fieldset) remplacent `summary`.
+        """
         query = self.db.query(Post)
 
         if author_id is not None:
             query = query.filter(Post.author_id == author_id)
         
-        if tag:
-            query = query.join(PostTag).join(Tag).filter(Tag.name == tag)
+        tag_names = list(dict.fromkeys([*(tags or []), *([tag] if tag else [])]))
+        if tag_names:
+            tag_ids = self.get_tag_ids(tag_names)
+            # Tag inexistant : aucun post ne peut correspondre
+            if not tag_ids or (tag_mode == "all" and len(tag_ids) < len(tag_names)):
+                return [], 0
+            query = query.filter(Post.id.in_(tagged_post_ids(list(tag_ids.values()), tag_mode)))
             
         if published is not None:
             query = query.filter(Post.published == published)
 
         total = query.count()
-        posts = query.offset(skip).limit(limit).all()
+        if fields is not None:
+            query = query.options(*sparse_post_options(fields, include))
+        elif summary:
+            query = query.options(
+                defer(Post.content, raiseload=True),
+                selectinload(Post.tags),
+            )
+        posts = (
+            query.order_by(Post.created_at.desc(), Post.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
         
         return posts, total
 
+    @read_only
+    def iter_export(
+        self,
+        author_id: Optional[int] = None,
+        tag: Optional[str] = None,
+        published: Optional[bool] = None,
+        updated_since: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[Post]]:
+        """
+        Parcourt tous les posts correspondant aux filtres, par lots de `batch_size`.
+
+        Les lignes sont lues via un curseur côté serveur (`yield_per`) et chaque
+        lot est détaché de la session une fois consommé : la mémoire reste
+        constante quelle que soit la taille de la table.
+        """
+        query = select(Post).options(selectinload(Post.tags))
+
+        if author_id is not None:
+            query = query.where(Post.author_id == author_id)
+
+        if tag:
+            query = query.where(Post.id.in_(
+                select(PostTag.post_id).join(Tag).where(Tag.name == tag)
+            ))
+
+        if published is not None:
+            query = query.where(Post.published == published)
+
+        if updated_since is not None:
+            query = query.where(Post.updated_at >= updated_since)
+
+        result = self.db.scalars(
+            query.order_by(Post.id).execution_options(yield_per=batch_size)
+        )
+        try:
+            for batch in result.partitions():
+                yield batch
+                for post in batch:
+                    self.db.expunge(post)
+        finally:
+            result.close()
+
+    @read_only
+    def search(
+        self,
+        q: str,
+        limit: int = 10,
+        after: Optional[Tuple[float, int]] = None,
+        author_id: Optional[int] = None,
+        tag: Optional[str] = None,
+        published: Optional[bool] = None
+    ) -> List[Tuple[Post, float]]:
+        """Recherche plein texte, triée par pertinence puis par id (pagination par curseur)."""
+        if not has_search_terms(q):
+            return []
+
+        dialect = self.db.get_bind().dialect.name
+        search = search_subquery(dialect, q)
+        query = (
+            select(Post, search.c.rank)
+            .join(search, search.c.id == Post.id)
+            .options(selectinload(Post.tags))
+        )
+
+        if author_id is not None:
+            query = query.where(Post.author_id == author_id)
+
+        if tag:
+            query = query.where(Post.id.in_(
+                select(PostTag.post_id).join(Tag).where(Tag.name == tag)
+            ))
+
+        if published is not None:
+            query = query.where(Post.published == published)
+
+        if after is not None:
+            rank, post_id = after
+            query = query.where(or_(
+                search.c.rank < rank,
+                and_(search.c.rank == rank, Post.id < post_id),
+            ))
+
+        query = query.order_by(search.c.rank.desc(), Post.id.desc()).limit(limit)
+        return [(post, rank) for post, rank in self.db.execute(query).all()]
+
+    @read_write
     def create(self, obj_in: PostCreate, author_id: int) -> Post:
         db_post = Post(
             title=obj_in.title,
             content=obj_in.content,
             summary=obj_in.summary,
             published=obj_in.published,
-            author_id=author_id
+            author_id=author_id,
+            tags=self._get_or_create_tags(obj_in.tags or [])
         )
         self.db.add(db_post)
-        self.db.flush()  # Permet d'obtenir l'ID avant d'ajouter des relations
-        if obj_in.tags:
-            for tag_name in obj_in.tags:
-                tag = self.get_or_create_tag(tag_name)
-                if tag not in db_post.tags:
-                    db_post.tags.append(tag)
+        # Un seul flush : nouveaux tags, post et liens post_tags (id récupérés via RETURNING)
+        self.db.flush()
+        self._adjust_tag_counts(added=[tag.id for tag in db_post.tags])
+        # Sans expiration au commit (voir SessionLocal), pas de SELECT de rechargement
         self.db.commit()
-        self.db.refresh(db_post)
         return db_post
 
+    @read_write
     def update(
         self, 
         post_id: int, 
@@ -92,22 +368,26 @@ class PostRepository:
         update_data = obj_in.model_dump(exclude_unset=True)
         
         # Handle tags separately
+        old_tag_ids = None
         if "tags" in update_data:
-            tags = update_data.pop("tags")
-            db_post.tags = []  # Remove existing tags
-            for tag_name in tags:
-                tag = self.get_or_create_tag(tag_name)
-                db_post.tags.append(tag)
+            old_tag_ids = {tag.id for tag in db_post.tags}
+            db_post.tags = self._get_or_create_tags(update_data.pop("tags") or [])
 
         # Update other fields
         for field, value in update_data.items():
             setattr(db_post, field, value)
 
-        self.db.add(db_post)
+        self.db.flush()
+        if old_tag_ids is not None:
+            new_tag_ids = {tag.id for tag in db_post.tags}
+            self._adjust_tag_counts(
+                added=new_tag_ids - old_tag_ids,
+                removed=old_tag_ids - new_tag_ids
+            )
         self.db.commit()
-        self.db.refresh(db_post)
         return db_post
 
+    @read_write
     def delete(self, post_id: int, current_user_id: int) -> bool:
         db_post = self.get(post_id)
         if not db_post:
@@ -120,10 +400,12 @@ class PostRepository:
                 detail="Not enough permissions"
             )
 
+        self._adjust_tag_counts(removed=[tag.id for tag in db_post.tags])
         self.db.delete(db_post)
         self.db.commit()
         return True
 
+    @read_only
     def get_post_count_by_author(self, author_id: int) -> int:
         return self.db.query(func.count(Post.id)).filter(
             Post.author_id == author_id
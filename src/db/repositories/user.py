@@ -1,49 +1,160 @@
-from typing import Optional, List
+import re
+from typing import Optional, List, Set, Tuple
 from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, event, or_, select, update
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
+from db.routing import read_only, read_write
 from models.user import User
+from core.principal_cache import principal_cache
+from core.revocation import revocation_list
 from core.security import get_password_hash
 from schemas.user import UserCreate, UserUpdate
 
+# Requêtes "chaudes" construites une seule fois : SQLAlchemy réutilise leur
+# compilation SQL en cache, seuls les paramètres changent d'un appel à l'autre
+GET_USER_BY_ID = select(User).where(User.id == bindparam("id"))
+GET_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+GET_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+
+DUPLICATE_DETAILS = {
+    "email": "A user with this email already exists",
+    "username": "A user with this username already exists",
+}
+# Index unique violé, selon le SGBD :
+# SQLite "UNIQUE constraint failed: users.email",
+# PostgreSQL/MySQL "... constraint/key 'ix_users_email'"
+_DUPLICATE_FIELD = re.compile(r"(?:ix_users_|users\.)(email|username)\b")
+
+def duplicate_detail(error: IntegrityError) -> str:
+    """Message d'erreur correspondant à la contrainte d'unicité violée."""
+    matches = _DUPLICATE_FIELD.findall(str(error.orig))
+    if matches:
+        # MySQL cite la valeur avant la clé : la dernière occurrence est la clé
+        return DUPLICATE_DETAILS[matches[-1]]
+    return "User with this email or username already exists"
+
+@event.listens_for(User.__table__, "after_drop")
+def _clear_principal_cache(*args, **kwargs) -> None:
+    principal_cache.clear()
+
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    @read_only
     def get(self, id: int) -> Optional[User]:
-        return self.db.query(User).filter(User.id == id).first()
+        return self.db.scalars(GET_USER_BY_ID, {"id": id}).first()
 
+    @read_only
     def get_by_email(self, email: str) -> Optional[User]:
-        return self.db.query(User).filter(User.email == email).first()
+        return self.db.scalars(GET_USER_BY_EMAIL, {"email": email}).first()
 
+    @read_only
     def get_by_username(self, username: str) -> Optional[User]:
-        return self.db.query(User).filter(User.username == username).first()
+        return self.db.scalars(GET_USER_BY_USERNAME, {"username": username}).first()
 
+    @read_only
     def get_all(self, skip: int = 0, limit: int = 100) -> List[User]:
         return self.db.query(User).offset(skip).limit(limit).all()
 
-    def create(self, user_in: UserCreate) -> User:
-        db_user = User(
+    @staticmethod
+    def _new_user(user_in: UserCreate, hashed_password: str) -> User:
+        return User(
             email=user_in.email,
             username=user_in.username,
-            hashed_password=get_password_hash(user_in.password),
+            hashed_password=hashed_password,
             full_name=user_in.full_name,
             role=user_in.role,
             is_active=user_in.is_active
         )
+
+    @read_write
+    def create(self, user_in: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """
+        `hashed_password` évite de hacher dans le thread appelant s'il a déjà été calculé.
+        Pas de vérification préalable : les index uniques tranchent en un seul INSERT.
+        """
+        db_user = self._new_user(user_in, hashed_password or get_password_hash(user_in.password))
         try:
             self.db.add(db_user)
             self.db.commit()
-            self.db.refresh(db_user)
             return db_user
-        except IntegrityError:
+        except IntegrityError as e:
             self.db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User with this email or username already exists"
+                detail=duplicate_detail(e)
             )
 
+    @read_write
+    def filter_duplicates(
+        self,
+        batch: List[Tuple[int, UserCreate]],
+        seen_emails: Set[str],
+        seen_usernames: Set[str],
+    ) -> Tuple[List[Tuple[int, UserCreate]], List[Tuple[int, str]]]:
+        """
+        Écarte d'un lot `(index, utilisateur)`, en une seule requête, les doublons
+        en base ou déjà vus plus tôt dans la requête (`seen_*`, complétés au
+        passage). Retourne les lignes à insérer et les erreurs `(index, détail)`.
+        """
+        taken = self.db.execute(
+            select(User.email, User.username).where(or_(
+                User.email.in_([user_in.email for _, user_in in batch]),
+                User.username.in_([user_in.username for _, user_in in batch]),
+            ))
+        ).all()
+        seen_emails.update(row.email for row in taken)
+        seen_usernames.update(row.username for row in taken)
+
+        rows: List[Tuple[int, UserCreate]] = []
+        errors: List[Tuple[int, str]] = []
+        for index, user_in in batch:
+            if user_in.email in seen_emails:
+                errors.append((index, DUPLICATE_DETAILS["email"]))
+                continue
+            if user_in.username in seen_usernames:
+                errors.append((index, DUPLICATE_DETAILS["username"]))
+                continue
+            seen_emails.add(user_in.email)
+            seen_usernames.add(user_in.username)
+            rows.append((index, user_in))
+        return rows, errors
+
+    @read_write
+    def insert_many(
+        self,
+        rows: List[Tuple[int, UserCreate, str]],
+    ) -> Tuple[List[User], List[Tuple[int, str]]]:
+        """
+        Insère un lot `(index, utilisateur, hash)` déjà filtré par `filter_duplicates`,
+        en un INSERT multi-lignes. Retourne les utilisateurs créés et les erreurs.
+        """
+        created: List[User] = []
+        errors: List[Tuple[int, str]] = []
+        users = [self._new_user(user_in, hashed_password) for _, user_in, hashed_password in rows]
+        try:
+            self.db.add_all(users)
+            self.db.commit()
+            created.extend(users)
+        except IntegrityError:
+            # Inscription concurrente entre la vérification et l'INSERT :
+            # on rejoue le lot ligne par ligne pour isoler les doublons
+            self.db.rollback()
+            for index, user_in, hashed_password in rows:
+                db_user = self._new_user(user_in, hashed_password)
+                try:
+                    with self.db.begin_nested():
+                        self.db.add(db_user)
+                    created.append(db_user)
+                except IntegrityError as e:
+                    errors.append((index, duplicate_detail(e)))
+            self.db.commit()
+        return created, errors
+
+    @read_write
     def update(self, id: int, user_in: UserUpdate) -> Optional[User]:
         db_user = self.get(id)
         if not db_user:
@@ -56,26 +167,45 @@ class UserRepository:
         for field, value in update_data.items():
             setattr(db_user, field, value)
 
+        # Révocation avant le commit : si Redis échoue (503), rien n'est modifié
+        if update_data.get("is_active") is False:
+            revocation_list.revoke_user(id)
         try:
             self.db.commit()
-            self.db.refresh(db_user)
-            return db_user
         except IntegrityError:
             self.db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this email or username already exists"
             )
+        # Rôle ou statut potentiellement modifiés : get_current_user relira la base
+        principal_cache.invalidate(id)
+        return db_user
 
+    @read_write
     def delete(self, id: int) -> bool:
         db_user = self.get(id)
         if not db_user:
             return False
         
+        revocation_list.revoke_user(id)
         self.db.delete(db_user)
         self.db.commit()
+        principal_cache.invalidate(id)
         return True
 
+    @read_write
+    def update_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """Remplace le hash seulement s'il n'a pas changé entre-temps (ex. nouveau mot de passe)."""
+        result = self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    @read_write
     def update_refresh_token(self, user_id: int, refresh_token: Optional[str]) -> None:
         db_user = self.get(user_id)
         if db_user:
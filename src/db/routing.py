@@ -0,0 +1,239 @@
+import contextvars
+import functools
+import inspect
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+logger = logging.getLogger(__name__)
+
+
+class ReadConsistency:
+    """
+    État de cohérence "read-your-writes" d'une requête HTTP.
+
+    `min_timestamp` provient du cookie envoyé par le client : un réplica n'est
+    utilisable que s'il a rejoué les écritures jusqu'à cet instant.
+    `last_write_at` est renseigné après un commit contenant des écritures.
+    """
+
+    def __init__(self, min_timestamp: Optional[float] = None):
+        self.min_timestamp = min_timestamp
+        self.last_write_at: Optional[float] = None
+
+
+read_consistency: contextvars.ContextVar[Optional[ReadConsistency]] = contextvars.ContextVar(
+    "read_consistency", default=None
+)
+
+
+def measure_replication_lag(connection: Connection) -> float:
+    """Retourne le retard de réplication (en secondes) du serveur connecté."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        # Un réplica qui a tout rejoué est à jour même si le primaire est inactif
+        lag = connection.execute(text(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+        )).scalar()
+        return float(lag or 0)
+    if dialect == "mysql":
+        row = connection.execute(text("SHOW REPLICA STATUS")).mappings().first()
+        if row is None:
+            return 0.0
+        lag = row.get("Seconds_Behind_Source")
+        if lag is None:
+            # Réplication arrêtée
+            return float("inf")
+        return float(lag)
+    connection.execute(text("SELECT 1"))
+    return 0.0
+
+
+class ReplicaState:
+    """Dernier état de santé connu d'un réplica."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+
+    @property
+    def caught_up_to(self) -> float:
+        """Instant jusqu'auquel le réplica a rejoué les écritures du primaire."""
+        return self.checked_at - (self.lag or 0.0)
+
+
+class ReplicaRouter:
+    """Sélectionne un réplica sain pour les lectures, ou None pour le primaire."""
+
+    def __init__(
+        self,
+        engines: List[Engine],
+        max_lag: float = 5.0,
+        check_interval: float = 10.0,
+    ):
+        self.replicas = [ReplicaState(engine) for engine in engines]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+
+    def check(self, replica: ReplicaState) -> None:
+        try:
+            with replica.engine.connect() as connection:
+                lag = measure_replication_lag(connection)
+            replica.lag = lag
+            replica.healthy = lag <= self.max_lag
+            if not replica.healthy:
+                logger.warning(
+                    f"Replica {replica.engine.url.host} is lagging by {lag:.1f}s, "
+                    "falling back to primary"
+                )
+        except Exception as e:
+            logger.warning(f"Replica {replica.engine.url.host} health check failed: {str(e)}")
+            replica.lag = None
+            replica.healthy = False
+        replica.checked_at = time.time()
+
+    def refresh(self, force: bool = False) -> None:
+        """Revérifie les réplicas dont l'état date de plus de `check_interval`."""
+        now = time.time()
+        stale = [
+            replica for replica in self.replicas
+            if force or now - replica.checked_at >= self.check_interval
+        ]
+        if not stale:
+            return
+        # Un seul thread vérifie à la fois, les autres utilisent l'état connu
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            for replica in stale:
+                self.check(replica)
+        finally:
+            self._lock.release()
+
+    def choose(self, min_timestamp: Optional[float] = None) -> Optional[Engine]:
+        if not self.replicas:
+            return None
+        self.refresh()
+        candidates = [
+            replica for replica in self.replicas
+            if replica.healthy and (min_timestamp is None or replica.caught_up_to >= min_timestamp)
+        ]
+        if not candidates:
+            return None
+        return random.choice(candidates).engine
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "host": replica.engine.url.host,
+                "healthy": replica.healthy,
+                "lag": replica.lag,
+                "checked_at": replica.checked_at,
+            }
+            for replica in self.replicas
+        ]
+
+
+class RoutingSession(Session):
+    """
+    Session qui envoie les SELECT des méthodes `@read_only` vers un réplica.
+
+    Dès qu'une écriture a lieu (ou qu'une méthode `@read_write` est appelée),
+    la session reste attachée au primaire jusqu'à sa fermeture.
+    """
+
+    def __init__(self, *args: Any, router: Optional[ReplicaRouter] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.router is not None
+            and self.info.get("replica_reads")
+            and not self.info.get("pinned")
+            and not self._flushing
+            and isinstance(clause, Select)
+        ):
+            state = read_consistency.get()
+            replica = self.router.choose(state.min_timestamp if state else None)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_after_flush(session: Session, flush_context: Any) -> None:
+    session.info["pinned"] = True
+    session.info["has_writes"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_write(session: Session) -> None:
+    if session.info.pop("has_writes", False):
+        state = read_consistency.get()
+        if state is not None:
+            state.last_write_at = time.time()
+
+
+def pin_primary(session: Session) -> None:
+    """Force toutes les requêtes suivantes de la session vers le primaire."""
+    session.info["pinned"] = True
+
+
+def read_only(func: Callable) -> Callable:
+    """Marque une méthode de repository comme pouvant lire sur un réplica."""
+    if inspect.isgeneratorfunction(func):
+        return _read_only_generator(func)
+
+    @functools.wraps(func)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        info = self.db.info
+        previous = info.get("replica_reads", False)
+        info["replica_reads"] = True
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            info["replica_reads"] = previous
+    return wrapper
+
+
+def _read_only_generator(func: Callable) -> Callable:
+    """Variante de `read_only` pour les générateurs : les requêtes sont émises à chaque `next()`."""
+    @functools.wraps(func)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        info = self.db.info
+        generator = func(self, *args, **kwargs)
+        try:
+            while True:
+                previous = info.get("replica_reads", False)
+                info["replica_reads"] = True
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    info["replica_reads"] = previous
+                yield item
+        finally:
+            generator.close()
+    return wrapper
+
+
+def read_write(func: Callable) -> Callable:
+    """Marque une méthode de repository qui écrit : la session passe sur le primaire."""
+    @functools.wraps(func)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        pin_primary(self.db)
+        return func(self, *args, **kwargs)
+    return wrapper
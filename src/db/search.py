@@ -0,0 +1,66 @@
+import base64
+import json
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import Subquery, column, func, literal_column, select, table
+from sqlalchemy.dialects.mysql import match as mysql_match
+
+from models.post import Post
+
+# Table virtuelle FTS5 créée par models/post.py (SQLite uniquement)
+posts_fts = table("posts_fts", column("rowid"))
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+def has_search_terms(q: str) -> bool:
+    return _WORD_RE.search(q) is not None
+
+def fts5_query(q: str) -> str:
+    """Transforme une saisie libre en requête FTS5 sûre (tous les mots requis)."""
+    return " ".join(f'"{word}"' for word in _WORD_RE.findall(q))
+
+def search_subquery(dialect: str, q: str) -> Subquery:
+    """
+    Retourne une sous-requête (id, rank) des posts correspondant à `q`.
+
+    Plus `rank` est élevé, plus le post est pertinent, quel que soit le dialecte.
+    """
+    if dialect == "postgresql":
+        ts_query = func.websearch_to_tsquery("simple", q)
+        vector = literal_column("posts.search_vector")
+        stmt = select(
+            Post.id.label("id"),
+            func.ts_rank_cd(vector, ts_query).label("rank"),
+        ).where(vector.op("@@")(ts_query))
+    elif dialect == "mysql":
+        score = mysql_match(Post.title, Post.summary, Post.content, against=q).in_natural_language_mode()
+        stmt = select(Post.id.label("id"), score.label("rank")).where(score > 0)
+    elif dialect == "sqlite":
+        # bm25() est négatif : plus il est petit, plus le document est pertinent
+        stmt = (
+            select(
+                posts_fts.c.rowid.label("id"),
+                (-func.bm25(literal_column("posts_fts"))).label("rank"),
+            )
+            .select_from(posts_fts)
+            .where(literal_column("posts_fts").op("MATCH")(fts5_query(q)))
+        )
+    else:
+        raise ValueError(f"Full-text search is not supported on {dialect}")
+    return stmt.subquery("search")
+
+def encode_cursor(rank: float, post_id: int) -> str:
+    raw = json.dumps([rank, post_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    """Décode un curseur de pagination ; lève ValueError s'il est invalide."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, post_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(rank), int(post_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
@@ -1,19 +1,54 @@
+import logging
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from core.config import settings
+from db.instrumentation import instrument_queries
+from db.pool import engine_options, instrument_pool, max_connections
+from db.routing import ReplicaRouter, RoutingSession
+
+logger = logging.getLogger(__name__)
 
 # Créer le moteur de base de données
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600,
+    **engine_options(settings),
+)
+instrument_pool(engine, "primary")
+instrument_queries(engine)
+
+# Moteurs des réplicas en lecture (optionnels)
+replica_engines = []
+for url in settings.DATABASE_REPLICA_URLS:
+    replica_engine = create_engine(url, **engine_options(settings))
+    instrument_pool(replica_engine, f"replica:{replica_engine.url.host}")
+    instrument_queries(replica_engine)
+    replica_engines.append(replica_engine)
+
+logger.info(
+    f"Database pool profile '{settings.DB_POOL_PROFILE}': up to {max_connections(settings)} "
+    f"connections per database server ({settings.WEB_CONCURRENCY} workers x "
+    f"{settings.APP_REPLICAS} replicas)"
+)
+
+replica_router = ReplicaRouter(
+    replica_engines,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL,
 )
 
 # Créer une session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Une session par requête HTTP : les objets restent chargés après commit
+# (valeurs générées récupérées au flush), sans SELECT de rechargement
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+    router=replica_router if replica_engines else None,
+)
 
 def get_db():
     """Dépendance qui fournit une session de base de données."""
@@ -21,4 +56,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
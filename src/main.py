@@ -1,8 +1,9 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 import logging
 import time
 import uuid
@@ -11,7 +12,18 @@ from core.config import settings
 from core.logging import setup_logging, RequestIdFilter
 from core.docs import description, tags_metadata, responses
 from core.rate_limiter import create_rate_limiter
+from core.metrics import PROMETHEUS_AVAILABLE, render_metrics
+from core.serialization import FastJSONResponse
+from core.compression import ENCODINGS
+from core.jwt_keys import key_set
+from core.password_hashing import password_executor
+from core.revocation import revocation_list
+from api.middlewares.compression import CompressionMiddleware
 from api.middlewares.rate_limiting import RateLimitMiddleware
+from api.middlewares.read_consistency import ReadConsistencyMiddleware
+from db.instrumentation import QueryStats, observe_request, query_stats
+from db.pool import pool_status
+from db.session import engine, replica_router
 from api.v1.api import api_router
 
 # Setup logging
@@ -21,6 +33,15 @@ logger = logging.getLogger(__name__)
 # Create rate limiter
 rate_limiter = create_rate_limiter(settings.REDIS_URL)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Filtre des access tokens révoqués, tenu à jour par pub/sub dans chaque worker
+    revocation_list.start()
+    yield
+    revocation_list.stop()
+    # Workers du hachage (processus avec PASSWORD_HASH_EXECUTOR=process)
+    password_executor.shutdown()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
@@ -30,7 +51,9 @@ app = FastAPI(
     docs_url=None,
     redoc_url=None,
     responses=responses,
-    openapi_version="3.0.3"
+    openapi_version="3.0.3",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
 # Custom docs endpoint
@@ -62,6 +85,23 @@ app.add_middleware(
     exclude_paths=["/health", "/metrics", "/docs", f"{settings.API_V1_STR}/openapi.json"]
 )
 
+# Cookie "read-your-writes" uniquement si des réplicas sont configurés
+if settings.DATABASE_REPLICA_URLS:
+    app.add_middleware(
+        ReadConsistencyMiddleware,
+        cookie_name=settings.READ_CONSISTENCY_COOKIE,
+        max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+        check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL,
+    )
+
+# Compression des réponses selon Accept-Encoding (br/zstd si les modules sont installés)
+if ENCODINGS:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        encodings=ENCODINGS,
+    )
+
 # Ajout du middleware de cache temporairement désactivé pour debug
 # app.add_middleware(
 #     CacheMiddleware,
@@ -79,6 +119,11 @@ async def request_middleware(request: Request, call_next):
     
     # Add request ID to logger
     logger.addFilter(RequestIdFilter(request_id))
+
+    # Requêtes SQL émises pendant la requête (les réponses en streaming
+    # exécutent une partie de leurs requêtes après ce middleware)
+    stats = QueryStats(route=f"{request.method} {request.url.path}")
+    stats_token = query_stats.set(stats)
     
     # Log request
     logger.info(
@@ -96,6 +141,23 @@ async def request_middleware(request: Request, call_next):
         
         response.headers["X-Request-ID"] = request_id
         response.headers["X-Process-Time"] = str(process_time)
+
+        # Nom de l'endpoint : cardinalité bornée pour les labels Prometheus
+        endpoint = getattr(request.scope.get("endpoint"), "__name__", "unmatched")
+        db_summary = observe_request(stats, endpoint, settings.SQL_N_PLUS_ONE_THRESHOLD)
+        if settings.DEBUG:
+            response.headers["X-DB-Query-Count"] = str(db_summary["db_queries"])
+            response.headers["X-DB-Time"] = f"{db_summary['db_time'] * 1000:.3f}ms"
+            response.headers["X-DB-N-Plus-One"] = str(len(db_summary["n_plus_one"]))
+        if db_summary["n_plus_one"]:
+            logger.warning(
+                f"Possible N+1 queries in {endpoint}",
+                extra={
+                    "path": request.url.path,
+                    "statements": db_summary["n_plus_one"],
+                    "request_id": request_id
+                }
+            )
         
         # Log response
         logger.info(
@@ -105,6 +167,8 @@ async def request_middleware(request: Request, call_next):
                 "method": request.method,
                 "status_code": response.status_code,
                 "process_time": process_time,
+                "db_queries": db_summary["db_queries"],
+                "db_time": db_summary["db_time"],
                 "request_id": request_id
             }
         )
@@ -126,6 +190,8 @@ async def request_middleware(request: Request, call_next):
             status_code=500,
             content={"detail": "Internal server error"}
         )
+    finally:
+        query_stats.reset(stats_token)
 
 # Add API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -142,12 +208,37 @@ async def health_check():
     except Exception as e:
         redis_status = f"unhealthy: {str(e)}"
 
-    return {
+    health = {
         "status": "healthy",
         "version": settings.VERSION,
         "environment": settings.ENVIRONMENT,
-        "redis": redis_status
+        "redis": redis_status,
+        "database_pool": pool_status(engine)
     }
+    if replica_router.replicas:
+        health["database_replicas"] = replica_router.status()
+    return health
+
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+def jwks() -> Response:
+    """
+    Clés publiques de vérification des JWT (ES256/EdDSA), pour que les autres
+    services et le proxy vérifient les access tokens sans appeler l'API.
+    """
+    return Response(
+        content=key_set.jwks(),
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE}"},
+    )
+
+if PROMETHEUS_AVAILABLE:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics() -> Response:
+        """
+        Métriques Prometheus (pool de connexions, etc.).
+        """
+        data, content_type = render_metrics()
+        return Response(content=data, media_type=content_type)
 
 if __name__ == "__main__":
     import uvicorn
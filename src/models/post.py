@@ -1,4 +1,4 @@
-from sqlalchemy import String, Text, ForeignKey, Boolean, Integer
+from sqlalchemy import DDL, String, Text, ForeignKey, Boolean, Integer, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional, List
 
@@ -8,6 +8,10 @@ class Tag(Base):
     """Tag model"""
     
     __tablename__ = "tags"
+    __table_args__ = (
+        # Nuage de tags trié par popularité
+        Index("ix_tags_post_count_name", "post_count", "name"),
+    )
     
     name: Mapped[str] = mapped_column(
         String(50), nullable=False, unique=True, index=True
@@ -15,6 +19,10 @@ class Tag(Base):
     description: Mapped[Optional[str]] = mapped_column(
         String(255), nullable=True
     )
+    # Nombre de posts portant le tag, maintenu par PostRepository (dénormalisé)
+    post_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
     
     # Relationships
     posts: Mapped[List["Post"]] = relationship(
@@ -28,6 +36,10 @@ class PostTag(Base):
     """Association table between posts and tags"""
     
     __tablename__ = "post_tags"
+    __table_args__ = (
+        # Permet de filtrer par tag sans parcourir la clé primaire (post_id, tag_id, id)
+        Index("ix_post_tags_tag_id_post_id", "tag_id", "post_id"),
+    )
     
     id: Mapped[int] = mapped_column(
         Integer, primary_key=True, autoincrement=True
@@ -43,6 +55,12 @@ class Post(Base):
     """Post model"""
     
     __tablename__ = "posts"
+    __table_args__ = (
+        # Index alignés sur les filtres et le tri de PostRepository.get_multi
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_author_id_created_at_id", "author_id", "created_at", "id"),
+        Index("ix_posts_published_created_at_id", "published", "created_at", "id"),
+    )
     
     title: Mapped[str] = mapped_column(
         String(255), nullable=False, index=True
@@ -70,4 +88,59 @@ class Post(Base):
         secondary="post_tags",
         back_populates="posts",
         lazy="select"
-    )
\ No newline at end of file
+    )
+
+# Index plein texte, spécifique à chaque dialecte (voir db/search.py) :
+# colonne tsvector générée + GIN (PostgreSQL), FULLTEXT (MySQL), table FTS5 (SQLite)
+SEARCH_DDL = {
+    "postgresql": [
+        """
+        ALTER TABLE posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(summary, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(content, '')), 'C')
+        ) STORED
+        """,
+        "CREATE INDEX ix_posts_search_vector ON posts USING GIN (search_vector)",
+    ],
+    "mysql": [
+        "CREATE FULLTEXT INDEX ix_posts_fulltext ON posts (title, summary, content)",
+    ],
+    "sqlite": [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+            title, summary, content, content='posts', content_rowid='id'
+        )
+        """,
+        """
+        CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts(rowid, title, summary, content)
+            VALUES (new.id, new.title, new.summary, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, summary, content)
+            VALUES ('delete', old.id, old.title, old.summary, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER posts_fts_au AFTER UPDATE ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, summary, content)
+            VALUES ('delete', old.id, old.title, old.summary, old.content);
+            INSERT INTO posts_fts(rowid, title, summary, content)
+            VALUES (new.id, new.title, new.summary, new.content);
+        END
+        """,
+    ],
+}
+
+for _dialect, _statements in SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Post.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+
+event.listen(
+    Post.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect="sqlite"),
+)
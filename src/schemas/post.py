@@ -1,6 +1,7 @@
-from typing import Optional, List, Dict, Any
+import functools
+from typing import Optional, List, Dict, Any, Tuple, Type
 from datetime import datetime
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, create_model
 
 
 # Tag schemas
@@ -21,6 +22,9 @@ class Tag(TagBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class TagWithCount(Tag):
+    post_count: int
+
 # Post schemas
 class PostBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
@@ -49,6 +53,19 @@ class PostInDBBase(PostBase):
 class Post(PostInDBBase):
     pass
 
+# Projection légère pour les listes : sans `content`
+class PostSummary(BaseModel):
+    id: int
+    title: str
+    summary: Optional[str] = None
+    published: Optional[bool] = False
+    author_id: int
+    created_at: datetime
+    updated_at: datetime
+    tags: List["Tag"] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
 # Author info for post responses
 class AuthorInfo(BaseModel):
     id: int
@@ -73,6 +90,22 @@ class PostPage(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class PostSummaryPage(BaseModel):
+    items: List[PostSummary]
+    total: int
+    page: int
+    size: int
+    pages: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class PostSearchResult(Post):
+    rank: float
+
+class PostSearchPage(BaseModel):
+    items: List[PostSearchResult]
+    next_cursor: Optional[str] = None
+
 class PostResponse(PostBase):
     id: int
     author_id: int
@@ -85,4 +118,29 @@ class PostResponse(PostBase):
     
 PostInDBBase.model_rebuild()
 Post.model_rebuild()
-PostWithAuthor.model_rebuild()
\ No newline at end of file
+PostWithAuthor.model_rebuild()
+
+# Sparse fieldsets : `?fields=` (colonnes) et `?include=` (relations)
+POST_FIELDS = ("id", "title", "content", "summary", "published", "author_id", "created_at", "updated_at")
+POST_INCLUDES = ("author", "tags")
+
+@functools.lru_cache(maxsize=256)
+def sparse_post_model(fields: Tuple[str, ...], include: Tuple[str, ...]) -> Type[BaseModel]:
+    """Modèle de post réduit aux champs et relations demandés, construit une fois par combinaison."""
+    definitions = {
+        name: (PostWithAuthor.model_fields[name].annotation, ...)
+        for name in (*fields, *include)
+    }
+    return create_model("SparsePost", __config__=ConfigDict(from_attributes=True), **definitions)
+
+@functools.lru_cache(maxsize=256)
+def sparse_post_page_model(fields: Tuple[str, ...], include: Tuple[str, ...]) -> Type[BaseModel]:
+    return create_model(
+        "SparsePostPage",
+        __config__=ConfigDict(from_attributes=True),
+        items=(List[sparse_post_model(fields, include)], ...),
+        total=(int, ...),
+        page=(int, ...),
+        size=(int, ...),
+        pages=(int, ...),
+    )
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr, ConfigDict, constr
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, constr
 from datetime import datetime
 from models.user import UserRole
 
@@ -30,6 +30,17 @@ class User(UserInDBBase):
 class UserInDB(UserInDBBase):
     hashed_password: str
 
+class UserBulkCreate(BaseModel):
+    users: List[UserCreate] = Field(..., min_length=1, max_length=1000)
+
+class UserBulkError(BaseModel):
+    index: int
+    detail: str
+
+class UserBulkResult(BaseModel):
+    created: List[User]
+    errors: List[UserBulkError]
+
 # Removed UserWithPosts to avoid circular imports
 
 class Token(BaseModel):
@@ -40,4 +51,6 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     sub: int
     exp: datetime
-    type: Optional[str] = None
\ No newline at end of file
+    type: Optional[str] = None
+    jti: Optional[str] = None
+    iat: Optional[float] = None
\ No newline at end of file
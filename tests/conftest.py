@@ -1,4 +1,7 @@
+import fnmatch
+import time
 import pytest
+import redis
 from typing import Dict, Generator, Optional, Tuple
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -25,7 +28,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 @pytest.fixture(scope="function")
 def db() -> Generator:
@@ -38,6 +41,135 @@ def db() -> Generator:
         db.close()
         Base.metadata.drop_all(bind=engine)
 
+class FakeRedis:
+    """
+    Redis en mémoire pour les refresh tokens, les révocations et le cache des posts.
+
+    Les expirations suivent une horloge manuelle : `advance(seconds)` supprime
+    les clés arrivées à échéance.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expires_at = {}
+        self.now = 0.0
+
+    def advance(self, seconds):
+        self.now += seconds
+        for key, expires_at in list(self.expires_at.items()):
+            if expires_at <= self.now:
+                self.delete(key)
+
+    def get(self, key):
+        value = self.data.get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    def set(self, key, value, ex=None):
+        self.data[key] = str(value)
+        self.expires_at.pop(key, None)
+        if ex is not None:
+            self.expire(key, ex)
+        return True
+
+    def setex(self, key, seconds, value):
+        self.data[key] = value
+        self.expire(key, seconds)
+        return True
+
+    def keys(self, pattern):
+        return [key for key in self.data if fnmatch.fnmatchcase(key, pattern)]
+
+    def getdel(self, key):
+        value = self.get(key)
+        self.delete(key)
+        return value
+
+    def expire(self, key, seconds):
+        if key not in self.data:
+            return False
+        self.expires_at[key] = self.now + seconds
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.expires_at.pop(key, None)
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+        return len(members)
+
+    def srem(self, key, *members):
+        self.data.get(key, set()).difference_update(members)
+        return len(members)
+
+    def smembers(self, key):
+        return {member.encode() for member in self.data.get(key, set())}
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    def zremrangebyscore(self, key, min, max):
+        scores = self.data.get(key, {})
+        removed = [member for member, score in scores.items() if float(min) <= score <= float(max)]
+        for member in removed:
+            del scores[member]
+        return len(removed)
+
+    def zrangebyscore(self, key, min, max, withscores=False):
+        scores = self.data.get(key, {})
+        members = [(member.encode(), score) for member, score in sorted(scores.items(), key=lambda item: item[1])
+                   if float(min) <= score <= float(max)]
+        return members if withscores else [member for member, _ in members]
+
+    def publish(self, channel, message):
+        return 0
+
+    def pubsub(self, **kwargs):
+        return FakePubSub()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class UnavailableRedis:
+    """Client Redis dont chaque commande échoue, comme pendant une panne."""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise redis.ConnectionError("Error 111 connecting to localhost:6379. Connection refused.")
+        return fail
+
+class FakePubSub:
+    def subscribe(self, *channels):
+        pass
+
+    def get_message(self, timeout=0.0):
+        time.sleep(0.01)
+        return None
+
+    def close(self):
+        pass
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.redis, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        results = [command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
 @pytest.fixture(scope="function")
 def mock_redis():
     """Mock Redis pour les tests."""
@@ -64,12 +196,15 @@ def mock_redis():
     mock_pipeline.expire.return_value = mock_pipeline
     mock_redis_client.pipeline.return_value = mock_pipeline
     
+    fake_redis = FakeRedis()
     # Appliquer le patch à tous les endroits où Redis est utilisé
     with patch("core.cache_base.redis_client", mock_redis_client), \
          patch("core.cache_base.is_redis_available", return_value=True), \
          patch("core.rate_limiter.redis_client", mock_redis_client), \
          patch("api.v1.endpoints.cache.redis_client", mock_redis_client), \
-         patch("api.middlewares.cache.redis_client", mock_redis_client):
+         patch("api.middlewares.cache.redis_client", mock_redis_client), \
+         patch("core.refresh_tokens.redis_client", fake_redis), \
+         patch("core.revocation.redis_client", fake_redis):
         yield mock_redis_client
 
 class MockRateLimiter:
@@ -91,6 +226,32 @@ def mock_rate_limiter():
          patch("api.middlewares.rate_limiting.RateLimiter", MockRateLimiter):
         yield
 
+@pytest.fixture(scope="function")
+def posts_cache() -> Generator:
+    """Cache Redis des endpoints de posts, en mémoire."""
+    fake_redis = FakeRedis()
+    with patch("api.v1.endpoints.posts.redis_client", fake_redis):
+        yield fake_redis
+
+@pytest.fixture(scope="function")
+def session_store() -> Generator:
+    """Redis des refresh tokens, en mémoire."""
+    fake_redis = FakeRedis()
+    with patch("core.refresh_tokens.redis_client", fake_redis):
+        yield fake_redis
+
+@pytest.fixture(scope="function")
+def revocation_store() -> Generator:
+    """Redis des révocations d'access tokens, en mémoire."""
+    fake_redis = FakeRedis()
+    with patch("core.revocation.redis_client", fake_redis):
+        yield fake_redis
+
+@pytest.fixture(scope="function")
+def redis_down() -> UnavailableRedis:
+    """Client Redis en panne, à substituer avec `patch`."""
+    return UnavailableRedis()
+
 @pytest.fixture(scope="function")
 def client(db: Session, mock_redis, mock_rate_limiter) -> Generator:
     """Client de test avec bases de données et mocks configurés"""
@@ -102,7 +263,10 @@ def client(db: Session, mock_redis, mock_rate_limiter) -> Generator:
 
     app.dependency_overrides[get_db] = override_get_db
     
-    with TestClient(app) as c:
+    # Sessions ouvertes hors dépendance (export en streaming, tâches de fond) : même base de test
+    with patch("api.v1.endpoints.posts.SessionLocal", TestingSessionLocal), \
+         patch("api.v1.endpoints.auth.SessionLocal", TestingSessionLocal), \
+         TestClient(app) as c:
         yield c
     
     app.dependency_overrides.clear()
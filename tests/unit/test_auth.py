@@ -1,12 +1,24 @@
+import time
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from core import security
 from core.config import settings
+from core.password_hashing import password_executor
+from core.principal_cache import principal_cache
+from core.refresh_tokens import ROTATED, RefreshTokenStore, new_token_id
+from db.instrumentation import instrument_queries
 from db.repositories.user import UserRepository
-from schemas.user import UserCreate, UserRole
+from main import app
+from models.user import User
+from schemas.user import UserCreate, UserRole, UserUpdate
 from datetime import timedelta
-from core.security import create_access_token, create_refresh_token
+from core.security import create_access_token, create_refresh_token, password_needs_rehash
 
 @pytest.mark.usefixtures("mock_redis", "mock_rate_limiter")
 class TestAuth:
@@ -105,6 +117,68 @@ def test_register_existing_email(client: TestClient, db: Session) -> None:
     assert response.status_code == 400
     assert "already exists" in response.json()["detail"]
 
+def test_register_duplicate_username_single_insert(
+    client: TestClient, db: Session, normal_user, monkeypatch
+) -> None:
+    instrument_queries(db.get_bind())
+    monkeypatch.setattr(settings, "DEBUG", True)
+    url = f"{settings.API_V1_STR}/auth/register"
+    data = {"email": "other@example.com", "password": "anotherpass123", "username": "otheruser"}
+    response = client.post(url, json=data)
+    assert response.status_code == 201
+    # Pas de SELECT préalable : l'INSERT est la seule requête
+    assert response.headers["X-DB-Query-Count"] == "1"
+
+    # C'est l'index unique violé qui donne le message
+    data = {"email": "third@example.com", "password": "anotherpass123", "username": normal_user.username}
+    response = client.post(url, json=data)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "A user with this username already exists"
+
+def test_bulk_create_users(
+    client: TestClient,
+    db: Session,
+    normal_user,
+    superuser_token_headers: dict,
+    normal_user_token_headers: dict,
+    monkeypatch,
+) -> None:
+    hashed = []
+    hash_many = password_executor.hash_many
+
+    async def recording_hash_many(passwords):
+        hashed.extend(passwords)
+        return await hash_many(passwords)
+
+    monkeypatch.setattr(password_executor, "hash_many", recording_hash_many)
+    users = [
+        {"email": f"bulk{i}@example.com", "username": f"bulk{i}", "password": "bulkpass123"}
+        for i in range(5)
+    ]
+    users.append({"email": normal_user.email, "username": "bulknew", "password": "bulkpass123"})
+    users.append({"email": "bulk9@example.com", "username": "bulk0", "password": "bulkpass123"})
+    url = f"{settings.API_V1_STR}/auth/users/bulk"
+
+    response = client.post(url, json={"users": users}, headers=normal_user_token_headers)
+    assert response.status_code == 403
+
+    response = client.post(url, json={"users": users}, headers=superuser_token_headers)
+    assert response.status_code == 201
+    content = response.json()
+    assert [user["username"] for user in content["created"]] == [f"bulk{i}" for i in range(5)]
+    assert content["errors"] == [
+        {"index": 5, "detail": "A user with this email already exists"},
+        {"index": 6, "detail": "A user with this username already exists"},
+    ]
+    # Les doublons sont écartés avant bcrypt
+    assert len(hashed) == 5
+
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login",
+        data={"username": "bulk3", "password": "bulkpass123"},
+    )
+    assert response.status_code == 200
+
 def test_refresh_token(client: TestClient, db: Session) -> None:
     # Créer un utilisateur
     user_repo = UserRepository(db)
@@ -263,7 +337,7 @@ def test_refresh_token_reuse(client: TestClient, db: Session) -> None:
     assert second_refresh.status_code != 200
 
 def test_logout_twice(client: TestClient, db: Session, normal_user_token_headers: dict) -> None:
-    """Test that logging out twice has no effect"""
+    """Test that the access token is revoked by the first logout"""
     # First logout
     response1 = client.post(
         f"{settings.API_V1_STR}/auth/logout",
@@ -271,12 +345,12 @@ def test_logout_twice(client: TestClient, db: Session, normal_user_token_headers
     )
     assert response1.status_code == 200
 
-    # Second logout
+    # Second logout : l'access token a été révoqué par la première
     response2 = client.post(
         f"{settings.API_V1_STR}/auth/logout",
         headers=normal_user_token_headers,
     )
-    assert response2.status_code == 200  # Should still succeed
+    assert response2.status_code == 401
 
 def test_refresh_token_after_logout(client: TestClient, db: Session) -> None:
     """Test that refresh tokens are invalid after logout"""
@@ -454,4 +528,194 @@ def test_access_protected_route_after_logout(client: TestClient, db: Session) ->
     )
     
     # On accepte 200 (token valide) ou 401 (token invalide)
-    assert response.status_code in [200, 401]
\ No newline at end of file
+    assert response.status_code in [200, 401]
+
+def test_current_user_served_from_principal_cache(
+    client: TestClient,
+    db: Session,
+    superuser,
+    superuser_token_headers: dict,
+    monkeypatch
+) -> None:
+    instrument_queries(db.get_bind())
+    monkeypatch.setattr(settings, "DEBUG", True)
+    url = f"{settings.API_V1_STR}/database/slow-queries"
+
+    # Premier appel : l'utilisateur est lu en base puis mis en cache
+    response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.headers["X-DB-Query-Count"] == "1"
+
+    response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.headers["X-DB-Query-Count"] == "0"
+
+    # La mise à jour invalide le principal : le changement est visible immédiatement
+    UserRepository(db).update(
+        superuser.id,
+        UserUpdate(email=superuser.email, username=superuser.username, role=UserRole.MANAGER),
+    )
+    assert principal_cache.get(superuser.id) is None
+
+    # La désactivation révoque en plus les access tokens déjà émis
+    UserRepository(db).update(
+        superuser.id,
+        UserUpdate(email=superuser.email, username=superuser.username, is_active=False),
+    )
+    response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+
+def test_login_rejected_when_password_executor_saturated(client: TestClient, db: Session, monkeypatch) -> None:
+    UserRepository(db).create(UserCreate(
+        email="busy@example.com",
+        password="testpass123",
+        username="busyuser",
+    ))
+    # File d'attente pleine : refus immédiat, sans hacher
+    monkeypatch.setattr(password_executor, "_in_flight", password_executor.workers + password_executor.max_queue)
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login",
+        data={"username": "busyuser", "password": "testpass123"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(password_executor.retry_after)
+
+    monkeypatch.setattr(password_executor, "_in_flight", 0)
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login",
+        data={"username": "busyuser", "password": "testpass123"}
+    )
+    assert response.status_code == 200
+    assert password_executor.in_flight == 0
+
+def test_password_executor_shut_down_with_app(mock_redis) -> None:
+    with TestClient(app):
+        executor = password_executor._get_executor()
+    assert password_executor._executor is None
+    assert executor._shutdown
+
+def test_login_rehashes_outdated_password_hash(client: TestClient, db: Session) -> None:
+    user = UserRepository(db).create(
+        UserCreate(email="legacy@example.com", password="testpass123", username="legacyuser"),
+        hashed_password=CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("testpass123"),
+    )
+    old_hash = user.hashed_password
+    assert password_needs_rehash(old_hash)
+
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login",
+        data={"username": "legacyuser", "password": "testpass123"}
+    )
+    assert response.status_code == 200
+
+    # Le hash a été recalculé en tâche de fond avec le coût configuré
+    new_hash = db.scalar(select(User.hashed_password).where(User.id == user.id))
+    assert new_hash != old_hash
+    assert new_hash.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert not password_needs_rehash(new_hash)
+
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login",
+        data={"username": "legacyuser", "password": "testpass123"}
+    )
+    assert response.status_code == 200
+
+def _login(client: TestClient, username: str) -> dict:
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/login",
+        data={"username": username, "password": "testpass123"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+def _refresh(client: TestClient, refresh_token: str):
+    return client.post(f"{settings.API_V1_STR}/auth/refresh", json={"refresh_token": refresh_token})
+
+def test_refresh_token_reuse_revokes_session(client: TestClient, db: Session) -> None:
+    UserRepository(db).create(UserCreate(email="family@example.com", password="testpass123", username="familyuser"))
+    first = _login(client, "familyuser")["refresh_token"]
+    second = _refresh(client, first).json()["refresh_token"]
+
+    # Rejouer le premier token révoque toute la session, y compris le token le plus récent
+    assert _refresh(client, first).status_code == 400
+    assert _refresh(client, second).status_code == 400
+
+def test_refresh_sessions_per_device(client: TestClient, db: Session, monkeypatch) -> None:
+    instrument_queries(db.get_bind())
+    monkeypatch.setattr(settings, "DEBUG", True)
+    UserRepository(db).create(UserCreate(email="devices@example.com", password="testpass123", username="devicesuser"))
+    laptop = _login(client, "devicesuser")
+    phone = _login(client, "devicesuser")
+
+    response = _refresh(client, laptop["refresh_token"])
+    assert response.status_code == 200
+    laptop["refresh_token"] = response.json()["refresh_token"]
+
+    # Utilisateur en cache : la rotation ne touche plus la base
+    response = _refresh(client, phone["refresh_token"])
+    assert response.status_code == 200
+    assert response.headers["X-DB-Query-Count"] == "0"
+    phone["refresh_token"] = response.json()["refresh_token"]
+
+    # Déconnexion du seul téléphone : la session du portable reste valide
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/logout",
+        headers={"Authorization": f"Bearer {phone['access_token']}"},
+        json={"refresh_token": phone["refresh_token"]},
+    )
+    assert response.status_code == 200
+    assert _refresh(client, phone["refresh_token"]).status_code == 400
+    assert _refresh(client, laptop["refresh_token"]).status_code == 200
+
+def test_rotated_session_revoked_after_initial_ttl(session_store) -> None:
+    store = RefreshTokenStore(ttl=100)
+    family, jti = new_token_id(), new_token_id()
+    store.start_family(7, family, jti)
+    # Session renouvelée bien au-delà de sa durée de vie initiale
+    for _ in range(3):
+        session_store.advance(60)
+        new_jti = new_token_id()
+        assert store.rotate(7, family, jti, new_jti) == ROTATED
+        jti = new_jti
+
+    store.revoke_user(7)
+    assert store.rotate(7, family, jti, new_token_id()) != ROTATED
+
+def test_session_store_outage_returns_503(client: TestClient, db: Session, redis_down) -> None:
+    UserRepository(db).create(UserCreate(email="outage@example.com", password="testpass123", username="outageuser"))
+    tokens = _login(client, "outageuser")
+
+    with patch("core.refresh_tokens.redis_client", redis_down):
+        for response in (
+            client.post(f"{settings.API_V1_STR}/auth/login", data={"username": "outageuser", "password": "testpass123"}),
+            _refresh(client, tokens["refresh_token"]),
+            client.post(
+                f"{settings.API_V1_STR}/auth/logout",
+                headers={"Authorization": f"Bearer {tokens['access_token']}"},
+                json={"refresh_token": tokens["refresh_token"]},
+            ),
+        ):
+            assert response.status_code == 503
+            assert response.json()["detail"] == "Session store is not available"
+
+def test_verified_token_cache(monkeypatch) -> None:
+    calls = []
+    decode_token = security.decode_token
+    monkeypatch.setattr(security, "decode_token", lambda token: calls.append(token) or decode_token(token))
+    cache = security.VerifiedTokenCache(max_size=2)
+    monkeypatch.setattr(security, "verified_token_cache", cache)
+
+    token = create_access_token(42)
+    assert security.decode_access_token(token).sub == 42
+    assert security.decode_access_token(token).sub == 42
+    assert len(calls) == 1
+
+    # Entrée expirée ou évincée : le token est vérifié de nouveau
+    cache.set(token, security.TokenPayload(sub=42, exp=time.time() + 60), time.time() - 1)
+    security.decode_access_token(token)
+    assert len(calls) == 2
+    for subject in (1, 2):
+        security.decode_access_token(create_access_token(subject))
+    security.decode_access_token(token)
+    assert len(calls) == 5
@@ -0,0 +1,47 @@
+import json
+
+from sqlalchemy.orm import Session
+
+from core.security import verify_password
+from db.bulk_import import BulkImporter
+from models.post import Post, Tag
+from models.user import User, UserRole
+
+def _write_ndjson(path, records) -> str:
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+def test_bulk_import_users_tags_posts(db: Session, tmp_path) -> None:
+    users = _write_ndjson(tmp_path / "users.ndjson", [
+        {"email": "alice@example.com", "username": "alice", "password": "secret123"},
+        {"email": "bob@example.com", "username": "bob", "hashed_password": "x", "role": "admin"},
+    ])
+    tags = tmp_path / "tags.csv"
+    tags.write_text("name,description\ntech,Tech posts\n")
+    posts = tmp_path / "posts.csv"
+    posts.write_text(
+        "title,content,published,author_id,tags\n"
+        "First,Content 1,true,1,tech|news\n"
+        "Second,Content 2,false,2,\n"
+        "Third,Content 3,1,2,news\n"
+    )
+
+    importer = BulkImporter(db.get_bind(), batch_size=2, checkpoint_path=str(tmp_path / "checkpoint.json"))
+    with importer:
+        assert importer.import_users(users) == 2
+        assert importer.import_tags(str(tags)) == 1
+        # 3 posts, 1 tag créé au passage, 3 liens post/tag
+        assert importer.import_posts(str(posts)) == 7
+
+    alice = db.query(User).filter(User.username == "alice").one()
+    assert verify_password("secret123", alice.hashed_password)
+    assert db.query(User).filter(User.username == "bob").one().role == UserRole.ADMIN
+    assert sorted((tag.name, tag.post_count) for tag in db.query(Tag).all()) == [("news", 2), ("tech", 1)]
+    first = db.query(Post).filter(Post.title == "First").one()
+    assert first.published is True
+    assert sorted(tag.name for tag in first.tags) == ["news", "tech"]
+
+    # Reprise : les enregistrements déjà importés sont ignorés
+    with BulkImporter(db.get_bind(), checkpoint_path=str(tmp_path / "checkpoint.json")) as importer:
+        assert importer.import_posts(str(posts)) == 0
+    assert db.query(Post).count() == 3
@@ -0,0 +1,84 @@
+import gzip
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from core.compression import negotiate, unpack
+from core.config import settings
+from db.repositories.post import PostRepository
+from schemas.post import PostCreate
+
+def test_negotiate_accept_encoding() -> None:
+    encodings = ("br", "zstd", "gzip")
+    assert negotiate("gzip, deflate, br", encodings) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", encodings) == "gzip"
+    assert negotiate("br;q=0, *", encodings) == "zstd"
+    assert negotiate("deflate", encodings) is None
+    assert negotiate("identity", encodings) is None
+    assert negotiate(None, encodings) is None
+    # Encodage non disponible (module absent) : jamais choisi
+    assert negotiate("br", ("gzip",)) is None
+
+def _create_posts(db: Session, count: int = 5) -> None:
+    post_repo = PostRepository(db)
+    for i in range(count):
+        post_repo.create(
+            PostCreate(title=f"Compressed {i}", content="lorem ipsum " * 200, published=True),
+            author_id=1
+        )
+
+def test_responses_compressed_above_threshold(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session,
+) -> None:
+    _create_posts(db)
+    url = f"{settings.API_V1_STR}/posts/"
+
+    response = client.get(url, headers={**normal_user_token_headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert len(response.json()["items"]) == 5
+
+    response = client.get(url, headers={**normal_user_token_headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+    # Sous le seuil : pas de compression
+    response = client.get("/.well-known/jwks.json", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    # Streaming : compressé morceau par morceau, sans Content-Length
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/export",
+        headers={**normal_user_token_headers, "Accept-Encoding": "gzip"},
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert len(response.text.splitlines()) == 5
+
+def test_cached_responses_stored_compressed(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session,
+    posts_cache,
+) -> None:
+    _create_posts(db)
+    url = f"{settings.API_V1_STR}/posts/?limit=10"
+    headers = {**normal_user_token_headers, "Accept-Encoding": "gzip"}
+
+    miss = client.get(url, headers=headers)
+    [key] = posts_cache.keys("posts:list:*:enc=gzip")
+    body, encoding = unpack(posts_cache.get(key))
+    assert encoding == "gzip"
+
+    # Le hit renvoie l'entrée précompressée, que le middleware ne recompresse pas
+    hit = client.get(url, headers=headers)
+    assert hit.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in hit.headers["vary"]
+    assert gzip.decompress(body) == hit.content == miss.content
+
+    # Un autre encodage négocié a sa propre entrée
+    client.get(url, headers={**normal_user_token_headers, "Accept-Encoding": "identity"})
+    assert len(posts_cache.keys("posts:list:*")) == 2
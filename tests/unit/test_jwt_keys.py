@@ -0,0 +1,57 @@
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from fastapi.testclient import TestClient
+
+from core import security
+from core.config import settings
+from core.jwt_keys import KeySet, SigningKey
+
+def _key(algorithm: str) -> SigningKey:
+    if algorithm == "ES256":
+        return SigningKey(algorithm, ec.generate_private_key(ec.SECP256R1()))
+    return SigningKey(algorithm, ed25519.Ed25519PrivateKey.generate())
+
+@pytest.mark.parametrize("algorithm", ["ES256", "EdDSA"])
+def test_asymmetric_tokens_and_rotation(algorithm: str) -> None:
+    old, new = _key(algorithm), _key(algorithm)
+    before = KeySet(algorithm, keys=[old])
+    token = before.encode({"sub": "1"})
+    assert jwt.get_unverified_header(token)["kid"] == old.kid
+
+    # Après rotation, l'ancienne clé (publique seulement) vérifie encore ses tokens
+    after = KeySet(algorithm, keys=[new, SigningKey(algorithm, old.public_key)])
+    assert after.decode(token)["sub"] == "1"
+    assert jwt.get_unverified_header(after.encode({"sub": "2"}))["kid"] == new.kid
+    with pytest.raises(jwt.InvalidTokenError):
+        KeySet(algorithm, keys=[new]).decode(token)
+
+    # Vérification locale par un autre service, à partir du seul JWKS publié
+    jwk = jwt.PyJWKSet.from_json(after.jwks().decode())[old.kid]
+    assert jwt.decode(token, jwk.key, algorithms=[algorithm])["sub"] == "1"
+
+def test_jwks_endpoint(client: TestClient, monkeypatch) -> None:
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}  # HS256 : aucun secret publié
+
+    key_set = KeySet("EdDSA", keys=[_key("EdDSA")])
+    monkeypatch.setattr(security, "key_set", key_set)
+    monkeypatch.setattr("main.key_set", key_set)
+    response = client.get("/.well-known/jwks.json")
+    assert response.headers["Cache-Control"] == f"public, max-age={settings.JWKS_MAX_AGE}"
+    assert [key["kid"] for key in response.json()["keys"]] == [key_set.signing_key.kid]
+
+    token = security.create_access_token(1)
+    assert security.decode_token(token)["sub"] == "1"
+
+def test_refresh_token_rejected_as_access_token(client: TestClient, normal_user) -> None:
+    refresh_token = security.create_refresh_token(normal_user.id)
+    with pytest.raises(security.TokenError):
+        security.decode_access_token(refresh_token)
+    assert security.decode_access_token(security.create_access_token(normal_user.id)).type == "access"
+
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/", headers={"Authorization": f"Bearer {refresh_token}"}
+    )
+    assert response.status_code == 403
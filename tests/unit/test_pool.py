@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from core.metrics import PROMETHEUS_AVAILABLE
+from db.pool import InstrumentedQueuePool, instrument_pool, pool_status
+
+if PROMETHEUS_AVAILABLE:
+    from prometheus_client import REGISTRY
+
+pytestmark = pytest.mark.skipif(not PROMETHEUS_AVAILABLE, reason="prometheus-client not installed")
+
+def _sample(name: str, pool: str) -> float:
+    return REGISTRY.get_sample_value(name, {"pool": pool}) or 0.0
+
+def test_pool_checkout_metrics_and_status(tmp_path) -> None:
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    instrument_pool(engine, "test")
+    checkouts = _sample("db_pool_checkout_seconds_count", "test")
+    timeouts = _sample("db_pool_checkout_timeouts_total", "test")
+
+    conn = engine.connect()
+    assert _sample("db_pool_checkout_seconds_count", "test") == checkouts + 1
+    assert _sample("db_pool_connections_in_use", "test") == 1
+    assert pool_status(engine) == {
+        "class": "InstrumentedQueuePool",
+        "size": 1,
+        "checked_out": 1,
+        "overflow": 0,
+        "checked_in": 0,
+    }
+
+    # Pool épuisé : l'attente est mesurée et le timeout compté
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    assert _sample("db_pool_checkout_timeouts_total", "test") == timeouts + 1
+    assert _sample("db_pool_checkout_seconds_count", "test") == checkouts + 2
+    assert _sample("db_pool_checkout_seconds_sum", "test") >= 0.05
+
+    conn.close()
+    assert _sample("db_pool_connections_in_use", "test") == 0
+    assert pool_status(engine)["checked_in"] == 1
+    engine.dispose()
@@ -1,8 +1,11 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from core.compression import unpack
 from core.config import settings
+from db.instrumentation import instrument_queries
 from db.repositories.post import PostRepository
 from models.post import Post
 from schemas.post import PostCreate, PostUpdate
@@ -91,6 +94,93 @@ def test_read_posts_pagination(
     content = response.json()
     assert len(content["items"]) == 5
 
+def test_cached_responses_reuse_encoded_body(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session,
+    posts_cache,
+    monkeypatch
+) -> None:
+    instrument_queries(db.get_bind())
+    monkeypatch.setattr(settings, "DEBUG", True)
+    post = PostRepository(db).create(
+        PostCreate(title="Cached", content="Cached content", published=True, tags=["cache"]),
+        author_id=1
+    )
+
+    for url in (
+        f"{settings.API_V1_STR}/posts/?limit=10",
+        f"{settings.API_V1_STR}/posts/?limit=10&view=summary",
+        f"{settings.API_V1_STR}/posts/{post.id}",
+        f"{settings.API_V1_STR}/posts/tags/",
+    ):
+        miss = client.get(url, headers=normal_user_token_headers)
+        assert miss.status_code == 200
+        hit = client.get(url, headers=normal_user_token_headers)
+        assert hit.status_code == 200
+        # Les bytes mis en cache sont la réponse elle-même, renvoyée telle quelle
+        assert hit.content == miss.content
+        assert hit.headers["content-type"] == "application/json"
+        assert hit.headers["X-DB-Query-Count"] == "0"
+
+    [detail_key] = posts_cache.keys(f"posts:detail:{post.id}:enc=*")
+    body, encoding = unpack(posts_cache.get(detail_key))
+    assert encoding is None  # sous COMPRESSION_MINIMUM_SIZE
+    assert json.loads(body)["author"]["id"] == 1
+    summary = client.get(f"{settings.API_V1_STR}/posts/?limit=10&view=summary", headers=normal_user_token_headers)
+    assert "content" not in summary.json()["items"][0]
+
+def test_sparse_fieldsets_and_includes(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session,
+    posts_cache,
+    monkeypatch
+) -> None:
+    instrument_queries(db.get_bind())
+    monkeypatch.setattr(settings, "DEBUG", True)
+    post_repo = PostRepository(db)
+    for i in range(3):
+        post = post_repo.create(
+            PostCreate(title=f"Sparse {i}", content="x" * 1000, published=True, tags=["sparse", f"t{i}"]),
+            author_id=1
+        )
+    url = f"{settings.API_V1_STR}/posts/"
+
+    # Seules les colonnes demandées sont lues : ni tags, ni auteur
+    response = client.get(f"{url}?fields=title,updated_at", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == 3
+    assert set(items[0]) == {"id", "title", "updated_at"}
+    assert response.headers["X-DB-Query-Count"] == "3"  # principal, count, posts
+
+    response = client.get(f"{url}?fields=title&include=tags,author", headers=normal_user_token_headers)
+    item = response.json()["items"][0]
+    assert set(item) == {"id", "title", "tags", "author"}
+    assert item["author"]["id"] == 1
+    assert sorted(tag["name"] for tag in item["tags"]) == ["sparse", "t2"]
+    assert response.headers["X-DB-Query-Count"] == "3"  # count, posts + auteur, tags
+
+    # `include` seul : tous les champs de la vue, plus les relations demandées
+    response = client.get(f"{url}?view=summary&include=author", headers=normal_user_token_headers)
+    item = response.json()["items"][0]
+    assert "content" not in item and "tags" not in item
+    assert item["author"]["username"] == "testuser"
+
+    response = client.get(f"{url}{post.id}?fields=summary", headers=normal_user_token_headers)
+    assert response.json() == {"id": post.id, "summary": None}
+
+    # Clé de cache normalisée : ordre et doublons sans effet
+    client.get(f"{url}?fields=updated_at,title,title", headers=normal_user_token_headers)
+    assert len(posts_cache.keys("posts:list:*fields=id,title,updated_at:include=:enc=*")) == 1
+
+    response = client.get(f"{url}?fields=title,password", headers=normal_user_token_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: password"
+    response = client.get(f"{url}{post.id}?include=comments", headers=normal_user_token_headers)
+    assert response.status_code == 400
+
 def test_update_post(
     client: TestClient,
     normal_user_token_headers: dict,
@@ -223,4 +313,204 @@ def test_update_others_post(
             "content": "New content"
         }
     )
-    assert response.status_code == 403
\ No newline at end of file
+    assert response.status_code == 403
+
+def test_search_posts(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session
+) -> None:
+    post_repo = PostRepository(db)
+    post_repo.create(
+        PostCreate(
+            title="Indexing with PostgreSQL",
+            content="GIN indexes make full-text search fast",
+            published=True,
+            tags=["database"]
+        ),
+        author_id=1
+    )
+    post_repo.create(
+        PostCreate(
+            title="Caching with Redis",
+            content="Redis keeps hot responses in memory, no full-text here",
+            published=True,
+            tags=["cache"]
+        ),
+        author_id=1
+    )
+    post_repo.create(
+        PostCreate(
+            title="Unrelated",
+            content="Nothing to see",
+            published=True
+        ),
+        author_id=1
+    )
+
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/search?q=full-text",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["title"] for item in content["items"]] == [
+        "Indexing with PostgreSQL",
+        "Caching with Redis",
+    ]
+    assert content["next_cursor"] is None
+
+    # Filtre par tag
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/search?q=full-text&tag=cache",
+        headers=normal_user_token_headers,
+    )
+    assert [item["title"] for item in response.json()["items"]] == ["Caching with Redis"]
+
+    # Pagination par curseur
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/search?q=full-text&limit=1",
+        headers=normal_user_token_headers,
+    )
+    first_page = response.json()
+    assert len(first_page["items"]) == 1
+    assert first_page["next_cursor"]
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/search?q=full-text&limit=1&cursor={first_page['next_cursor']}",
+        headers=normal_user_token_headers,
+    )
+    second_page = response.json()
+    assert [item["title"] for item in second_page["items"]] == ["Caching with Redis"]
+    assert second_page["next_cursor"] is None
+
+    # Les modifications sont répercutées dans l'index
+    post_repo.delete(second_page["items"][0]["id"], current_user_id=1)
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/search?q=redis",
+        headers=normal_user_token_headers,
+    )
+    assert response.json()["items"] == []
+
+def test_read_posts_summary_view(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session
+) -> None:
+    post_repo = PostRepository(db)
+    post_repo.create(
+        PostCreate(
+            title="Long post",
+            content="Very long content " * 100,
+            summary="Short summary",
+            published=True,
+            tags=["tech"]
+        ),
+        author_id=1
+    )
+
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/?view=summary",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert item["summary"] == "Short summary"
+    assert [tag["name"] for tag in item["tags"]] == ["tech"]
+    assert "content" not in item
+
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/?view=full",
+        headers=normal_user_token_headers,
+    )
+    assert response.json()["items"][0]["content"].startswith("Very long content")
+
+    # Le contenu n'est pas chargé depuis la base
+    db.expunge_all()
+    posts, total = post_repo.get_multi(summary=True)
+    assert total == 1
+    assert "content" not in posts[0].__dict__
+
+def test_export_posts_ndjson(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session
+) -> None:
+    post_repo = PostRepository(db)
+    for i in range(3):
+        post_repo.create(
+            PostCreate(
+                title=f"Export {i}",
+                content=f"Content {i}",
+                published=i != 1,
+                tags=["export"]
+            ),
+            author_id=1
+        )
+
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/export?published=true",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["title"] for line in lines] == ["Export 0", "Export 2"]
+    assert lines[0]["tags"][0]["name"] == "export"
+
+    response = client.get(
+        f"{settings.API_V1_STR}/posts/export?updated_since=2999-01-01T00:00:00",
+        headers=normal_user_token_headers,
+    )
+    assert response.text == ""
+
+def test_filter_posts_by_multiple_tags(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session
+) -> None:
+    post_repo = PostRepository(db)
+    for title, tags in [
+        ("Python and FastAPI", ["python", "fastapi"]),
+        ("Python only", ["python"]),
+        ("FastAPI only", ["fastapi"]),
+        ("Neither", ["news"]),
+    ]:
+        post_repo.create(PostCreate(title=title, content="Content", published=True, tags=tags), author_id=1)
+
+    def titles(query: str) -> list:
+        response = client.get(f"{settings.API_V1_STR}/posts/?{query}", headers=normal_user_token_headers)
+        assert response.status_code == 200
+        return sorted(item["title"] for item in response.json()["items"])
+
+    assert titles("tags=python,fastapi&tag_mode=all") == ["Python and FastAPI"]
+    assert titles("tags=python,fastapi") == ["FastAPI only", "Python and FastAPI", "Python only"]
+    # Un tag inconnu exclut tout en mode `all`, est ignoré en mode `any`
+    assert titles("tags=python,unknown&tag_mode=all") == []
+    assert titles("tags=python,unknown&tag_mode=any") == ["Python and FastAPI", "Python only"]
+
+def test_tag_post_counts(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session
+) -> None:
+    post_repo = PostRepository(db)
+    first = post_repo.create(PostCreate(title="First", content="Content", tags=["python", "web"]), author_id=1)
+    post_repo.create(PostCreate(title="Second", content="Content", tags=["python"]), author_id=1)
+    post_repo.update(first.id, PostUpdate(tags=["python", "news"]), current_user_id=1)
+
+    def counts(query: str = "") -> list:
+        response = client.get(f"{settings.API_V1_STR}/posts/tags/?{query}", headers=normal_user_token_headers)
+        assert response.status_code == 200
+        return [(tag["name"], tag["post_count"]) for tag in response.json()]
+
+    assert counts() == [("python", 2), ("news", 1), ("web", 0)]
+    assert counts("sort=name&limit=2") == [("news", 1), ("python", 2)]
+
+    post_repo.delete(first.id, current_user_id=1)
+    assert counts("sort=name") == [("news", 0), ("python", 1), ("web", 0)]
+
+    # Le recalcul complet donne les mêmes valeurs
+    post_repo.refresh_tag_counts()
+    assert [(tag.name, tag.post_count) for tag in post_repo.get_tags()] == [
+        ("news", 0), ("python", 1), ("web", 0)
+    ]
@@ -0,0 +1,83 @@
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.routing import ReadConsistency, ReplicaRouter, RoutingSession, read_consistency
+from db.repositories.post import PostRepository
+from models.base import Base
+from models.post import Tag
+from schemas.post import PostCreate
+
+def _memory_engine():
+    return create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+@pytest.fixture(scope="function")
+def engines():
+    primary, replica = _memory_engine(), _memory_engine()
+    Base.metadata.create_all(bind=primary)
+    Base.metadata.create_all(bind=replica)
+    # Le tag n'existe que sur le réplica pour savoir où la lecture a été faite
+    with sessionmaker(bind=replica)() as session:
+        session.add(Tag(name="replica-only"))
+        session.commit()
+    yield primary, replica
+    Base.metadata.drop_all(bind=primary)
+    Base.metadata.drop_all(bind=replica)
+
+def _session(primary, router):
+    return sessionmaker(class_=RoutingSession, bind=primary, router=router)()
+
+def test_reads_go_to_healthy_replica(engines) -> None:
+    primary, replica = engines
+    db = _session(primary, ReplicaRouter([replica]))
+    assert [tag.name for tag in PostRepository(db).get_tags()] == ["replica-only"]
+    db.close()
+
+def test_writes_pin_session_to_primary(engines) -> None:
+    primary, replica = engines
+    db = _session(primary, ReplicaRouter([replica]))
+    post_repo = PostRepository(db)
+    post_repo.create(PostCreate(title="Title", content="Content", tags=["primary"]), author_id=1)
+    assert [tag.name for tag in post_repo.get_tags()] == ["primary"]
+    db.close()
+
+def test_consistency_token_falls_back_to_primary(engines) -> None:
+    primary, replica = engines
+    router = ReplicaRouter([replica])
+    router.refresh(force=True)
+    db = _session(primary, router)
+    # Écriture postérieure au dernier état connu du réplica
+    token = read_consistency.set(ReadConsistency(min_timestamp=time.time() + 1))
+    try:
+        assert PostRepository(db).get_tags() == []
+    finally:
+        read_consistency.reset(token)
+        db.close()
+
+def test_lagging_replica_falls_back_to_primary(engines, monkeypatch) -> None:
+    primary, replica = engines
+    monkeypatch.setattr("db.routing.measure_replication_lag", lambda connection: 30.0)
+    router = ReplicaRouter([replica], max_lag=5.0)
+    db = _session(primary, router)
+    assert PostRepository(db).get_tags() == []
+    assert router.status()[0]["healthy"] is False
+    db.close()
+
+def test_export_batches_read_from_replica(engines) -> None:
+    primary, replica = engines
+    with sessionmaker(bind=replica)() as session:
+        PostRepository(session).create(
+            PostCreate(title="Replica post", content="Content", tags=["replica-only"]),
+            author_id=1
+        )
+    db = _session(primary, ReplicaRouter([replica]))
+    batches = list(PostRepository(db).iter_export(batch_size=1))
+    assert [[post.title for post in batch] for batch in batches] == [["Replica post"]]
+    assert db.info["replica_reads"] is False
+    db.close()
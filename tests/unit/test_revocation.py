@@ -0,0 +1,104 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.revocation import BloomFilter, RevocationList, RevocationUnavailable
+from db.repositories.user import UserRepository
+from schemas.user import UserCreate
+
+def test_bloom_filter() -> None:
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti:{i}")
+    assert all(f"jti:{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other:{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+def test_revocation_list(mock_redis) -> None:
+    revocations = RevocationList(capacity=100)
+    now = time.time()
+    revocations.revoke_token("abc", now + 60)
+    assert revocations.is_revoked(1, "abc", now)
+    assert not revocations.is_revoked(1, "def", now)
+
+    # Révocation d'un utilisateur : seuls les tokens émis avant sont visés
+    revocations.revoke_user(2)
+    assert revocations.is_revoked(2, "ghi", now)
+    assert not revocations.is_revoked(2, "jkl", time.time() + 1)
+
+    # Un autre worker reconstruit son filtre depuis Redis
+    other_worker = RevocationList(capacity=100)
+    assert not other_worker.is_revoked(1, "abc", now)
+    other_worker.rebuild()
+    assert other_worker.is_revoked(1, "abc", now)
+    assert other_worker.is_revoked(2, None, now)
+
+def test_expired_revocations_leave_the_filter(revocation_store, monkeypatch) -> None:
+    revocations = RevocationList(capacity=100)
+    revocations.revoke_user(7)
+    revocations.maintain()
+    assert revocations.is_revoked(7, None, time.time() - 1)
+
+    # Révocation expirée : la clé a disparu de Redis, la maintenance vide le filtre
+    ttl = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    revocation_store.advance(ttl + 1)
+    expired = time.time() + ttl + 1
+    monkeypatch.setattr(time, "time", lambda: expired)
+    revocations.maintain()
+
+    mget_calls = []
+    monkeypatch.setattr(revocation_store, "mget", lambda keys: mget_calls.append(keys) or [None] * len(keys))
+    assert not revocations.is_revoked(7, None, expired)
+    assert mget_calls == []
+
+def test_logout_revokes_access_token(client: TestClient, db: Session) -> None:
+    UserRepository(db).create(UserCreate(email="revoked@example.com", password="testpass123", username="revokeduser"))
+
+    def login() -> dict:
+        return client.post(
+            f"{settings.API_V1_STR}/auth/login",
+            data={"username": "revokeduser", "password": "testpass123"}
+        ).json()
+
+    laptop, phone = login(), login()
+    laptop_headers = {"Authorization": f"Bearer {laptop['access_token']}"}
+    phone_headers = {"Authorization": f"Bearer {phone['access_token']}"}
+
+    response = client.post(
+        f"{settings.API_V1_STR}/auth/logout",
+        headers=phone_headers,
+        json={"refresh_token": phone["refresh_token"]},
+    )
+    assert response.status_code == 200
+    assert client.get(f"{settings.API_V1_STR}/posts/", headers=phone_headers).status_code == 401
+    assert client.get(f"{settings.API_V1_STR}/posts/", headers=laptop_headers).status_code == 200
+
+    # Déconnexion globale : tous les access tokens déjà émis sont révoqués
+    client.post(f"{settings.API_V1_STR}/auth/logout", headers=laptop_headers)
+    assert client.get(f"{settings.API_V1_STR}/posts/", headers=laptop_headers).status_code == 401
+    fresh = {"Authorization": f"Bearer {login()['access_token']}"}
+    assert client.get(f"{settings.API_V1_STR}/posts/", headers=fresh).status_code == 200
+
+def test_revocation_failure_is_reported(client: TestClient, db: Session, redis_down) -> None:
+    UserRepository(db).create(UserCreate(email="down@example.com", password="testpass123", username="downuser"))
+    tokens = client.post(
+        f"{settings.API_V1_STR}/auth/login",
+        data={"username": "downuser", "password": "testpass123"}
+    ).json()
+
+    with patch("core.revocation.redis_client", redis_down):
+        with pytest.raises(RevocationUnavailable):
+            RevocationList(capacity=100).revoke_user(1)
+
+        # Révocation non diffusée : la déconnexion ne se déclare pas réussie
+        response = client.post(
+            f"{settings.API_V1_STR}/auth/logout",
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        assert response.status_code == 503
+        assert response.json()["detail"] == "Token revocation is not available"
@@ -0,0 +1,43 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from core.principal_cache import Principal, PrincipalCache
+from core.serialization import dumps, loads
+from models.user import UserRole
+from schemas.post import Tag
+
+def test_dumps_matches_jsonable_encoder_output() -> None:
+    created = datetime(2024, 2, 24, 12, 0, 0, 123456)
+    tag = Tag(id=1, name="tech", created_at=created, updated_at=created)
+    data = {"tag": tag, "role": UserRole.ADMIN, "price": Decimal("1.5"), "ids": {3}, 1: "one"}
+
+    assert loads(dumps(data)) == {
+        "tag": {
+            "id": 1,
+            "name": "tech",
+            "description": None,
+            "created_at": "2024-02-24T12:00:00.123456",
+            "updated_at": "2024-02-24T12:00:00.123456",
+        },
+        "role": "admin",
+        "price": 1.5,
+        "ids": [3],
+        "1": "one",
+    }
+
+def test_default_response_class(client: TestClient) -> None:
+    response = client.get("/health")
+    assert response.headers["content-type"] == "application/json"
+    # Encodage compact d'orjson, sans espaces
+    assert b'"status":"healthy"' in response.content
+
+def test_principal_cache_entries_use_shared_encoder(session_store) -> None:
+    principal = Principal(id=3, role=UserRole.MANAGER, is_active=True, is_superuser=False)
+    with patch("core.cache_base.redis_client", session_store):
+        PrincipalCache(ttl=60).set(principal)
+        assert session_store.get("auth:principal:3") == dumps(principal)
+        # Un autre processus (cache local vide) relit l'entrée partagée
+        assert PrincipalCache(ttl=60).get(3) == principal
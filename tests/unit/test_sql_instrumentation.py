@@ -0,0 +1,104 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.instrumentation import EXPLAIN_PREFIXES, QueryStats, fingerprint, instrument_queries, slow_query_log
+from db.repositories.post import PostRepository
+from schemas.post import PostCreate
+
+def test_fingerprint_ignores_parameter_values() -> None:
+    assert fingerprint("SELECT * FROM posts WHERE id = 1") == fingerprint(
+        "SELECT *\n  FROM posts WHERE id = 42"
+    )
+    assert fingerprint("SELECT * FROM tags WHERE id IN (?, ?, ?)") == fingerprint(
+        "SELECT * FROM tags WHERE id IN (?)"
+    )
+    assert fingerprint("SELECT * FROM tags WHERE name = 'a'") != fingerprint(
+        "SELECT * FROM posts WHERE name = 'a'"
+    )
+
+def test_repeated_statements_are_flagged() -> None:
+    stats = QueryStats()
+    for i in range(4):
+        stats.record(f"SELECT * FROM tags WHERE post_id = {i}", 0.001)
+    stats.record("SELECT count(*) FROM posts", 0.001)
+    assert stats.count == 5
+    assert list(stats.repeated(3).values()) == [4]
+    assert stats.repeated(4) == {}
+
+def test_query_headers_and_n_plus_one(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    db: Session,
+    monkeypatch
+) -> None:
+    instrument_queries(db.get_bind())
+    monkeypatch.setattr(settings, "DEBUG", True)
+    monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 5)
+    post_repo = PostRepository(db)
+    for i in range(10):
+        post_repo.create(PostCreate(title=f"Post {i}", content="Content", tags=[f"tag{i}"]), author_id=1)
+    db.expunge_all()
+
+    # Vue complète : les tags sont chargés paresseusement, un SELECT par post
+    response = client.get(f"{settings.API_V1_STR}/posts/", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Query-Count"]) > 10
+    assert response.headers["X-DB-N-Plus-One"] == "1"
+
+    db.expunge_all()
+    response = client.get(f"{settings.API_V1_STR}/posts/?view=summary", headers=normal_user_token_headers)
+    assert int(response.headers["X-DB-Query-Count"]) < 10
+    assert response.headers["X-DB-N-Plus-One"] == "0"
+
+def test_slow_queries_are_logged_with_plan(
+    client: TestClient,
+    normal_user_token_headers: dict,
+    superuser_token_headers: dict,
+    db: Session,
+    monkeypatch
+) -> None:
+    instrument_queries(db.get_bind())
+    # Toutes les requêtes sont "lentes", toutes passent par EXPLAIN
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 0.000001)
+    monkeypatch.setattr(slow_query_log, "explain_sample_rate", 1.0)
+    slow_query_log.clear()
+
+    client.get(f"{settings.API_V1_STR}/posts/?author_id=1", headers=normal_user_token_headers)
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 0)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/database/slow-queries", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    entries = [
+        entry for entry in response.json()["items"]
+        if entry["route"] == "GET /api/v1/posts/" and "FROM posts" in entry["sql"]
+    ]
+    assert entries
+    assert all(entry["plan"] for entry in entries)
+    assert "int" in str(entries[0]["parameters"])
+
+    response = client.get(
+        f"{settings.API_V1_STR}/database/slow-queries", headers=normal_user_token_headers
+    )
+    assert response.status_code == 403
+    slow_query_log.clear()
+
+def test_failed_explain_leaves_transaction_usable(db: Session, monkeypatch) -> None:
+    instrument_queries(db.get_bind())
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 0.000001)
+    monkeypatch.setattr(slow_query_log, "explain_sample_rate", 1.0)
+    # Préfixe invalide : l'EXPLAIN échoue à chaque fois
+    monkeypatch.setitem(EXPLAIN_PREFIXES, "sqlite", "EXPLAIN NOT A PLAN ")
+    slow_query_log.clear()
+
+    conn = db.connection()
+    assert conn.exec_driver_sql("SELECT count(*) FROM posts").scalar() == 0
+    assert slow_query_log.entries[-1]["plan"][0].startswith("EXPLAIN failed")
+    # Le savepoint a été annulé, la transaction de la requête continue
+    assert not conn.in_nested_transaction()
+    assert conn.in_transaction()
+    assert conn.exec_driver_sql("SELECT count(*) FROM users").scalar() == 0
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 0)
+    slow_query_log.clear()